@@ -0,0 +1,107 @@
+"""
+Grafo y universo compilado en memoria compartida para pools de procesos.
+
+El proceso padre publica los arrays una sola vez (SharedGraph); cada worker se
+adjunta en el initializer del pool (init_worker) y reconstruye SpaceGraph y
+CompiledUniverse como vistas de solo lectura, sin picklear el grafo por tarea.
+"""
+from __future__ import annotations
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from core.graph.space_graph import SpaceGraph
+from core.sim.compiled import CompiledUniverse
+
+GRAPH_FIELDS = ("indptr", "indices", "distance", "blocked", "edge_of", "edge_slots",
+                "edge_u", "edge_v", "x", "y", "hypergiant", "galaxy", "near", "near_open")
+COMPILED_FIELDS = ("x_time_per_kg", "invest_energy_per_x", "disease_life_delta",
+                   "type", "galaxy", "constellation")
+
+
+class SharedGraph:
+    """
+    Copia los arrays de G (y de cu, si se da) a bloques de memoria compartida.
+    'spec' es picklable y es lo único que viaja a los workers.
+    Usar como context manager: al salir se liberan los bloques.
+    """
+
+    def __init__(self, G: SpaceGraph, cu: Optional[CompiledUniverse] = None):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.spec = {
+            "ids": G.ids,
+            "galaxies": G.galaxies,
+            "graph": {f: self._publish(getattr(G, f)) for f in GRAPH_FIELDS},
+            "compiled": None,
+        }
+        if cu is not None:
+            self.spec["compiled"] = {
+                "galaxies": cu.galaxies,
+                "constellations": cu.constellations,
+                "arrays": {f: self._publish(getattr(cu, f)) for f in COMPILED_FIELDS},
+            }
+
+    def _publish(self, arr: np.ndarray) -> Tuple[str, tuple, str]:
+        arr = np.ascontiguousarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        self._blocks.append(shm)
+        return shm.name, arr.shape, arr.dtype.str
+
+    def close(self):
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------- Lado worker ----------
+
+_WORKER: Dict[str, object] = {}
+
+
+def _attach(entry, handles: list) -> np.ndarray:
+    name, shape, dtype = entry
+    shm = shared_memory.SharedMemory(name=name)
+    handles.append(shm)     # mantener vivo el mapeo mientras viva el worker
+    arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    arr.flags.writeable = False
+    return arr
+
+
+def attach(spec) -> Tuple[SpaceGraph, Optional[CompiledUniverse]]:
+    """
+    Reconstruye (G, cu) como vistas de solo lectura sobre la memoria compartida,
+    o abre el universo binario si el spec es core.io.binary.worker_spec(...).
+    """
+    if "binary" in spec:
+        from core.io.binary import open_universe
+        return open_universe(spec["binary"], mode="r")
+    handles: list = []
+    arrays = {f: _attach(e, handles) for f, e in spec["graph"].items()}
+    G = SpaceGraph.from_arrays(spec["ids"], spec["galaxies"], arrays)
+    cu = None
+    if spec["compiled"] is not None:
+        c = spec["compiled"]
+        cols = {f: _attach(e, handles) for f, e in c["arrays"].items()}
+        cu = CompiledUniverse(ids=G.ids, index_of=G.index_of,
+                              galaxies=c["galaxies"], constellations=c["constellations"],
+                              **cols)
+    _WORKER["handles"] = handles
+    return G, cu
+
+
+def init_worker(spec):
+    """Initializer de ProcessPoolExecutor: se adjunta una vez por proceso."""
+    _WORKER["graph"], _WORKER["compiled"] = attach(spec)
+
+
+def worker_graph() -> Tuple[SpaceGraph, Optional[CompiledUniverse]]:
+    """(G, cu) del worker actual (requiere init_worker)."""
+    return _WORKER["graph"], _WORKER["compiled"]
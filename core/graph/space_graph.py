@@ -1,69 +1,335 @@
 import math
+from collections.abc import Mapping
+import numpy as np
 import networkx as nx
 
+from core.models.enums import StarType
+
 RED_MULTI = "#d62728"
 
 
+class GraphBuilder:
+    """
+    Acumula estrellas y aristas de a una (p. ej. mientras se lee el archivo) y
+    arma el SpaceGraph al final con build(). Las aristas pueden llegar antes que
+    sus estrellas: los extremos se resuelven en build(), y las que apuntan a
+    estrellas inexistentes se descartan (como en SpaceGraph(universe)).
+    """
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self.index_of: dict[str, int] = {}
+        self.galaxies: list[str] = []
+        self._galaxy_code: dict[str, int] = {}
+        self._xs, self._ys, self._hyper, self._gal = [], [], [], []
+        self._eu, self._ev, self._ed, self._eb = [], [], [], []
+
+    def add_star(self, s):
+        sid = str(s.id)
+        x = float(s.x) if s.x is not None else math.nan
+        y = float(s.y) if s.y is not None else math.nan
+        h = getattr(s, "type", None) == StarType.HYPERGIANT
+        g = getattr(s, "galaxyId", None)
+        gc = -1
+        if g is not None:
+            gc = self._galaxy_code.setdefault(str(g), len(self.galaxies))
+            if gc == len(self.galaxies):
+                self.galaxies.append(str(g))
+
+        i = self.index_of.get(sid)
+        if i is None:
+            self.index_of[sid] = len(self.ids)
+            self.ids.append(sid)
+            self._xs.append(x); self._ys.append(y); self._hyper.append(h); self._gal.append(gc)
+        else:
+            # id repetido: se actualizan atributos (como networkx.add_node)
+            self._xs[i], self._ys[i], self._hyper[i], self._gal[i] = x, y, h, gc
+
+    def add_edge(self, e):
+        d = getattr(e, "distance", None)
+        self._eu.append(str(e.u))
+        self._ev.append(str(e.v))
+        self._ed.append(math.nan if d is None else float(d))
+        self._eb.append(bool(getattr(e, "blocked", False)))
+
+    def build(self) -> "SpaceGraph":
+        g = SpaceGraph.__new__(SpaceGraph)
+        self._fill(g)
+        return g
+
+    def _fill(self, g: "SpaceGraph"):
+        g.ids = self.ids
+        g.index_of = self.index_of
+        g.galaxies = self.galaxies
+        g.n = len(self.ids)
+        g.x = np.asarray(self._xs, dtype=np.float64)
+        g.y = np.asarray(self._ys, dtype=np.float64)
+        g.hypergiant = np.asarray(self._hyper, dtype=bool)
+        g.galaxy = np.asarray(self._gal, dtype=np.int32)
+
+        us, vs, ds, bs = [], [], [], []
+        for u, v, d, b in zip(self._eu, self._ev, self._ed, self._eb):
+            iu = self.index_of.get(u)
+            iv = self.index_of.get(v)
+            if iu is None or iv is None:
+                continue
+            us.append(iu); vs.append(iv); ds.append(d); bs.append(b)
+
+        g._build_csr(
+            np.asarray(us, dtype=np.int64),
+            np.asarray(vs, dtype=np.int64),
+            np.asarray(ds, dtype=np.float64),
+            np.asarray(bs, dtype=bool),
+        )
+        g._nx = None
+
+
+class LazyIndex(Mapping):
+    """
+    id -> índice de nodo que recién se arma en el primer acceso, para abrir un
+    grafo (p. ej. un .uvb) sin recorrer todos los ids.
+    """
+
+    def __init__(self, ids):
+        self._ids = ids
+        self._map = None
+
+    def _dict(self) -> dict:
+        if self._map is None:
+            self._map = {sid: i for i, sid in enumerate(self._ids)}
+        return self._map
+
+    def __getitem__(self, key):
+        return self._dict()[key]
+
+    def get(self, key, default=None):
+        return self._dict().get(key, default)
+
+    def __contains__(self, key) -> bool:
+        return key in self._dict()
+
+    def __iter__(self):
+        return iter(self._dict())
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __reduce__(self):
+        return dict, (self._dict(),)
+
+
 class SpaceGraph:
     def __init__(self, universe):
         """
-        Construye un grafo no dirigido con:
-        - nodos: id, x, y, type, galaxyId
-        - aristas: distance, blocked
-        'universe.stars' y 'universe.edges' deben existir.
+        Construye un grafo no dirigido en formato CSR con índices enteros:
+        - ids / index_of: id de estrella <-> índice de nodo
+        - nodos: x, y (NaN si faltan), hypergiant, galaxy (código en 'galaxies')
+        - aristas: indptr / indices / distance / blocked; cada arista no dirigida
+          ocupa dos posiciones (u->v y v->u), enlazadas por 'edge_of' / 'edge_slots'
+        - índice por distancia: near / near_open (ver _build_near)
+        El networkx.Graph sólo se construye bajo demanda (propiedad 'G') para la UI.
+        'universe.stars' y 'universe.edges' deben existir. Para armarlo a medida que
+        se leen estrellas y aristas (carga por streaming) usar GraphBuilder.
         """
-        self.G = nx.Graph()
-
-        # --- Nodos ---
+        b = GraphBuilder()
         for s in universe.stars:
-            self.G.add_node(
-                str(s.id),
-                x=float(s.x) if s.x is not None else None,
-                y=float(s.y) if s.y is not None else None,
-                type=getattr(s, "type", None),
-                galaxyId=getattr(s, "galaxyId", None),
-            )
-
-        # --- Aristas ---
+            b.add_star(s)
         for e in universe.edges:
-            u = str(e.u)
-            v = str(e.v)
-            if not (self.G.has_node(u) and self.G.has_node(v)):
-                continue
+            b.add_edge(e)
+        b._fill(self)
+
+    @classmethod
+    def from_arrays(cls, ids, galaxies, arrays, lazy: bool = False) -> "SpaceGraph":
+        """
+        Reconstruye un SpaceGraph desde arrays ya construidos (memoria compartida,
+        caché en disco...). 'arrays' trae los campos de nodo y CSR por nombre.
+        lazy=True usa 'ids' tal cual (una secuencia que decodifica bajo demanda) y
+        arma index_of en la primera búsqueda (LazyIndex).
+        """
+        g = cls.__new__(cls)
+        if lazy:
+            g.ids = ids
+            g.index_of = LazyIndex(ids)
+        else:
+            g.ids = list(ids)
+            g.index_of = {sid: i for i, sid in enumerate(g.ids)}
+        g.galaxies = list(galaxies)
+        g.n = len(g.ids)
+        for name, arr in arrays.items():
+            setattr(g, name, arr)
+        if "near" not in arrays:
+            g._build_near()
+        g._nx = None
+        return g
+
+    def _build_csr(self, u, v, d, blocked):
+        """
+        Arma el CSR a partir de listas de aristas (índices de nodo).
+        Repite la semántica de networkx.Graph: la primera aparición de (u, v)
+        fija el orden de vecinos y la última fija distancia/bloqueo.
+        """
+        # distancia: usa la del JSON o calcula por coordenadas
+        for k in np.flatnonzero(np.isnan(d)).tolist():
+            a, b = u[k], v[k]
+            h = math.hypot(self.x[a] - self.x[b], self.y[a] - self.y[b])
+            d[k] = 0.0 if math.isnan(h) else h
+
+        # quitar duplicados u-v / v-u
+        key = np.minimum(u, v) * max(self.n, 1) + np.maximum(u, v)
+        _, first = np.unique(key, return_index=True)
+        _, last_rev = np.unique(key[::-1], return_index=True)
+        last = len(key) - 1 - last_rev
+        keep = np.argsort(first, kind="stable")
+        first, last = first[keep], last[keep]
+
+        self.edge_u = u[first].astype(np.int32)
+        self.edge_v = v[first].astype(np.int32)
+        m = len(first)
+
+        # posiciones intercaladas (u->v, v->u) para conservar el orden de inserción
+        src = np.empty(2 * m, dtype=np.int64)
+        dst = np.empty(2 * m, dtype=np.int64)
+        src[0::2], src[1::2] = self.edge_u, self.edge_v
+        dst[0::2], dst[1::2] = self.edge_v, self.edge_u
+        loop = np.zeros(2 * m, dtype=bool)
+        loop[1::2] = self.edge_u == self.edge_v
+        pos = np.flatnonzero(~loop)
+        src, dst = src[pos], dst[pos]
 
-            # distancia: usa la del JSON o calcula por coordenadas
-            d = getattr(e, "distance", None)
-            if d is None:
-                nx_u = self.G.nodes[u]
-                nx_v = self.G.nodes[v]
-                if nx_u.get("x") is not None and nx_v.get("x") is not None:
-                    d = math.hypot(nx_u["x"] - nx_v["x"], nx_u["y"] - nx_v["y"])
-                else:
-                    d = 0.0
+        order = np.argsort(src, kind="stable")
+        self.indptr = np.zeros(self.n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=self.n), out=self.indptr[1:])
+        self.indices = dst[order].astype(np.int32)
+        self.edge_of = pos[order] // 2
 
-            blocked = bool(getattr(e, "blocked", False))
-            self.G.add_edge(u, v, distance=float(d), blocked=blocked)
+        # posiciones CSR de cada arista no dirigida (iguales si es lazo)
+        slot = np.empty(2 * m, dtype=np.int64)
+        slot[pos[order]] = np.arange(len(order), dtype=np.int64)
+        slot[1::2][loop[1::2]] = slot[0::2][loop[1::2]]
+        self.edge_slots = slot.reshape(m, 2)
+
+        self.distance = d[last][self.edge_of]
+        self.blocked = blocked[last][self.edge_of]
+        self._build_near()
+
+    # ---------- Índice de vecinos por distancia ----------
+
+    def _build_near(self):
+        """
+        'near': cada fila CSR con sus posiciones ordenadas por (bloqueada, distancia,
+        orden de adyacencia); 'near_open[i]' = cuántas no bloqueadas hay al inicio.
+        Los selectores voraces recorren ese prefijo y cortan en el primer vecino
+        viable: los siguientes son igual o más largos.
+        """
+        slots = np.arange(len(self.indices), dtype=np.int64)
+        row = np.repeat(np.arange(self.n, dtype=np.int64), np.diff(self.indptr))
+        self.near = slots[np.lexsort((slots, self.distance, self.blocked, row))]
+        self.near_open = np.bincount(row[~self.blocked], minlength=self.n).astype(np.int64)
+
+    def _sort_rows(self, rows):
+        """Reordena en 'near' solo las filas indicadas (tras cambiar bloqueos)."""
+        for i in rows:
+            a, b = int(self.indptr[i]), int(self.indptr[i + 1])
+            s = np.arange(a, b, dtype=np.int64)
+            blk = self.blocked[a:b]
+            self.near[a:b] = s[np.lexsort((s, self.distance[a:b], blk))]
+            self.near_open[i] = (b - a) - int(blk.sum())
 
     # ---------- API de ayuda ----------
 
+    def has_node(self, star_id) -> bool:
+        return str(star_id) in self.index_of
+
+    def row(self, i: int):
+        """Vistas (sin copia) de (vecinos, distancias, bloqueadas) del nodo 'i'."""
+        a, b = self.indptr[i], self.indptr[i + 1]
+        return self.indices[a:b], self.distance[a:b], self.blocked[a:b]
+
     def neighbors(self, star_id: str):
         """Vecinos no bloqueados de 'star_id' con su distancia."""
-        sid = str(star_id)
-        if not self.G.has_node(sid):
+        i = self.index_of.get(str(star_id))
+        if i is None:
             return
-        for v in self.G.neighbors(sid):
-            data = self.G[sid][v]
-            if not data.get("blocked", False):
-                yield str(v), float(data.get("distance", 0.0))
+        for v, d in self.neighbors_idx(i):
+            yield self.ids[v], d
+
+    def neighbors_idx(self, i: int):
+        """Vecinos no bloqueados del nodo 'i' (índices) con su distancia."""
+        nbrs, dist, blocked = self.row(i)
+        for v, d, b in zip(nbrs.tolist(), dist.tolist(), blocked.tolist()):
+            if not b:
+                yield v, d
+
+    def edge_slot(self, u: str, v: str) -> int:
+        """Posición CSR de la arista u->v, o -1 si no existe."""
+        iu = self.index_of.get(str(u))
+        iv = self.index_of.get(str(v))
+        if iu is None or iv is None:
+            return -1
+        nbrs, _, _ = self.row(iu)
+        hit = np.flatnonzero(nbrs == iv)
+        return int(self.indptr[iu] + hit[0]) if len(hit) else -1
+
+    def edges(self):
+        """Itera (u, v, distance, blocked) una vez por arista no dirigida."""
+        ids = self.ids
+        s0 = self.edge_slots[:, 0]
+        for u, v, d, b in zip(self.edge_u.tolist(), self.edge_v.tolist(),
+                              self.distance[s0].tolist(), self.blocked[s0].tolist()):
+            yield ids[u], ids[v], d, b
+
+    def is_blocked(self, u: str, v: str) -> bool:
+        k = self.edge_slot(u, v)
+        return bool(self.blocked[k]) if k >= 0 else False
 
     def set_blocked(self, u: str, v: str, value: bool):
         """Marca/desmarca una arista como bloqueada."""
-        uu, vv = str(u), str(v)
-        if self.G.has_edge(uu, vv):
-            self.G[uu][vv]["blocked"] = bool(value)
+        k = self.edge_slot(u, v)
+        if k < 0:
+            return
+        self.set_blocked_edges([self.edge_of[k]], value)
+        if self._nx is not None:
+            self._nx[str(u)][str(v)]["blocked"] = bool(value)
+
+    def set_blocked_edges(self, edges, value: bool):
+        """
+        Marca/desmarca aristas no dirigidas por índice (posición en edge_u / edge_v).
+        Solo actualiza el índice por distancia de sus extremos; no toca la vista networkx.
+        """
+        edges = np.asarray(edges, dtype=np.int64).ravel()
+        if len(edges) == 0:
+            return
+        self.blocked[self.edge_slots[edges].ravel()] = bool(value)
+        self._sort_rows(np.unique(np.concatenate([self.edge_u[edges], self.edge_v[edges]])).tolist())
 
     def coords(self, s: str):
         """Devuelve (x, y) del nodo 's'."""
-        sid = str(s)
-        n = self.G.nodes[sid]
-        return n.get("x"), n.get("y")
+        i = self.index_of[str(s)]
+        x, y = float(self.x[i]), float(self.y[i])
+        return (None if math.isnan(x) else x), (None if math.isnan(y) else y)
+
+    # ---------- Exportación ----------
+
+    @property
+    def G(self) -> nx.Graph:
+        """Vista networkx (solo lectura) para la UI; se construye una vez y se cachea."""
+        if self._nx is None:
+            self._nx = self.to_networkx()
+        return self._nx
+
+    def to_networkx(self) -> nx.Graph:
+        """Exporta a networkx.Graph con los atributos de nodo/arista de siempre."""
+        g = nx.Graph()
+        for i, sid in enumerate(self.ids):
+            x, y = self.coords(sid)
+            gc = int(self.galaxy[i])
+            g.add_node(
+                sid,
+                x=x,
+                y=y,
+                type=StarType.HYPERGIANT if self.hypergiant[i] else StarType.NORMAL,
+                galaxyId=self.galaxies[gc] if gc >= 0 else None,
+            )
+        for u, v, d, b in self.edges():
+            g.add_edge(u, v, distance=d, blocked=b)
+        return g
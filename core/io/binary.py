@@ -0,0 +1,278 @@
+"""
+Formato binario nativo de universos (.uvb), pensado para abrirse con numpy.memmap.
+
+Estructura del archivo:
+- MAGIC (8 bytes) + largo del encabezado (uint64) + encabezado JSON con la
+  versión y, por sección, su offset / dtype / forma.
+- Secciones alineadas a 64 bytes:
+  - "stars": registros de ancho fijo (STAR_DTYPE): id / nombre / galaxia como
+    índices en la tabla de textos, tipo y coordenadas
+  - "research.*": columnas de investigación por registro de estrella
+  - "galaxies", "constellations", "memberships", "hyperlanes": índices de texto
+  - "graph.*": el CSR de SpaceGraph tal cual (incluye el índice por distancia)
+  - "compiled.*": las columnas de CompiledUniverse por índice de nodo
+  - tablas de textos (blob UTF-8 + offsets): "ids.*" (ids de los nodos),
+    "str.*" (el resto) y las listas cortas de galaxias / constelaciones
+Abrir el grafo no lee las secciones: cada array es un memmap (copy-on-write por
+defecto, así set_blocked no toca el archivo) y varios procesos comparten la
+misma copia en la caché de páginas. Los ids de los nodos se decodifican en el
+primer acceso y el dict id -> índice se arma en la primera búsqueda; al abrir
+solo se leen el encabezado y las listas cortas de galaxias / constelaciones.
+Las aristas se guardan ya deduplicadas y con la distancia calculada, como las usa
+SpaceGraph; al volver a JSON salen así.
+"""
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from collections.abc import Sequence
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from core.graph.shared import COMPILED_FIELDS, GRAPH_FIELDS
+from core.graph.space_graph import SpaceGraph
+from core.io.cache import _pack_strings, _unpack_strings
+from core.io.schema import (
+    ConstellationIn, EdgeIn, GalaxyIn, HyperlaneIn, MembershipIn, ResearchIn, StarIn,
+    UniverseIn, _constructor,
+)
+from core.sim.compiled import STAR_TYPES, CompiledUniverse, compile_universe
+
+MAGIC = b"UVBIN\x00\x00\x01"
+VERSION = 1
+SUFFIX = ".uvb"
+_ALIGN = 64
+
+# Registro de estrella: textos como índice en la tabla "str"
+STAR_DTYPE = np.dtype([("id", "<u4"), ("name", "<u4"), ("galaxy", "<u4"), ("type", "u1"),
+                       ("x", "<f8"), ("y", "<f8")], align=True)
+_RESEARCH = ("x_time_per_kg", "invest_energy_per_x", "disease_life_delta")
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class _Strings:
+    """Tabla de textos en construcción: cada texto distinto recibe un índice."""
+
+    def __init__(self):
+        self.items: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def __call__(self, s) -> int:
+        s = str(s)
+        k = self._index.get(s)
+        if k is None:
+            k = self._index[s] = len(self.items)
+            self.items.append(s)
+        return k
+
+    def refs(self, values) -> np.ndarray:
+        return np.array([self(v) for v in values], dtype=np.uint32)
+
+
+class _LazyText(Sequence):
+    """Tabla de textos (blob UTF-8 + offsets en caracteres) decodificada en el primer acceso."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._off = offsets
+        self._items: Optional[List[str]] = None
+
+    def _list(self) -> List[str]:
+        if self._items is None:
+            self._items = _unpack_strings(self._blob, self._off)
+        return self._items
+
+    def __getitem__(self, i):
+        return self._list()[i]
+
+    def __iter__(self):
+        return iter(self._list())
+
+    def __len__(self) -> int:
+        return len(self._off) - 1
+
+    def __add__(self, other):
+        return self._list() + list(other)
+
+    def __eq__(self, other):
+        if isinstance(other, _LazyText):
+            other = other._list()
+        return self._list() == other if isinstance(other, list) else NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return list, (self._list(),)
+
+
+def _put_text(sec: Dict[str, np.ndarray], name: str, items):
+    sec[f"{name}.blob"], sec[f"{name}.off"] = _pack_strings(list(items))
+
+
+def _get_text(sec, name: str) -> List[str]:
+    return _unpack_strings(sec[f"{name}.blob"], sec[f"{name}.off"])
+
+
+def is_binary(path: str | Path) -> bool:
+    try:
+        with Path(path).open("rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+# --- Escritura ---
+
+def write_binary(path: str | Path, u: UniverseIn, G: SpaceGraph = None,
+                 cu: CompiledUniverse = None):
+    """Escribe 'u' (con su grafo y su tabla compilada) en formato .uvb, atómicamente."""
+    G = G if G is not None else SpaceGraph(u)
+    cu = cu if cu is not None else compile_universe(u, G)
+    st = _Strings()
+    sec: Dict[str, np.ndarray] = {}
+
+    stars = np.zeros(len(u.stars), dtype=STAR_DTYPE)
+    stars["id"] = st.refs(s.id for s in u.stars)
+    stars["name"] = st.refs(s.name for s in u.stars)
+    stars["galaxy"] = st.refs(s.galaxyId for s in u.stars)
+    stars["type"] = [STAR_TYPES.index(s.type) for s in u.stars]
+    stars["x"] = [s.x for s in u.stars]
+    stars["y"] = [s.y for s in u.stars]
+    sec["stars"] = stars
+    for f in _RESEARCH:
+        sec[f"research.{f}"] = np.array([getattr(s.research, f) for s in u.stars], dtype=np.float64)
+
+    sec["galaxies"] = st.refs(x for g in u.galaxies for x in (g.id, g.name)).reshape(-1, 2)
+    sec["constellations"] = st.refs(
+        x for c in u.constellations for x in (c.id, c.name, c.galaxyId, c.color)).reshape(-1, 4)
+    sec["memberships"] = st.refs(
+        x for m in u.memberships for x in (m.starId, m.constellationId)).reshape(-1, 2)
+    sec["hyperlanes"] = st.refs(
+        x for h in u.hyperlanes for x in (h.starId, h.toGalaxyId)).reshape(-1, 2)
+
+    for f in GRAPH_FIELDS:
+        sec[f"graph.{f}"] = np.ascontiguousarray(getattr(G, f))
+    for f in COMPILED_FIELDS:
+        sec[f"compiled.{f}"] = np.ascontiguousarray(getattr(cu, f))
+
+    _put_text(sec, "ids", G.ids)
+    _put_text(sec, "graph.galaxies", G.galaxies)
+    _put_text(sec, "compiled.galaxies", cu.galaxies)
+    _put_text(sec, "compiled.constellations", cu.constellations)
+    _put_text(sec, "str", st.items)
+
+    # offsets: el encabezado se agranda con los dígitos, se itera hasta que entre
+    base = 0
+    while True:
+        table, pos = {}, base
+        for name, arr in sec.items():
+            table[name] = {"offset": pos, "dtype": np.lib.format.dtype_to_descr(arr.dtype),
+                           "shape": list(arr.shape)}
+            pos = _aligned(pos + arr.nbytes)
+        head = json.dumps({"version": VERSION, "sections": table}).encode("utf-8")
+        need = _aligned(len(MAGIC) + 8 + len(head))
+        if need <= base:
+            break
+        base = need
+
+    p = Path(path)
+    tmp = p.with_name(p.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(head)).tobytes())
+        f.write(head)
+        for name, arr in sec.items():
+            f.write(b"\0" * (table[name]["offset"] - f.tell()))
+            f.write(arr.tobytes())
+    os.replace(tmp, p)
+
+
+# --- Lectura ---
+
+def _sections(path: Path, mode: str) -> Dict[str, np.ndarray]:
+    with path.open("rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise RuntimeError(f"{path} no es un universo binario (.uvb)")
+        size = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        head = json.loads(f.read(size).decode("utf-8"))
+    if head.get("version") != VERSION:
+        raise RuntimeError(f"{path}: versión de formato {head.get('version')} no soportada "
+                           f"(se espera {VERSION}); reconviértelo con tools.universe_bin")
+    out = {}
+    for name, s in head["sections"].items():
+        dtype = np.lib.format.descr_to_dtype(s["dtype"])
+        shape = tuple(s["shape"])
+        if int(np.prod(shape)) == 0:
+            out[name] = np.zeros(shape, dtype=dtype)
+        else:
+            out[name] = np.memmap(path, dtype=dtype, mode=mode, offset=s["offset"], shape=shape)
+    return out
+
+
+def open_universe(path: str | Path, mode: str = "c") -> Tuple[SpaceGraph, CompiledUniverse]:
+    """
+    (SpaceGraph, CompiledUniverse) sobre memmaps del archivo, sin armar modelos.
+    mode="c": copia al escribir (set_blocked no modifica el archivo); "r": solo lectura.
+    """
+    sec = _sections(Path(path), mode)
+    G = SpaceGraph.from_arrays(_LazyText(sec["ids.blob"], sec["ids.off"]),
+                               _get_text(sec, "graph.galaxies"),
+                               {f: sec[f"graph.{f}"] for f in GRAPH_FIELDS}, lazy=True)
+    cu = CompiledUniverse(
+        ids=G.ids, index_of=G.index_of,
+        galaxies=_get_text(sec, "compiled.galaxies"),
+        constellations=_get_text(sec, "compiled.constellations"),
+        **{f: sec[f"compiled.{f}"] for f in COMPILED_FIELDS},
+    )
+    return G, cu
+
+
+def load_binary(path: str | Path, with_graph: bool = False):
+    """UniverseIn (modelos sin revalidar) desde un .uvb; with_graph=True agrega el grafo."""
+    sec = _sections(Path(path), "c")
+    text = _get_text(sec, "str")
+    galaxy, const, star = _constructor(GalaxyIn), _constructor(ConstellationIn), _constructor(StarIn)
+    research, member = _constructor(ResearchIn), _constructor(MembershipIn)
+    edge, hyper = _constructor(EdgeIn), _constructor(HyperlaneIn)
+
+    rec = sec["stars"]
+    stars = [
+        star(id=text[i], name=text[nm], galaxyId=text[g], x=x, y=y, type=STAR_TYPES[t],
+             research=research(x_time_per_kg=r0, invest_energy_per_x=r1, disease_life_delta=r2))
+        for i, nm, g, t, x, y, r0, r1, r2 in zip(
+            rec["id"].tolist(), rec["name"].tolist(), rec["galaxy"].tolist(),
+            rec["type"].tolist(), rec["x"].tolist(), rec["y"].tolist(),
+            *(sec[f"research.{f}"].tolist() for f in _RESEARCH))
+    ]
+    ids = _get_text(sec, "ids")
+    s0 = sec["graph.edge_slots"][:, 0]
+    edges = [
+        edge(u=ids[a], v=ids[b], distance=d, blocked=bl)
+        for a, b, d, bl in zip(sec["graph.edge_u"].tolist(), sec["graph.edge_v"].tolist(),
+                               sec["graph.distance"][s0].tolist(),
+                               sec["graph.blocked"][s0].tolist())
+    ]
+    u = UniverseIn.model_construct(
+        galaxies=[galaxy(id=text[a], name=text[b]) for a, b in sec["galaxies"].tolist()],
+        constellations=[const(id=text[a], name=text[b], galaxyId=text[c], color=text[d])
+                        for a, b, c, d in sec["constellations"].tolist()],
+        stars=stars,
+        memberships=[member(starId=text[a], constellationId=text[b])
+                     for a, b in sec["memberships"].tolist()],
+        edges=edges,
+        hyperlanes=[hyper(starId=text[a], toGalaxyId=text[b])
+                    for a, b in sec["hyperlanes"].tolist()],
+    )
+    if not with_graph:
+        return u
+    G = SpaceGraph.from_arrays(ids, _get_text(sec, "graph.galaxies"),
+                               {f: sec[f"graph.{f}"] for f in GRAPH_FIELDS})
+    return u, G
+
+
+def worker_spec(path: str | Path) -> dict:
+    """Spec para core.graph.shared.init_worker: cada worker abre el .uvb por su cuenta."""
+    return {"binary": str(Path(path).resolve())}
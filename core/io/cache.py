@@ -0,0 +1,172 @@
+"""
+Caché binaria de universos junto al archivo fuente ("<archivo>.cache.npz").
+
+Guarda el universo ya validado (en columnas) y los arrays del SpaceGraph ya
+construido. La clave es el SHA-256 del contenido del archivo más CACHE_VERSION:
+si el archivo cambia (o cambia el formato de la caché) la clave no coincide y la
+caché se regenera sola. Al recargar un archivo sin cambios no se parsea JSON, no
+se valida con pydantic ni se arma el grafo.
+Los textos se guardan como un blob UTF-8 + offsets (sin pickle).
+"""
+from __future__ import annotations
+import hashlib
+import os
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from core.io.schema import (
+    ConstellationIn, EdgeIn, GalaxyIn, HyperlaneIn, MembershipIn, ResearchIn, StarIn,
+    UniverseIn, _constructor,
+)
+from core.graph.space_graph import SpaceGraph
+from core.graph.shared import GRAPH_FIELDS
+from core.sim.compiled import STAR_TYPES
+
+# Subir si cambian UniverseIn, los arrays de SpaceGraph o el contenido de la caché
+CACHE_VERSION = 1
+SUFFIX = ".cache.npz"
+
+_HASH_BLOCK = 1 << 20
+
+# sección -> campos de texto de cada elemento
+_TEXT = {
+    "galaxies": ("id", "name"),
+    "constellations": ("id", "name", "galaxyId", "color"),
+    "stars": ("id", "name", "galaxyId"),
+    "memberships": ("starId", "constellationId"),
+    "edges": ("u", "v"),
+    "hyperlanes": ("starId", "toGalaxyId"),
+}
+_RESEARCH = ("x_time_per_kg", "invest_energy_per_x", "disease_life_delta")
+
+
+def cache_path(src: str | Path) -> Path:
+    p = Path(src)
+    return p.with_name(p.name + SUFFIX)
+
+
+def file_key(src: str | Path) -> str:
+    """Clave de la caché: versión + SHA-256 del contenido."""
+    h = hashlib.sha256()
+    with Path(src).open("rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            h.update(block)
+    return f"v{CACHE_VERSION}:{h.hexdigest()}"
+
+
+# --- Textos ---
+
+def _pack_strings(items: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Blob UTF-8 de todos los textos + offsets en caracteres (un solo decode al leer)."""
+    offsets = np.zeros(len(items) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in items], out=offsets[1:])
+    return np.frombuffer("".join(items).encode("utf-8"), dtype=np.uint8), offsets
+
+
+def _unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    text = blob.tobytes().decode("utf-8")
+    o = offsets.tolist()
+    return [text[a:b] for a, b in zip(o[:-1], o[1:])]
+
+
+def _put_strings(cols: Dict[str, np.ndarray], name: str, items: List[str]):
+    cols[name], cols[name + ".off"] = _pack_strings(items)
+
+
+def _get_strings(z, name: str) -> List[str]:
+    return _unpack_strings(z[name], z[name + ".off"])
+
+
+# --- Universo <-> columnas ---
+
+def _universe_columns(u: UniverseIn) -> Dict[str, np.ndarray]:
+    cols: Dict[str, np.ndarray] = {}
+    for sec, fields in _TEXT.items():
+        rows = getattr(u, sec)
+        for f in fields:
+            _put_strings(cols, f"{sec}.{f}", [str(getattr(r, f)) for r in rows])
+    stars = u.stars
+    cols["stars.x"] = np.array([s.x for s in stars], dtype=np.float64)
+    cols["stars.y"] = np.array([s.y for s in stars], dtype=np.float64)
+    cols["stars.type"] = np.array([STAR_TYPES.index(s.type) for s in stars], dtype=np.int8)
+    for f in _RESEARCH:
+        cols[f"stars.{f}"] = np.array([getattr(s.research, f) for s in stars], dtype=np.float64)
+    cols["edges.distance"] = np.array([np.nan if e.distance is None else e.distance
+                                       for e in u.edges], dtype=np.float64)
+    cols["edges.blocked"] = np.array([e.blocked for e in u.edges], dtype=bool)
+    return cols
+
+
+def _universe_from(z) -> UniverseIn:
+    """Rearma el UniverseIn sin validar (ya se validó al crear la caché)."""
+    t = {sec: [_get_strings(z, f"{sec}.{f}") for f in fields] for sec, fields in _TEXT.items()}
+    galaxy, const, star = _constructor(GalaxyIn), _constructor(ConstellationIn), _constructor(StarIn)
+    research, member = _constructor(ResearchIn), _constructor(MembershipIn)
+    edge, hyper = _constructor(EdgeIn), _constructor(HyperlaneIn)
+
+    galaxies = [galaxy(id=a, name=b) for a, b in zip(*t["galaxies"])]
+    constellations = [const(id=a, name=b, galaxyId=c, color=d)
+                      for a, b, c, d in zip(*t["constellations"])]
+    stars = [
+        star(id=sid, name=name, galaxyId=gid, x=x, y=y, type=STAR_TYPES[k],
+             research=research(x_time_per_kg=r0, invest_energy_per_x=r1, disease_life_delta=r2))
+        for sid, name, gid, x, y, k, r0, r1, r2 in zip(
+            *t["stars"], z["stars.x"].tolist(), z["stars.y"].tolist(), z["stars.type"].tolist(),
+            *(z[f"stars.{f}"].tolist() for f in _RESEARCH))
+    ]
+    memberships = [member(starId=a, constellationId=b) for a, b in zip(*t["memberships"])]
+    edges = [
+        edge(u=a, v=b, distance=None if d != d else d, blocked=bl)
+        for a, b, d, bl in zip(*t["edges"], z["edges.distance"].tolist(),
+                               z["edges.blocked"].tolist())
+    ]
+    hyperlanes = [hyper(starId=a, toGalaxyId=b) for a, b in zip(*t["hyperlanes"])]
+    return UniverseIn.model_construct(galaxies=galaxies, constellations=constellations,
+                                      stars=stars, memberships=memberships, edges=edges,
+                                      hyperlanes=hyperlanes)
+
+
+# --- API ---
+
+def load_cached(src: str | Path, key: Optional[str] = None) -> Optional[Tuple[UniverseIn, SpaceGraph]]:
+    """(universo, grafo) desde la caché de 'src', o None si no existe o está vieja."""
+    path = cache_path(src)
+    if not path.exists():
+        return None
+    key = key or file_key(src)
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            if str(z["key"]) != key:
+                return None
+            u = _universe_from(z)
+            G = SpaceGraph.from_arrays(_get_strings(z, "graph.ids"),
+                                       _get_strings(z, "graph.galaxies"),
+                                       {f: z[f"graph.{f}"] for f in GRAPH_FIELDS})
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None         # caché ilegible: se regenera
+    return u, G
+
+
+def save_cache(src: str | Path, u: UniverseIn, G: SpaceGraph, key: Optional[str] = None) -> bool:
+    """
+    Escribe la caché de 'src' (atómica: archivo temporal + os.replace).
+    Devuelve False si no se pudo escribir (p. ej. carpeta de solo lectura).
+    """
+    path = cache_path(src)
+    cols = _universe_columns(u)
+    _put_strings(cols, "graph.ids", G.ids)
+    _put_strings(cols, "graph.galaxies", G.galaxies)
+    for f in GRAPH_FIELDS:
+        cols[f"graph.{f}"] = np.asarray(getattr(G, f))
+    cols["key"] = np.array(key or file_key(src))
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with tmp.open("wb") as f:
+            np.savez(f, **cols)
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        return False
+    return True
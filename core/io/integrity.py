@@ -0,0 +1,47 @@
+"""
+Integridad referencial del universo, en una pasada vectorizada (np.isin sobre
+columnas de texto): estrellas y constelaciones con galaxia inexistente,
+membresías / aristas / hyperlanes que apuntan a estrellas, constelaciones o
+galaxias que no existen. No modifica nada: devuelve los problemas encontrados.
+"""
+from __future__ import annotations
+from typing import List
+import numpy as np
+
+# (sección, campo, sección referida)
+REFERENCES = (
+    ("stars", "galaxyId", "galaxies"),
+    ("constellations", "galaxyId", "galaxies"),
+    ("memberships", "starId", "stars"),
+    ("memberships", "constellationId", "constellations"),
+    ("edges", "u", "stars"),
+    ("edges", "v", "stars"),
+    ("hyperlanes", "starId", "stars"),
+    ("hyperlanes", "toGalaxyId", "galaxies"),
+)
+
+
+def _column(rows, field: str) -> np.ndarray:
+    return np.array([str(getattr(r, field)) for r in rows], dtype=str)
+
+
+def check_references(u, limit: int = 20) -> List[str]:
+    """
+    Lista de referencias rotas ("edges[12].v = 'X' no existe en stars"), como
+    mucho 'limit' mensajes más un resumen con el total. Lista vacía si todo cierra.
+    """
+    ids = {sec: _column(getattr(u, sec), "id") for sec in ("galaxies", "constellations", "stars")}
+    problems: List[str] = []
+    total = 0
+    for sec, field, target in REFERENCES:
+        rows = getattr(u, sec)
+        if not rows:
+            continue
+        col = _column(rows, field)
+        bad = np.flatnonzero(~np.isin(col, ids[target]))
+        total += len(bad)
+        for k in bad[:max(0, limit - len(problems))].tolist():
+            problems.append(f"{sec}[{k}].{field} = '{col[k]}' no existe en {target}")
+    if total > len(problems):
+        problems.append(f"... {total} referencias rotas en total")
+    return problems
@@ -5,35 +5,120 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 import json
+import warnings
 from pathlib import Path
 from pydantic import ValidationError
-from core.io.schema import UniverseIn
-from tools.convert_from_original import convert_original_to_universe
+from core.io.schema import UniverseIn, construct_universe
+from core.io.integrity import check_references
+from core.io.stream_loader import OriginalFormat, stream_universe
+from core.io.binary import is_binary, load_binary
+from core.io.cache import file_key, load_cached, save_cache
+from core.graph.space_graph import GraphBuilder, SpaceGraph
+from tools.convert_from_original import convert_original_fast
 
-def load_universe(path: str | Path) -> UniverseIn:
+# Desde este tamaño el formato interno se lee por streaming (stream_loader)
+STREAM_MIN_BYTES = 32 * 1024 * 1024
+
+def load_universe(path: str | Path, progress=None, with_graph: bool = False,
+                  cache: bool = False, trusted: bool = False):
     """
-    1) Intenta cargar como UniverseIn.
+    1) Intenta cargar como UniverseIn (por streaming si el archivo es grande o se
+       pide 'progress(leídos, total)').
     2) Si falla, detecta formato original (constellations->starts, coordenates, linkedTo, hypergiant)
     y lo convierte en memoria.
     3) Si aún falla, levanta un error explicando qué campos faltan.
+    with_graph=True devuelve (universo, SpaceGraph); por streaming el grafo se
+    arma mientras se lee el archivo.
+    cache=True usa / actualiza la caché binaria junto al archivo (core.io.cache):
+    si el contenido no cambió se salta el parseo, la validación y el grafo.
+    Los universos binarios (.uvb, core.io.binary) se abren directo, sin caché.
+    trusted=True (archivos en formato interno que ya generó este programa) arma
+    los modelos sin validar campo a campo y en su lugar revisa las referencias
+    entre secciones (core.io.integrity). Las referencias rotas no detienen la
+    carga (igual que sin trusted; SpaceGraph las salta): se avisan con un
+    RuntimeWarning. El formato original sigue el camino validado.
     """
     p = Path(path)
+    if is_binary(p):
+        out = load_binary(p, with_graph=with_graph)
+        if progress is not None:
+            size = p.stat().st_size
+            progress(size, size)
+        return out
+    key = None
+    if cache:
+        key = file_key(p)
+        hit = load_cached(p, key)
+        if hit is not None:
+            if progress is not None:
+                size = p.stat().st_size
+                progress(size, size)
+            return hit if with_graph else hit[0]
+
+    u, G = None, None
+    if progress is not None or p.stat().st_size >= STREAM_MIN_BYTES:
+        builder = GraphBuilder() if (with_graph or cache) else None
+        try:
+            u = stream_universe(p, progress=progress, builder=builder, trusted=trusted)
+            G = builder.build() if builder is not None else None
+            if trusted:
+                _check_trusted(p, u)
+        except OriginalFormat:
+            pass    # el formato original se convierte en memoria (abajo)
+
+    if u is None:
+        u = _load_in_memory(p, trusted)
+        if progress is not None:
+            size = p.stat().st_size
+            progress(size, size)
+    if G is None and (with_graph or cache):
+        G = SpaceGraph(u)
+    if cache:
+        save_cache(p, u, G, key)    # si no se puede escribir, se sigue sin caché
+    return (u, G) if with_graph else u
+
+def _is_original(raw) -> bool:
+    """¿Huele a formato original? (constellations -> starts)"""
+    if isinstance(raw, dict) and "constellations" in raw:
+        # mirar una constelación ejemplo
+        cons = raw.get("constellations") or []
+        if cons and isinstance(cons[0], dict) and "starts" in cons[0]:
+            return True
+    return False
+
+def _check_trusted(p: Path, u: UniverseIn):
+    """
+    Pasada de integridad referencial del modo trusted (solo si se armó sin validar).
+    Como la carga validada, no rechaza referencias rotas: SpaceGraph salta las
+    aristas hacia estrellas que no están y el conversor del formato original
+    genera membresías así. Se avisan con un RuntimeWarning.
+    """
+    problems = check_references(u)
+    if problems:
+        warnings.warn(
+            f"{p.name} tiene referencias rotas (se ignoran, como sin trusted):\n"
+            + "\n".join(problems), RuntimeWarning, stacklevel=3)
+
+def _load_in_memory(p: Path, trusted: bool = False) -> UniverseIn:
     raw = json.loads(p.read_text(encoding="utf-8"))
 
+    # Modo confiable: modelos sin validar (el formato original sigue el camino normal)
+    if trusted and not _is_original(raw):
+        try:
+            u = construct_universe(raw)
+        except (KeyError, TypeError, AttributeError) as e:
+            raise RuntimeError(
+                f"{p.name} no tiene la forma de UniverseIn esperada por el modo confiable "
+                f"({type(e).__name__}: {e}); cargarlo sin trusted para ver el detalle."
+            ) from e
+        _check_trusted(p, u)
+        return u
+
     # Intento 1: esquema interno
     try:
         return UniverseIn.model_validate(raw)
     except ValidationError as e1:
-        # ¿Huele a formato original?
-        is_original = False
-        if isinstance(raw, dict):
-            if "constellations" in raw:
-                # mirar una constelación ejemplo
-                cons = raw.get("constellations") or []
-                if cons and isinstance(cons[0], dict) and "starts" in cons[0]:
-                    is_original = True
-
-        if not is_original:
+        if not _is_original(raw):
             # Re-lanza error con explicación clara
             raise RuntimeError(
                 "El JSON no coincide con el formato interno (UniverseIn) y no parece ser el formato original.\n"
@@ -41,13 +126,9 @@ def load_universe(path: str | Path) -> UniverseIn:
             ) from e1
 
         # Intento 2: convertir original -> interno
-        uni_dict, warns = convert_original_to_universe(raw)
-
-        # Si hay advertencias, lánzalas como RuntimeError suave (aparecen en QMessageBox)
-        if warns:
-            # No detenemos la ejecución por warnings; sólo informamos al usuario en UI si deseas.
-            # Aquí las ignoramos para permitir dibujar. Puedes loguearlas en consola/archivo.
-            pass
+        # Las advertencias no detienen la carga; aquí se ignoran para permitir dibujar.
+        # Puedes loguearlas pasando warn=print (o a un archivo).
+        uni_dict = convert_original_fast(raw)
 
         try:
             return UniverseIn.model_validate(uni_dict)
@@ -54,4 +54,75 @@ class UniverseIn(BaseModel):
     stars: List[StarIn]
     memberships: List[MembershipIn]
     edges: List[EdgeIn] = Field(default_factory=list)
-    hyperlanes: List[HyperlaneIn] = Field(default_factory=list)
\ No newline at end of file
+    hyperlanes: List[HyperlaneIn] = Field(default_factory=list)
+
+# ---------------------------------------------------------------------
+# Modo confiable (trusted): armar modelos sin validar campo a campo
+# ---------------------------------------------------------------------
+
+def _constructor(cls):
+    """
+    Igual que cls.model_construct(**campos) cuando se pasan todos los campos en
+    orden de declaración, pero sin su recorrido de alias/defaults, que con
+    millones de objetos domina la carga.
+    """
+    fields = set(cls.model_fields)
+    new = cls.__new__
+    set_attr = object.__setattr__
+
+    def make(**values):
+        m = new(cls)
+        set_attr(m, "__dict__", values)
+        set_attr(m, "__pydantic_fields_set__", fields)
+        set_attr(m, "__pydantic_extra__", None)
+        set_attr(m, "__pydantic_private__", None)
+        return m
+    return make
+
+
+def trusted_builders():
+    """
+    sección -> función dict -> modelo, sin validación: solo aplica los defaults,
+    arma ResearchIn y convierte 'type' a StarType. Para archivos que ya generó y
+    validó este programa; un campo faltante levanta KeyError.
+    """
+    galaxy, const, star = _constructor(GalaxyIn), _constructor(ConstellationIn), _constructor(StarIn)
+    research, member = _constructor(ResearchIn), _constructor(MembershipIn)
+    edge, hyper = _constructor(EdgeIn), _constructor(HyperlaneIn)
+    types = {t.value: t for t in StarType}
+    types.update({t: t for t in StarType})
+
+    def star_in(d):
+        r = d["research"]
+        return star(id=d["id"], name=d["name"], galaxyId=d["galaxyId"], x=d["x"], y=d["y"],
+                    type=types[d.get("type", StarType.NORMAL)],
+                    research=research(x_time_per_kg=r["x_time_per_kg"],
+                                      invest_energy_per_x=r["invest_energy_per_x"],
+                                      disease_life_delta=r.get("disease_life_delta", 0.0)))
+
+    return {
+        "galaxies": lambda d: galaxy(id=d["id"], name=d["name"]),
+        "constellations": lambda d: const(id=d["id"], name=d["name"], galaxyId=d["galaxyId"],
+                                          color=d["color"]),
+        "stars": star_in,
+        "memberships": lambda d: member(starId=d["starId"], constellationId=d["constellationId"]),
+        "edges": lambda d: edge(u=d["u"], v=d["v"], distance=d.get("distance"),
+                                blocked=d.get("blocked", False)),
+        "hyperlanes": lambda d: hyper(starId=d["starId"], toGalaxyId=d["toGalaxyId"]),
+    }
+
+
+def construct_universe(raw: dict) -> UniverseIn:
+    """
+    UniverseIn a partir del dict de un JSON confiable, sin validación por campo
+    (ver trusted_builders). Las referencias entre secciones se revisan aparte
+    con core.io.integrity.check_references.
+    """
+    build = trusted_builders()
+    out = {}
+    for sec, make in build.items():
+        if sec not in raw and sec in ("edges", "hyperlanes"):
+            out[sec] = []
+            continue
+        out[sec] = [make(d) for d in raw[sec]]
+    return UniverseIn.model_construct(**out)
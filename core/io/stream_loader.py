@@ -0,0 +1,216 @@
+"""
+Carga por streaming de universos grandes (formato interno UniverseIn).
+
+El archivo se lee por bloques y se decodifica elemento a elemento: cada estrella,
+arista o membresía se valida con su modelo apenas se lee y, si se da un
+GraphBuilder, las estrellas y aristas lo alimentan en el mismo paso. En memoria
+nunca está el texto completo ni los dicts de todo el archivo: solo un bloque de
+lectura, el elemento en curso y los modelos ya validados.
+"""
+from __future__ import annotations
+import codecs
+import json
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from pydantic import ValidationError
+
+from core.io.schema import (
+    ConstellationIn, EdgeIn, GalaxyIn, HyperlaneIn, MembershipIn, StarIn, UniverseIn,
+    trusted_builders,
+)
+
+CHUNK = 1 << 20          # bytes por lectura
+
+# Sección -> modelo de cada elemento
+SECTIONS = {
+    "galaxies": GalaxyIn,
+    "constellations": ConstellationIn,
+    "stars": StarIn,
+    "memberships": MembershipIn,
+    "edges": EdgeIn,
+    "hyperlanes": HyperlaneIn,
+}
+_REQUIRED = ("galaxies", "constellations", "stars", "memberships")
+
+_WS = re.compile(r"[ \t\n\r]*")
+
+Progress = Callable[[int, int], None]     # (bytes leídos, bytes totales)
+
+
+class OriginalFormat(Exception):
+    """El archivo parece estar en el formato original (constellations -> starts)."""
+
+
+class _JsonStream:
+    """Lector JSON incremental sobre un archivo binario UTF-8."""
+
+    def __init__(self, f, total: int, chunk: int, progress: Optional[Progress]):
+        self._f = f
+        self._dec = codecs.getincrementaldecoder("utf-8-sig")()
+        self._json = json.JSONDecoder()
+        self._chunk = chunk
+        self._progress = progress
+        self.total = total
+        self.read = 0
+        self.eof = False
+        self.buf = ""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        """Agrega un bloque al buffer (descartando lo ya consumido). False al final."""
+        if self.eof:
+            return False
+        data = self._f.read(self._chunk)
+        self.read += len(data)
+        if data:
+            text = self._dec.decode(data)
+        else:
+            self.eof = True
+            text = self._dec.decode(b"", final=True)
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        if self._progress is not None:
+            self._progress(self.read, self.total)
+        return True
+
+    def _error(self, msg: str) -> ValueError:
+        return ValueError(f"JSON inválido cerca del byte {self.read}: {msg}")
+
+    def peek(self) -> str:
+        """Siguiente carácter no blanco ('' al final del archivo)."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str):
+        if self.peek() != ch:
+            raise self._error(f"se esperaba '{ch}'")
+        self.pos += 1
+
+    def value(self):
+        """Decodifica un valor JSON completo (pide más bloques si quedó cortado)."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self._json.raw_decode(self.buf, self.pos)
+                # un número al borde del buffer puede seguir en el próximo bloque
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise self._error(e.msg) from e
+            self._fill()
+
+    def _next(self, close: str) -> bool:
+        """Tras un elemento: True si sigue otro (','), False si cierra 'close'."""
+        c = self.peek()
+        self.pos += 1
+        if c == close:
+            return False
+        if c != ",":
+            raise self._error(f"se esperaba ',' o '{close}'")
+        return True
+
+    def items(self) -> Iterator:
+        """Elementos de un array, de a uno."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if not self._next("]"):
+                return
+
+    def keys(self) -> Iterator[str]:
+        """Claves de un objeto; tras cada clave el llamador consume su valor."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise self._error("clave de objeto no es texto")
+            self.expect(":")
+            yield key
+            if not self._next("}"):
+                return
+
+
+def stream_universe(path: str | Path, progress: Optional[Progress] = None,
+                    builder=None, chunk: int = CHUNK, trusted: bool = False) -> UniverseIn:
+    """
+    Lee 'path' (formato interno) sección por sección y devuelve el UniverseIn
+    sin volver a validarlo entero. Si se da 'builder' (GraphBuilder), cada
+    estrella y arista se le pasa apenas se valida. 'progress(leídos, total)' se
+    llama tras cada bloque leído. trusted=True arma cada elemento sin validarlo
+    (schema.trusted_builders).
+    Lanza OriginalFormat si detecta el formato original (para convertirlo aparte)
+    y RuntimeError si un elemento no cumple el esquema o falta una sección.
+    """
+    p = Path(path)
+    total = p.stat().st_size
+    out: Dict[str, List] = {}
+    fast = trusted_builders() if trusted else None
+    with p.open("rb") as f:
+        js = _JsonStream(f, total, chunk, progress)
+        if js.peek() != "{":
+            raise RuntimeError("El JSON no coincide con el formato interno (UniverseIn): "
+                               "se esperaba un objeto en la raíz")
+        for key in js.keys():
+            model = SECTIONS.get(key)
+            if model is None:
+                js.value()                      # sección desconocida: se descarta
+                continue
+            if js.peek() != "[":
+                # sección conocida que no es lista: se rechaza como en model_validate
+                value = js.value()
+                try:
+                    UniverseIn.__pydantic_validator__.validate_assignment(
+                        UniverseIn.model_construct(), key, value)
+                except ValidationError as e:
+                    raise RuntimeError(
+                        f"El JSON no coincide con el formato interno (UniverseIn) en {key}.\n"
+                        f"Detalle de validación:\n{e}"
+                    ) from e
+                raise RuntimeError(f"El JSON no coincide con el formato interno (UniverseIn): "
+                                   f"'{key}' debe ser una lista")
+            rows = out[key] = []
+            for k, item in enumerate(js.items()):
+                if key == "constellations" and isinstance(item, dict) and "starts" in item:
+                    raise OriginalFormat(str(p))
+                try:
+                    m = fast[key](item) if fast is not None else model.model_validate(item)
+                except ValidationError as e:
+                    raise RuntimeError(
+                        f"El JSON no coincide con el formato interno (UniverseIn) en {key}[{k}].\n"
+                        f"Detalle de validación:\n{e}"
+                    ) from e
+                except (KeyError, TypeError, AttributeError) as e:
+                    raise RuntimeError(
+                        f"{key}[{k}] no tiene la forma esperada por el modo confiable "
+                        f"({type(e).__name__}: {e})"
+                    ) from e
+                rows.append(m)
+                if builder is not None:
+                    if key == "stars":
+                        builder.add_star(m)
+                    elif key == "edges":
+                        builder.add_edge(m)
+        if js.peek() != "":
+            raise js._error("datos extra tras el objeto raíz")
+
+    missing = [s for s in _REQUIRED if s not in out]
+    if missing:
+        raise RuntimeError("El JSON no coincide con el formato interno (UniverseIn): "
+                           f"faltan las secciones {', '.join(missing)}")
+    out.setdefault("edges", [])
+    out.setdefault("hyperlanes", [])
+    return UniverseIn.model_construct(**out)
@@ -27,9 +27,9 @@ def generate_detailed_report(
         star_to_constellation[m.starId] = m.constellationId
 
     # Normalizar entrada: RunLog (con pasos) o RouteResult (sin pasos)
-    if hasattr(log, "to_rows"):
-        # RunLog completo
-        steps_rows = log.to_rows()
+    if hasattr(log, "to_frame"):
+        # RunLog completo (columnas de pasos, sin pasar por dicts)
+        df_steps = log.to_frame()
         visited_seq = list(getattr(log, "visited_order", [])) or list(getattr(log, "visited", []))
         initial_energy = getattr(log, "initial_energy", 0.0)
         initial_hay = getattr(log, "initial_grass", getattr(log, "initial_hay", 0.0))
@@ -56,6 +56,7 @@ def generate_detailed_report(
                 "life_before": 0.0,
                 "life_after": 0.0,
             })
+        df_steps = pd.DataFrame(steps_rows)
         visited_seq = list(getattr(rr, "visited", [])) or path
         initial_energy = getattr(rr, "initial_energy", 0.0)
         initial_hay = getattr(rr, "initial_hay", 0.0)
@@ -65,6 +66,13 @@ def generate_detailed_report(
         final_energy = getattr(rr, "remaining_energy", 0.0)
         final_life = getattr(rr, "remaining_life", 0.0)
 
+    # Pasto consumido en la primera estancia de cada estrella, en una pasada sobre las columnas
+    grass_by_star: Dict[str, float] = {}
+    if len(df_steps):
+        first = df_steps.drop_duplicates("from_star")
+        eaten = (first["grass_before"].astype(float) - first["grass_after"].astype(float)).clip(lower=0.0)
+        grass_by_star = dict(zip(first["from_star"].astype(str), eaten.tolist()))
+
     # Reporte de estrellas visitadas
     stars_report = []
     for i, star_id in enumerate(visited_seq, 1):
@@ -75,20 +83,9 @@ def generate_detailed_report(
                 constellation_color = getattr(const, "color", "Sin color")
                 break
 
-        # Buscar información de consumo y tiempo en las filas de pasos
-        grass_consumed = 0.0
+        # Consumo y tiempo de la estancia en esta estrella
+        grass_consumed = grass_by_star.get(str(star_id), 0.0)
         time_invested = 0.0
-        
-        # Buscar todas las filas donde esta estrella es origen (estancia)
-        for step in steps_rows:
-            if str(step.get("from_star")) == str(star_id):
-                try:
-                    grass_before = float(step.get("grass_before", 0.0))
-                    grass_after = float(step.get("grass_after", 0.0))
-                    grass_consumed = max(0.0, grass_before - grass_after)
-                except Exception:
-                    grass_consumed = 0.0
-                break
 
         stars_report.append({
             "Orden": i,
@@ -105,13 +102,12 @@ def generate_detailed_report(
     df_stars.to_json(Path(output_dir) / "estrellas_visitadas.json", orient="records", force_ascii=False)
 
     # Reporte de pasos
-    df_steps = pd.DataFrame(steps_rows)
     df_steps.to_csv(Path(output_dir) / "pasos_completos.csv", index=False)
     df_steps.to_json(Path(output_dir) / "pasos_completos.json", orient="records", force_ascii=False)
 
     # Resumen ejecutivo
     try:
-        total_distance = sum(float(s.get("distance", 0.0)) for s in steps_rows)
+        total_distance = float(df_steps["distance"].sum()) if len(df_steps) else 0.0
     except Exception:
         total_distance = 0.0
     try:
@@ -140,7 +136,7 @@ def generate_detailed_report(
     return {
         "summary": summary,
         "stars": stars_report,
-        "steps": steps_rows,
+        "steps": df_steps,            # DataFrame: una fila por paso
     }
 
 
@@ -0,0 +1,93 @@
+"""
+Planificador anytime: entrega una ruta casi de inmediato y la va mejorando
+mientras quede presupuesto (tiempo de reloj y/o expansiones del beam).
+"""
+from __future__ import annotations
+from typing import Callable, Iterator, Optional, Sequence, Tuple
+
+from core.models.donkey import Donkey
+from core.routing.dynamic_route import (
+    BEAM, RESTART_WEIGHTS, SearchBudget, _beam_search,
+)
+from core.sim.compiled import as_compiled
+from core.sim.rules import (
+    RouteResult, compute_route_step2, compute_route_step3, _norm_id, _parse_health,
+)
+
+# Anchos del beam en cada ronda de refinamiento
+WIDENING: Tuple[int, ...] = (1, 4, BEAM, 32, 128, 512, 2048)
+
+
+def _route_key(r: RouteResult):
+    """Orden de calidad: vivo, más estrellas, más vida, más energía."""
+    return (not r.died, len(r.path), r.remaining_life, r.remaining_energy)
+
+
+def iter_anytime_routes(G, u, origin_id: str, health_txt: str,
+                        energy_pct: float, hay_kg: float, life_ly: float,
+                        time_budget: Optional[float] = 1.0,
+                        max_expansions: Optional[int] = None,
+                        rules: str = "step3",
+                        widths: Sequence[int] = WIDENING,
+                        weights: Sequence[Tuple[float, float, float]] = RESTART_WEIGHTS,
+                        ) -> Iterator[RouteResult]:
+    """
+    Genera RouteResult cada vez mejores (según _route_key):
+    1) la heurística voraz del punto elegido ('step2' o 'step3'), inmediata;
+    2) beam search con ancho creciente ('widths') y cada juego de 'weights'.
+       Cada ruta del beam se re-evalúa con las reglas del punto elegido
+       (compute_route_step*(path=...)), así todas las rutas son comparables.
+    Se detiene al agotar 'time_budget' (segundos) o 'max_expansions'; si ambos
+    son None corre todas las rondas. La última ruta producida es la mejor.
+    """
+    budget = SearchBudget.start(time_budget, max_expansions)
+    cu = as_compiled(u, G)
+
+    def evaluate(path=None) -> RouteResult:
+        if rules == "step2":
+            return compute_route_step2(G, origin_id, health_txt, energy_pct, hay_kg, life_ly,
+                                       path=path)
+        return compute_route_step3(G, cu, origin_id, health_txt, energy_pct, hay_kg, life_ly,
+                                   path=path)
+
+    best = evaluate()
+    yield best
+
+    health = _parse_health(health_txt)
+    s0 = G.index_of.get(_norm_id(origin_id))
+    if s0 is None or health == "muerto":
+        return
+    donkey = Donkey(health=health, age=0.0, energy_pct=float(energy_pct),
+                    grass_kg=float(hay_kg), life_ly=float(life_ly))
+
+    seen = {tuple(best.path)}
+    for width in widths:
+        for w in weights:
+            if budget.exhausted():
+                return
+            res = _beam_search(G, cu, s0, donkey, width, *w, True, True, None, budget)
+            path = [G.ids[i] for i in res.path]
+            if tuple(path) in seen:
+                continue
+            seen.add(tuple(path))
+            cand = evaluate(path)
+            if _route_key(cand) > _route_key(best):
+                best = cand
+                yield best
+
+
+def plan_anytime(G, u, origin_id: str, health_txt: str,
+                 energy_pct: float, hay_kg: float, life_ly: float,
+                 on_result: Optional[Callable[[RouteResult], None]] = None,
+                 **kwargs) -> RouteResult:
+    """
+    Consume iter_anytime_routes y devuelve la mejor ruta al agotar el presupuesto.
+    'on_result' recibe cada mejora apenas aparece (p. ej. para redibujar la UI).
+    """
+    best = None
+    for res in iter_anytime_routes(G, u, origin_id, health_txt, energy_pct, hay_kg, life_ly,
+                                   **kwargs):
+        best = res
+        if on_result is not None:
+            on_result(res)
+    return best
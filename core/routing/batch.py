@@ -0,0 +1,136 @@
+"""
+Rutas desde muchos orígenes a la vez (elegir la mejor estrella de partida).
+
+Corre el punto 2 (compute_route_step2), el punto 3 (run_full_step3) y el beam
+(route_dynamic_beam) desde cada origen pedido y arma una tabla ordenada.
+Los workers comparten un solo grafo compilado vía SharedGraph.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence
+
+from core.graph.shared import SharedGraph, init_worker, worker_graph
+from core.graph.space_graph import SpaceGraph
+from core.models.donkey import Donkey
+from core.routing.dynamic_route import BEAM, ALPHA, BETA, GAMMA, _beam_search
+from core.sim.compiled import CompiledUniverse, as_compiled
+from core.sim.rules import compute_route_step2, _parse_health
+from core.sim.simulator import run_full_step3
+
+METHODS = ("step2", "step3", "beam")
+
+
+@dataclass
+class OriginRow:
+    """Resultado de un método desde un origen (una fila de la tabla)."""
+    origin: str
+    method: str
+    stars: int                 # estrellas distintas visitadas (incluye el origen)
+    distance: float            # años luz recorridos
+    remaining_life: float
+    remaining_energy: float
+    died: bool
+    reason: str
+    rank: int = 0              # posición dentro de su método (1 = mejor)
+
+
+def _path_distance(G: SpaceGraph, path: Sequence[str]) -> float:
+    total = 0.0
+    for a, b in zip(path, path[1:]):
+        k = G.edge_slot(a, b)
+        if k >= 0:
+            total += float(G.distance[k])
+    return total
+
+
+def _run_origin(G: SpaceGraph, cu: CompiledUniverse, origin: str, method: str,
+                health_txt: str, energy_pct: float, hay_kg: float, life_ly: float,
+                beam_width: int) -> OriginRow:
+    if method == "step2":
+        r = compute_route_step2(G, origin, health_txt, energy_pct, hay_kg, life_ly)
+        return OriginRow(origin, method, len(set(r.path)), _path_distance(G, r.path),
+                         r.remaining_life, r.remaining_energy, r.died, r.reason)
+    if method == "step3":
+        log = run_full_step3(cu, G, origin, health_txt, energy_pct, hay_kg, life_ly)
+        return OriginRow(origin, method, len(set(log.visited_order)),
+                         sum(s.distance for s in log.steps), log.final_life,
+                         log.final_energy, log.died, log.stop_reason)
+    if method == "beam":
+        s0 = G.index_of.get(str(origin))
+        if s0 is None:
+            return OriginRow(origin, method, 0, 0.0, float(life_ly), float(energy_pct),
+                             False, "Origen inexistente en el grafo")
+        health = _parse_health(health_txt)
+        if health == "muerto":
+            # como compute_route_step2 / compute_route_step3: ruta trivial, sin buscar
+            return OriginRow(origin, method, 1, 0.0, float(life_ly), float(energy_pct),
+                             True, "Burro muerto")
+        donkey = Donkey(health=health, age=0.0,
+                        energy_pct=float(energy_pct), grass_kg=float(hay_kg),
+                        life_ly=float(life_ly))
+        res = _beam_search(G, cu, s0, donkey, beam_width, ALPHA, BETA, GAMMA,
+                           True, True, None)
+        path = [G.ids[i] for i in res.path]
+        # estado final de la mejor ruta del beam (el origen sin estancia si no se movió)
+        died = res.life <= 0.0 or res.energy <= 0.0
+        return OriginRow(origin, method, len(path), _path_distance(G, path),
+                         res.life, res.energy, died,
+                         "Sin energía o vida" if died else "Fin del beam")
+    raise ValueError(f"Método desconocido: {method}")
+
+
+def _origin_task(args) -> List[OriginRow]:
+    """Tarea de worker: todos los métodos desde un origen, sobre el grafo compartido."""
+    origin, methods, params, beam_width = args
+    G, cu = worker_graph()
+    return [_run_origin(G, cu, origin, m, *params, beam_width) for m in methods]
+
+
+def rank_origins(rows: Iterable[OriginRow],
+                 methods: Sequence[str] = METHODS) -> List[OriginRow]:
+    """
+    Ordena por método (en el orden de 'methods') y dentro de cada uno:
+    vivo, más estrellas, más vida, más energía, menos distancia, id de origen.
+    Completa 'rank' (1 = mejor origen del método).
+    """
+    out: List[OriginRow] = []
+    rows = list(rows)
+    for m in methods:
+        group = sorted((r for r in rows if r.method == m),
+                       key=lambda r: (r.died, -r.stars, -r.remaining_life,
+                                      -r.remaining_energy, r.distance, r.origin))
+        for i, r in enumerate(group, start=1):
+            r.rank = i
+        out.extend(group)
+    return out
+
+
+def route_from_origins(G: SpaceGraph, u, health_txt: str, energy_pct: float,
+                       hay_kg: float, life_ly: float,
+                       origins: Optional[Sequence[str]] = None,
+                       methods: Sequence[str] = METHODS,
+                       beam_width: int = BEAM,
+                       workers: Optional[int] = None) -> List[OriginRow]:
+    """
+    Corre 'methods' desde cada estrella de 'origins' (None = todas las del grafo)
+    con los mismos parámetros del burro y devuelve la tabla ordenada (rank_origins).
+    workers=1 corre todo en el proceso actual; si no, un ProcessPoolExecutor
+    cuyos workers se adjuntan una vez al grafo y universo compilados compartidos.
+    """
+    cu = as_compiled(u, G)
+    origins = list(G.ids) if origins is None else [str(o) for o in origins]
+    methods = tuple(methods)
+    params = (health_txt, float(energy_pct), float(hay_kg), float(life_ly))
+
+    if workers == 1 or len(origins) <= 1:
+        rows = [_run_origin(G, cu, o, m, *params, beam_width)
+                for o in origins for m in methods]
+    else:
+        tasks = [(o, methods, params, beam_width) for o in origins]
+        with SharedGraph(G, cu) as shared, ProcessPoolExecutor(
+                max_workers=workers, initializer=init_worker, initargs=(shared.spec,)) as pool:
+            rows = [r for chunk in pool.map(_origin_task, tasks,
+                                            chunksize=max(1, len(tasks) // 64))
+                    for r in chunk]
+    return rank_origins(rows, methods)
@@ -1,31 +1,175 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Tuple
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
 import heapq
+import numpy as np
 from core.graph.space_graph import SpaceGraph
+from core.graph.shared import SharedGraph, init_worker, worker_graph
 from core.models.donkey import Donkey
-from core.models.enums import StarType
+from core.sim.compiled import CompiledUniverse, as_compiled
 from core.sim.rules import eat_energy_gain
 
 
-@dataclass
+@dataclass(slots=True)
 class State:
-    node: str
+    """
+    Estado del beam. 'visited' es un bitset (bytearray, bit i <=> nodo i) y
+    el camino se reconstruye con 'parent', así que ningún estado copia la ruta.
+    La máscara de un candidato se materializa solo si entra al beam; probar un
+    bit es O(1) y copiarla un memcpy de n/8 bytes.
+    """
+    node: int
+    life: float
+    energy: float
+    grass: float
+    visited: Optional[bytearray]       # bit i <=> nodo i visitado (None: liberada)
+    stars: int                         # cantidad de estrellas visitadas
+    score: float
+    parent: Optional[State] = None
+    vhash: int = 0                     # hash Zobrist del conjunto de visitados
+
+    def path(self) -> List[int]:
+        out: List[int] = []
+        s: Optional[State] = self
+        while s is not None:
+            out.append(s.node)
+            s = s.parent
+        out.reverse()
+        return out
+
+
+def _bits_of(n: int, i: int) -> bytearray:
+    """Bitset de n nodos con solo el nodo i."""
+    b = bytearray((n + 7) >> 3)
+    b[i >> 3] = 1 << (i & 7)
+    return b
+
+
+def _has_bit(b: bytearray, i: int) -> int:
+    return b[i >> 3] >> (i & 7) & 1
+
+
+def _with_bit(b: bytearray, i: int) -> bytearray:
+    """Copia de 'b' con el nodo i agregado."""
+    out = bytearray(b)
+    out[i >> 3] |= 1 << (i & 7)
+    return out
+
+
+@dataclass
+class BeamStats:
+    """Contadores de una corrida de beam search (se llenan si se pasan a route_dynamic_beam)."""
+    layers: int = 0
+    candidates: int = 0        # candidatos factibles generados
+    tt_hits: int = 0           # candidatos cuyo (nodo, visitados) ya estaba en la tabla
+    pruned: int = 0            # estados descartados por dominancia de Pareto
+
+
+@dataclass
+class SearchBudget:
+    """
+    Presupuesto compartido entre corridas: reloj y/o cantidad de expansiones.
+    Se revisa una vez por capa; al agotarse, el beam devuelve lo mejor que tenga.
+    """
+    deadline: Optional[float] = None       # instante límite en time.monotonic()
+    max_expansions: Optional[int] = None   # candidatos generados en total
+    expanded: int = 0
+
+    @classmethod
+    def start(cls, seconds: Optional[float] = None,
+              expansions: Optional[int] = None) -> "SearchBudget":
+        deadline = time.monotonic() + seconds if seconds is not None else None
+        return cls(deadline=deadline, max_expansions=expansions)
+
+    def spend(self, n: int):
+        self.expanded += n
+
+    def exhausted(self) -> bool:
+        if self.max_expansions is not None and self.expanded >= self.max_expansions:
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+
+@dataclass
+class BeamResult:
+    """Mejor estado de una corrida: camino (índices de nodo) y recursos al final."""
+    path: List[int]
     life: float
     energy: float
     grass: float
-    visited: frozenset[str]
     score: float
-    path: Tuple[str, ...]
 
 
+# Valores por defecto; route_dynamic_beam los acepta como parámetros
 BEAM = 10
 ALPHA, BETA, GAMMA = 0.1, 0.01, 0.01
 
+# Pesos (alpha, beta, gamma) de los reinicios de route_dynamic_beam_parallel
+RESTART_WEIGHTS: List[Tuple[float, float, float]] = [
+    (ALPHA, BETA, GAMMA),
+    (0.0, BETA, GAMMA),
+    (0.05, BETA, GAMMA),
+    (0.2, BETA, GAMMA),
+    (ALPHA, 0.05, GAMMA),
+    (ALPHA, BETA, 0.05),
+    (0.05, 0.05, 0.05),
+    (0.2, 0.0, 0.0),
+]
+
+
+@lru_cache(maxsize=4)
+def _zobrist(n: int):
+    """Claves Zobrist de 64 bits por nodo (semilla fija: mismo hash en cada corrida)."""
+    keys = np.random.default_rng(0x5EED).integers(0, 2**63, size=n, dtype=np.uint64)
+    return keys, keys.tolist()
+
+
+def _dominates(a, b) -> bool:
+    """a = (life, energy, grass) domina a b si no es peor en ningún recurso."""
+    return a[0] >= b[0] and a[1] >= b[1] and a[2] >= b[2]
+
+
+def _pareto_keep(keys, res, stats: Optional[BeamStats]) -> List[int]:
+    """
+    Tabla de transposición de una capa: agrupa por clave (nodo, hash de visitados)
+    y conserva el frente de Pareto de (life, energy, grass) de cada grupo.
+    Ante empates gana el que apareció primero. Devuelve las posiciones
+    sobrevivientes en su orden original.
+    """
+    table: Dict[tuple, List[int]] = {}
+    alive = [True] * len(keys)
+    hits = pruned = 0
+    for i, k in enumerate(keys):
+        front = table.get(k)
+        if front is None:
+            table[k] = [i]
+            continue
+        hits += 1
+        if any(_dominates(res[j], res[i]) for j in front):
+            alive[i] = False
+            pruned += 1
+            continue
+        keep = []
+        for j in front:
+            if _dominates(res[i], res[j]):
+                alive[j] = False
+                pruned += 1
+            else:
+                keep.append(j)
+        keep.append(i)
+        table[k] = keep
+    if stats is not None:
+        stats.tt_hits += hits
+        stats.pruned += pruned
+    return [i for i, a in enumerate(alive) if a]
 
-def simulate_visit(G: SpaceGraph, node: str, energy: float, grass: float, life: float, health) -> tuple[float, float, float]:
+
+def simulate_visit(cu: CompiledUniverse, node: int, energy: float, grass: float, life: float, health) -> tuple[float, float, float]:
     """Aplica reglas de comer/investigar y retorna (energy, grass, life)"""
-    n = G.G.nodes[node]
-    r = n["research"]
+    x_time_per_kg, invest_energy_per_x, disease_life_delta = cu.research(node)
     # comer si <50%
     eat_time_budget = 0.0
     if energy < 50.0:
@@ -33,27 +177,78 @@ def simulate_visit(G: SpaceGraph, node: str, energy: float, grass: float, life:
         # kg posibles por tiempo disponible
         # sse usa x_time_per_kg como costo temporal absoluto y su presupuesto relativo 0.5
         # por simplicidad, 1 unidad total de estadía => kg_max = 0.5 / x_time_per_kg
-        kg_max = max(0.0, 0.5 / max(r.x_time_per_kg, 1e-9))
+        kg_max = max(0.0, 0.5 / max(x_time_per_kg, 1e-9))
         kg = min(kg_max, grass)
         energy += eat_energy_gain(health, kg)
         grass -= kg
     # investigación consume sobre el tiempo restante 0.5
     invest_time = 0.5
-    energy -= r.invest_energy_per_x * invest_time
+    energy -= invest_energy_per_x * invest_time
     # enfermedades/beneficios
-    life += r.disease_life_delta
+    life += disease_life_delta
     return energy, grass, life
 
 
-def route_dynamic_beam(G: SpaceGraph, start: str, donkey: Donkey) -> List[str]:
+def route_dynamic_beam(G: SpaceGraph, u, start: str, donkey: Optional[Donkey] = None,
+                       beam_width: int = BEAM, alpha: float = ALPHA,
+                       beta: float = BETA, gamma: float = GAMMA,
+                       batched: bool = False, prune: bool = True,
+                       stats: Optional[BeamStats] = None,
+                       budget: Optional[SearchBudget] = None) -> List[str]:
+    """
+    Beam search sobre (vida, energía, pasto).
+    score = estrellas - alpha*vida_gastada + beta*vida + gamma*energía
+    'u' puede ser el universo o un CompiledUniverse (se compila una sola vez).
+    batched=True expande cada capa en una sola pasada NumPy; conviene para
+    beams anchos (cientos o miles) y da la misma ruta que el modo escalar.
+    prune=True descarta, antes de elegir el top, los candidatos en el mismo nodo
+    con los mismos visitados y (vida, energía, pasto) dominados. Si se pasa
+    'stats' (BeamStats) se acumulan los contadores de la corrida.
+    Con 'budget' (SearchBudget) la búsqueda corta al agotarlo y devuelve la mejor
+    ruta encontrada hasta ese momento.
+    La forma vieja route_dynamic_beam(G, start, donkey) da TypeError: el grafo ya
+    no guarda la investigación de las estrellas, hay que pasar el universo.
+    """
+    if donkey is None:
+        if isinstance(start, Donkey):
+            raise TypeError("route_dynamic_beam(G, start, donkey) ya no se admite: el grafo no "
+                            "guarda la investigación; usar route_dynamic_beam(G, u, start, donkey) "
+                            "con el universo o su CompiledUniverse")
+        raise TypeError("route_dynamic_beam() necesita 'donkey'")
+    cu = as_compiled(u, G)
+    s0 = G.index_of.get(str(start))
+    if s0 is None:
+        return [str(start)]
+    res = _beam_search(G, cu, s0, donkey, beam_width, alpha, beta, gamma, batched, prune, stats,
+                       budget)
+    return [G.ids[i] for i in res.path]
+
+
+def _beam_search(G: SpaceGraph, cu: CompiledUniverse, s0: int, donkey: Donkey,
+                 beam_width: int, alpha: float, beta: float, gamma: float,
+                 batched: bool, prune: bool, stats: Optional[BeamStats],
+                 budget: Optional[SearchBudget] = None) -> BeamResult:
+    if batched:
+        return _route_beam_batched(G, cu, s0, donkey, beam_width, alpha, beta, gamma, prune,
+                                   stats, budget)
+    return _route_beam_scalar(G, cu, s0, donkey, beam_width, alpha, beta, gamma, prune,
+                              stats, budget)
+
+
+def _route_beam_scalar(G: SpaceGraph, cu: CompiledUniverse, s0: int, donkey: Donkey,
+                       beam_width: int, alpha: float, beta: float, gamma: float,
+                       prune: bool, stats: Optional[BeamStats],
+                       budget: Optional[SearchBudget]) -> BeamResult:
+    _, zob = _zobrist(G.n)
     start_state = State(
-        node=start,
+        node=s0,
         life=donkey.life_ly,
         energy=donkey.energy_pct,
         grass=donkey.grass_kg,
-        visited=frozenset([start]),
+        visited=_bits_of(G.n, s0),
+        stars=1,
         score=0.0,
-        path=(start,)
+        vhash=zob[s0],
     )
     beam: list[State] = [start_state]
 
@@ -61,11 +256,13 @@ def route_dynamic_beam(G: SpaceGraph, start: str, donkey: Donkey) -> List[str]:
 
 
     while beam:
+        if budget is not None and budget.exhausted():
+            break
         cand: list[State] = []
         for s in beam:
         # expandir vecinos
-            for v, dist in G.neighbors(s.node):
-                if v in s.visited:
+            for v, dist in G.neighbors_idx(s.node):
+                if _has_bit(s.visited, v):
                     continue
                 life = s.life - dist
                 if life <= 0:
@@ -73,24 +270,211 @@ def route_dynamic_beam(G: SpaceGraph, start: str, donkey: Donkey) -> List[str]:
                 energy = s.energy
                 grass = s.grass
                 # aplicar efecto hiper-gigante si corresponde
-                if G.G.nodes[v]["type"] == StarType.HYPERGIANT:
+                if G.hypergiant[v]:
                     energy *= 1.5
                     grass *= 2.0
                 # simular visita
-                energy, grass, life = simulate_visit(G, v, energy, grass, life, donkey.health)
+                energy, grass, life = simulate_visit(cu, v, energy, grass, life, donkey.health)
                 if energy <= 0 or life <= 0:
                     continue
-                path = s.path + (v,)
-                visited = s.visited | {v}
-                stars = len(visited)
+                stars = s.stars + 1
                 cost = (donkey.life_ly - life)
-                score = stars - ALPHA*cost + BETA*life + GAMMA*energy
-                ns = State(v, life, energy, grass, frozenset(visited), score, path)
+                score = stars - alpha*cost + beta*life + gamma*energy
+                ns = State(v, life, energy, grass, None, stars, score, s, s.vhash ^ zob[v])
                 cand.append(ns)
-                if stars > len(best.visited) or (stars == len(best.visited) and ns.score > best.score):
+                if stars > best.stars or (stars == best.stars and ns.score > best.score):
                     best = ns
         if not cand:
             break
-        # seleccionar top BEAM por score
-        beam = heapq.nlargest(BEAM, cand, key=lambda x: x.score)
-    return list(best.path)
\ No newline at end of file
+        if budget is not None:
+            budget.spend(len(cand))
+        if stats is not None:
+            stats.layers += 1
+            stats.candidates += len(cand)
+        if prune:
+            keys = [(c.node, c.vhash) for c in cand]
+            if len(set(keys)) < len(keys):
+                keep = _pareto_keep(keys, [(c.life, c.energy, c.grass) for c in cand], stats)
+                cand = [cand[i] for i in keep]
+        # seleccionar top beam_width por score
+        prev, beam = beam, heapq.nlargest(beam_width, cand, key=lambda x: x.score)
+        for ns in beam:
+            ns.visited = _with_bit(ns.parent.visited, ns.node)
+        # los ancestros solo sirven para reconstruir el camino: liberar sus máscaras
+        for s in prev:
+            s.visited = None
+    return BeamResult(best.path(), best.life, best.energy, best.grass, best.score)
+
+
+def _top_k(score: np.ndarray, k: int) -> np.ndarray:
+    """
+    Índices de los k mayores scores, ordenados como heapq.nlargest
+    (score descendente; empates por posición) usando argpartition.
+    """
+    m = len(score)
+    if m > k:
+        part = np.argpartition(-score, k - 1)[:k]
+        thr = score[part].min()
+        above = np.flatnonzero(score > thr)
+        ties = np.flatnonzero(score == thr)[:k - len(above)]
+        sel = np.concatenate([above, ties])
+    else:
+        sel = np.arange(m)
+    return sel[np.lexsort((sel, -score[sel]))]
+
+
+def _route_beam_batched(G: SpaceGraph, cu: CompiledUniverse, s0: int, donkey: Donkey,
+                        beam_width: int, alpha: float, beta: float, gamma: float,
+                        prune: bool, stats: Optional[BeamStats],
+                        budget: Optional[SearchBudget]) -> BeamResult:
+    """
+    Variante vectorizada: la capa es un struct-of-arrays y los visitados un
+    bitset (k x n/8 bytes). Todos los pares (estado, vecino) de la capa se
+    evalúan juntos: vida/energía/pasto, hiper-gigantes, investigación,
+    factibilidad y score.
+    """
+    life0 = float(donkey.life_ly)
+    gain = eat_energy_gain(donkey.health, 1.0)
+    kg_cap = np.maximum(0.0, 0.5 / np.maximum(cu.x_time_per_kg, 1e-9))
+
+    # capa actual
+    node = np.array([s0], dtype=np.int64)
+    life = np.array([life0])
+    energy = np.array([float(donkey.energy_pct)])
+    grass = np.array([float(donkey.grass_kg)])
+    stars = 1
+    bits = np.zeros((1, (G.n + 7) // 8), dtype=np.uint8)
+    bits[0, s0 >> 3] = 1 << (s0 & 7)
+    zob, _ = _zobrist(G.n)
+    vhash = zob[[s0]]
+
+    # historia para reconstruir caminos: por capa, (nodos, padre en la capa anterior)
+    history: List[tuple[np.ndarray, np.ndarray]] = [(node, np.array([-1]))]
+    best_layer, best_parent, best_node = -1, -1, s0
+    best = (float(life[0]), float(energy[0]), float(grass[0]), 0.0)
+
+    while len(node):
+        if budget is not None and budget.exhausted():
+            break
+        # --- pares (estado, vecino) de toda la capa ---
+        a, b = G.indptr[node], G.indptr[node + 1]
+        deg = b - a
+        src = np.repeat(np.arange(len(node)), deg)
+        slot = np.repeat(a - (np.cumsum(deg) - deg), deg) + np.arange(deg.sum())
+        v = G.indices[slot].astype(np.int64)
+        dist = G.distance[slot]
+
+        ok = ~G.blocked[slot]
+        ok &= ((bits[src, v >> 3] >> (v & 7).astype(np.uint8)) & 1) == 0
+        c_life = life[src] - dist
+        ok &= c_life > 0
+
+        # --- hiper-gigantes + estancia (mismas reglas que simulate_visit) ---
+        hyper = G.hypergiant[v]
+        c_energy = np.where(hyper, energy[src] * 1.5, energy[src])
+        c_grass = np.where(hyper, grass[src] * 2.0, grass[src])
+        eat = c_energy < 50.0
+        kg = np.where(eat, np.minimum(kg_cap[v], c_grass), 0.0)
+        c_energy = np.where(eat, c_energy + kg * gain, c_energy)
+        c_grass = np.where(eat, c_grass - kg, c_grass)
+        c_energy = c_energy - cu.invest_energy_per_x[v] * 0.5
+        c_life = c_life + cu.disease_life_delta[v]
+        ok &= (c_energy > 0) & (c_life > 0)
+
+        idx = np.flatnonzero(ok)
+        if not len(idx):
+            break
+        stars += 1
+        score = stars - alpha*(life0 - c_life[idx]) + beta*c_life[idx] + gamma*c_energy[idx]
+
+        # mejor candidato (todos tienen las mismas estrellas: gana el primer score máximo)
+        j = int(np.argmax(score))
+        k = idx[j]
+        best_layer, best_parent, best_node = len(history) - 1, int(src[k]), int(v[k])
+        best = (float(c_life[k]), float(c_energy[k]), float(c_grass[k]), float(score[j]))
+
+        if budget is not None:
+            budget.spend(len(idx))
+        if stats is not None:
+            stats.layers += 1
+            stats.candidates += len(idx)
+        if prune:
+            c_hash = vhash[src[idx]] ^ zob[v[idx]]
+            # solo los grupos con clave repetida necesitan la tabla
+            order = np.lexsort((c_hash, v[idx]))
+            same = (v[idx][order][1:] == v[idx][order][:-1]) & (c_hash[order][1:] == c_hash[order][:-1])
+            if same.any():
+                dup = np.zeros(len(idx), dtype=bool)
+                dup[order[1:][same]] = True
+                dup[order[:-1][same]] = True
+                pos = np.flatnonzero(dup)
+                keys = list(zip(v[idx][pos].tolist(), c_hash[pos].tolist()))
+                res = list(zip(c_life[idx][pos].tolist(), c_energy[idx][pos].tolist(),
+                               c_grass[idx][pos].tolist()))
+                dead = np.ones(len(pos), dtype=bool)
+                dead[_pareto_keep(keys, res, stats)] = False
+                live = np.ones(len(idx), dtype=bool)
+                live[pos[dead]] = False
+                idx, score = idx[live], score[live]
+
+        # --- top beam_width y nueva capa ---
+        sel = idx[_top_k(score, beam_width)]
+        parent = src[sel]
+        node = v[sel]
+        if prune:
+            vhash = vhash[parent] ^ zob[node]
+        life, energy, grass = c_life[sel], c_energy[sel], c_grass[sel]
+        bits = bits[parent]
+        bits[np.arange(len(node)), node >> 3] |= (1 << (node & 7)).astype(np.uint8)
+        history.append((node, parent))
+
+    path = [best_node]
+    layer, pos = best_layer, best_parent
+    while layer >= 0:
+        nodes, parents = history[layer]
+        path.append(int(nodes[pos]))
+        layer, pos = layer - 1, int(parents[pos])
+    path.reverse()
+    return BeamResult(path, *best)
+
+
+# ---------- Reinicios en paralelo ----------
+
+def _beam_task(args) -> BeamResult:
+    """Tarea de worker: una corrida con sus pesos sobre el grafo compartido."""
+    s0, donkey, beam_width, weights, batched, prune = args
+    G, cu = worker_graph()
+    return _beam_search(G, cu, s0, donkey, beam_width, *weights, batched, prune, None)
+
+
+def route_dynamic_beam_parallel(G: SpaceGraph, u, start: str, donkey: Donkey,
+                                weights: Sequence[Tuple[float, float, float]] = RESTART_WEIGHTS,
+                                beam_width: int = BEAM, batched: bool = True,
+                                prune: bool = True, workers: Optional[int] = None) -> List[str]:
+    """
+    Corre un beam independiente por cada (alpha, beta, gamma) de 'weights'
+    en un ProcessPoolExecutor y devuelve la mejor ruta.
+    Los workers se adjuntan una vez a los arrays del grafo en memoria compartida
+    (no se picklea SpaceGraph por tarea). La fusión es determinista: gana la ruta
+    con más estrellas, luego más vida, luego más energía, y ante empate el
+    primer juego de pesos; el resultado no depende de 'workers'.
+    workers=1 corre todo en el proceso actual.
+    """
+    cu = as_compiled(u, G)
+    s0 = G.index_of.get(str(start))
+    if s0 is None:
+        return [str(start)]
+    weights = list(weights)
+    tasks = [(s0, donkey, beam_width, tuple(w), batched, prune) for w in weights]
+
+    if workers == 1 or len(weights) <= 1:
+        results = [_beam_search(G, cu, s0, donkey, beam_width, *w, batched, prune, None)
+                   for w in weights]
+    else:
+        with SharedGraph(G, cu) as shared, ProcessPoolExecutor(
+                max_workers=workers, initializer=init_worker, initargs=(shared.spec,)) as pool:
+            results = list(pool.map(_beam_task, tasks))
+
+    best = max(range(len(results)),
+               key=lambda i: (len(results[i].path), results[i].life, results[i].energy, -i))
+    return [G.ids[i] for i in results[best].path]
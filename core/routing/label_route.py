@@ -0,0 +1,208 @@
+"""
+Router por etiquetas (label-setting) con las reglas del punto 3.
+
+Cada etiqueta es un camino parcial: nodo actual, estrellas visitadas y los
+recursos (vida, energía, pasto) tras la estancia. Se expande por capas (una
+estrella más por capa) con las mismas reglas de estancia y salto que
+compute_route_step3, y se poda con:
+- dominancia de Pareto por (nodo, visitados) sobre (vida, energía, pasto);
+- cubetas: una etiqueta por (nodo, vida, energía, pasto) redondeados a 'buckets';
+- tope de etiquetas por nodo y capa ('max_labels');
+- cota: estrellas + alcanzables (caminos mínimos) no supera a la ruta voraz.
+La cota es admisible; las otras tres podas son heurísticas: la regla de comer
+solo con energía < 50% no es monótona, así que más energía no siempre es mejor.
+"""
+from __future__ import annotations
+from bisect import bisect_right
+from dataclasses import dataclass, field
+import heapq
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from core.graph.space_graph import SpaceGraph
+from core.routing.dynamic_route import (
+    State, _bits_of, _has_bit, _pareto_keep, _with_bit, _zobrist,
+)
+from core.sim.compiled import as_compiled
+from core.sim.rules import (
+    RouteResult, compute_route_step3, _norm_id, _parse_health, _step3_rates, _stay_step3,
+)
+
+# Tamaño de cubeta de (vida, energía, pasto); None desactiva las cubetas
+BUCKETS: Tuple[float, float, float] = (1.0, 1.0, 0.5)
+MAX_LABELS = 64
+# Por encima de esta cantidad de alcanzables no se arma la tabla de caminos mínimos
+_MAX_BOUND_NODES = 2000
+
+
+@dataclass
+class LabelStats:
+    """Contadores de route_step3_labels."""
+    layers: int = 0
+    labels: int = 0            # etiquetas factibles generadas
+    dominated: int = 0         # descartadas por dominancia de Pareto
+    bucketed: int = 0          # descartadas por compartir cubeta
+    capped: int = 0            # descartadas por el tope por nodo
+    bounded: int = 0           # descartadas por la cota de estrellas
+
+
+@dataclass
+class LabelResult:
+    """Mejor ruta (máximo de estrellas) y, si se pidió, el frente de Pareto."""
+    route: RouteResult
+    frontier: List[RouteResult] = field(default_factory=list)
+    stats: LabelStats = field(default_factory=LabelStats)
+
+
+def _alive(s: State) -> bool:
+    return s.energy > 0.0 and s.life > 0.0
+
+
+def _label_key(s: State):
+    """Orden de la mejor etiqueta: más estrellas, vivo, más vida, más energía."""
+    return (s.stars, _alive(s), s.life, s.energy)
+
+
+def _reach_rows(G: SpaceGraph, o: int, life: float) -> Optional[Dict[int, List[float]]]:
+    """
+    Distancias mínimas (ordenadas) entre los nodos a distancia <= 'life' del origen.
+    Devuelve {nodo: distancias ordenadas a los demás alcanzables} o None si son demasiados.
+    """
+    dist = {o: 0.0}
+    heap = [(0.0, o)]
+    while heap:
+        d, i = heapq.heappop(heap)
+        if d > dist.get(i, np.inf):
+            continue
+        for v, w in G.neighbors_idx(i):
+            nd = d + w
+            if w > 0.0 and nd <= life and nd < dist.get(v, np.inf):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    nodes = list(dist)
+    k = len(nodes)
+    if k > _MAX_BOUND_NODES:
+        return None
+    loc = {g: i for i, g in enumerate(nodes)}
+    sp = np.full((k, k), np.inf)
+    np.fill_diagonal(sp, 0.0)
+    for i, g in enumerate(nodes):
+        for v, w in G.neighbors_idx(g):
+            j = loc.get(v)
+            if j is not None and w > 0.0:
+                sp[i, j] = min(sp[i, j], w)
+    for m in range(k):
+        np.minimum(sp, sp[:, m, None] + sp[None, m, :], out=sp)
+    sp.sort(axis=1)
+    return {g: sp[i].tolist() for i, g in enumerate(nodes)}
+
+
+def _frontier(labels: List[State]) -> List[State]:
+    """Etiquetas vivas no dominadas en (estrellas, vida, energía, pasto)."""
+    out: List[State] = []
+    for s in sorted((s for s in labels if _alive(s)),
+                    key=lambda s: (-s.stars, -s.life, -s.energy, -s.grass)):
+        if any(f.stars >= s.stars and f.life >= s.life and f.energy >= s.energy
+               and f.grass >= s.grass for f in out):
+            continue
+        out.append(s)
+    return out
+
+
+def route_step3_labels(G: SpaceGraph, u, origin_id: str, health_txt: str,
+                       energy_pct: float, hay_kg: float, life_ly: float,
+                       max_labels: int = MAX_LABELS,
+                       buckets: Optional[Tuple[float, float, float]] = BUCKETS,
+                       frontier: bool = False,
+                       stats: Optional[LabelStats] = None) -> LabelResult:
+    """
+    Ruta que maximiza las estrellas visitadas con las reglas de compute_route_step3.
+    La ruta elegida (y cada ruta del frente si frontier=True) se re-evalúa con
+    compute_route_step3(path=...), así que los recursos reportados son los de siempre.
+    Nunca devuelve menos estrellas que la heurística voraz.
+    """
+    st = stats if stats is not None else LabelStats()
+    cu = as_compiled(u, G)
+    greedy = compute_route_step3(G, cu, origin_id, health_txt, energy_pct, hay_kg, life_ly)
+    health = _parse_health(health_txt)
+    o = G.index_of.get(_norm_id(origin_id))
+    if o is None or health == "muerto":
+        return LabelResult(greedy, [greedy] if frontier else [], st)
+
+    factor, gain = _step3_rates(health)
+    _, zk = _zobrist(G.n)
+    e, h, l = _stay_step3(cu, o, float(energy_pct), float(hay_kg), float(life_ly), gain)
+    root = State(o, l, e, h, _bits_of(G.n, o), 1, 0.0, None, zk[o])
+
+    # cota: la vida puede crecer con las estrellas de efecto positivo
+    life_gain = float(np.clip(cu.disease_life_delta, 0.0, None).sum())
+    rows = _reach_rows(G, o, float(life_ly) + life_gain)
+    target = len(greedy.path)
+    tie_ok = frontier or greedy.died
+
+    best = root
+    kept: List[State] = [root]
+    layer = [root] if _alive(root) else []
+    while layer:
+        st.layers += 1
+        cand: List[State] = []
+        for s in layer:
+            for v, d in G.neighbors_idx(s.node):
+                if d <= 0.0 or _has_bit(s.visited, v):
+                    continue
+                if s.life - d <= 0.0 or s.energy - d * factor <= 0.0:
+                    continue
+                e, h, l = _stay_step3(cu, v, s.energy - d * factor, s.grass, s.life - d, gain)
+                cand.append(State(v, l, e, h, _with_bit(s.visited, v), s.stars + 1, 0.0, s,
+                                  s.vhash ^ zk[v]))
+        st.labels += len(cand)
+        if not cand:
+            break
+        for c in cand:
+            if _label_key(c) > _label_key(best):
+                best = c
+
+        # dominancia exacta por (nodo, visitados)
+        alive = [c for c in cand if _alive(c)]
+        kept.extend(c for c in cand if not _alive(c))
+        idx = _pareto_keep([(c.node, c.vhash) for c in alive],
+                           [(c.life, c.energy, c.grass) for c in alive], None)
+        st.dominated += len(alive) - len(idx)
+        alive = sorted((alive[i] for i in idx), key=lambda c: (-c.life, -c.energy, -c.grass))
+
+        # cubetas, tope por nodo y cota
+        layer = []
+        seen = set()
+        per_node: Dict[int, int] = {}
+        for c in alive:
+            if buckets is not None:
+                key = (c.node, int(c.life // buckets[0]), int(c.energy // buckets[1]),
+                       int(c.grass // buckets[2]))
+                if key in seen:
+                    st.bucketed += 1
+                    continue
+                seen.add(key)
+            if per_node.get(c.node, 0) >= max_labels:
+                st.capped += 1
+                continue
+            if rows is not None:
+                row = rows.get(c.node)
+                reach = bisect_right(row, c.life + life_gain) - 1 if row is not None else 0
+                # empatar a la voraz solo sirve si se piden el frente o una ruta con vida
+                if c.stars + reach < target or (not tie_ok and c.stars + reach == target
+                                                 and c.stars < target):
+                    st.bounded += 1
+                    continue
+            per_node[c.node] = per_node.get(c.node, 0) + 1
+            layer.append(c)
+        kept.extend(layer)
+
+    def evaluate(s: State) -> RouteResult:
+        return compute_route_step3(G, cu, origin_id, health_txt, energy_pct, hay_kg, life_ly,
+                                   path=[G.ids[i] for i in s.path()])
+
+    route = greedy
+    if (best.stars, _alive(best)) > (len(greedy.path), not greedy.died):
+        route = evaluate(best)
+    front = [evaluate(s) for s in _frontier(kept)] if frontier else []
+    return LabelResult(route, front, st)
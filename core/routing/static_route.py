@@ -1,26 +1,171 @@
-from typing import List, Set
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import heapq
+import time
+import numpy as np
 from core.graph.space_graph import SpaceGraph
 from core.models.donkey import Donkey
 
 
 def route_static_max_nodes(G: SpaceGraph, start: str, donkey: Donkey) -> List[str]:
-    visited: Set[str] = set([start])
-    path: List[str] = [start]
-    cur = start
+    s = G.index_of.get(str(start))
+    if s is None:
+        return [str(start)]
+    visited = np.zeros(G.n, dtype=bool)
+    visited[s] = True
+    path: List[int] = [s]
+    cur = s
     life = donkey.life_ly
     while True:
-        options = []
-        for v, d in G.neighbors(cur):
-            if v in visited:
-                continue
-            if d <= life: # alcanzable
-                options.append((1.0/d, v, d))
-            if not options:
-                break
-        options.sort(reverse=True) # mejor ratio primero
-        _, nxt, cost = options[0]
+        # vecinos no bloqueados de menor a mayor distancia (= mejor ratio 1/d primero);
+        # a igual distancia gana el id mayor, como el orden (1/d, id) descendente original.
+        # Las vías de largo 0 no cuentan como salto (el original dividía por cero).
+        nxt, cost = -1, 0.0
+        a = int(G.indptr[cur])
+        for k in range(a, a + int(G.near_open[cur])):
+            sl = G.near[k]
+            d = float(G.distance[sl])
+            if d > life or (nxt >= 0 and d > cost):
+                break   # alcanzable: d <= vida; después del empate todo es más largo
+            v = int(G.indices[sl])
+            if d > 0.0 and not visited[v] and (nxt < 0 or G.ids[v] > G.ids[nxt]):
+                nxt, cost = v, d
+        if nxt < 0:
+            break
         path.append(nxt)
-        visited.add(nxt)
+        visited[nxt] = True
         life -= cost
         cur = nxt
-    return path
\ No newline at end of file
+    return [G.ids[i] for i in path]
+
+
+# ---------------------------------------------------------------------
+# Versión exacta (branch-and-bound)
+# ---------------------------------------------------------------------
+
+@dataclass
+class BnBStats:
+    """Contadores de route_static_max_nodes_exact."""
+    reachable: int = 0         # estrellas alcanzables desde el origen con la vida inicial
+    expanded: int = 0          # nodos del árbol de búsqueda
+    pruned: int = 0            # podas por cota superior
+    memo_hits: int = 0         # podas por (nodo, visitados) ya visto con más vida
+    optimal: bool = False      # False si se cortó por node_limit/time_limit
+    elapsed: float = 0.0
+
+
+def _reachable(G: SpaceGraph, s: int, life: float) -> Dict[int, float]:
+    """Dijkstra acotado: nodos a distancia mínima <= life desde 's' (mismas vías que el voraz)."""
+    dist = {s: 0.0}
+    heap = [(0.0, s)]
+    while heap:
+        d, i = heapq.heappop(heap)
+        if d > dist.get(i, np.inf):
+            continue
+        for v, w in G.neighbors_idx(i):
+            nd = d + w
+            if w > 0.0 and nd <= life and nd < dist.get(v, np.inf):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def route_static_max_nodes_exact(G: SpaceGraph, start: str, donkey: Donkey,
+                                 node_limit: Optional[int] = 2_000_000,
+                                 time_limit: Optional[float] = 30.0,
+                                 stats: Optional[BnBStats] = None) -> List[str]:
+    """
+    Máximo de estrellas en un camino simple desde 'start' con vida = donkey.life_ly,
+    con las reglas de route_static_max_nodes (salto si d <= vida, vía no bloqueada).
+    Branch-and-bound en profundidad:
+    - incumbente inicial: la ruta voraz;
+    - cota admisible: estrellas del camino + no visitadas cuya distancia mínima
+      (tabla de caminos mínimos precalculada) cabe en la vida restante;
+    - memo: (nodo, visitados) ya alcanzado con igual o más vida se poda.
+    Pensado para universos con hasta ~40 estrellas alcanzables. Si se agota
+    node_limit/time_limit devuelve la mejor ruta encontrada (stats.optimal=False).
+    """
+    t0 = time.monotonic()
+    st = stats if stats is not None else BnBStats()
+    s = G.index_of.get(str(start))
+    if s is None:
+        return [str(start)]
+    life0 = float(donkey.life_ly)
+    greedy = [G.index_of[x] for x in route_static_max_nodes(G, start, donkey)]
+
+    # --- subgrafo alcanzable (índices locales; el origen es 0) ---
+    reach = _reachable(G, s, life0)
+    nodes = sorted(reach, key=lambda i: (reach[i], i))
+    loc = {g: i for i, g in enumerate(nodes)}
+    k = len(nodes)
+    st.reachable = k
+
+    W = np.full((k, k), np.inf)
+    adj: List[List[tuple]] = []
+    for i, g in enumerate(nodes):
+        out = []
+        for v, w in G.neighbors_idx(g):
+            j = loc.get(v)
+            if j is None or j == i or w <= 0.0:
+                continue
+            W[i, j] = min(W[i, j], w)
+            out.append((w, j))
+        out.sort()                               # más cercano primero
+        adj.append(out)
+    # caminos mínimos entre alcanzables (Floyd-Warshall vectorizado)
+    sp = W.copy()
+    np.fill_diagonal(sp, 0.0)
+    for m in range(k):
+        np.minimum(sp, sp[:, m, None] + sp[None, m, :], out=sp)
+
+    best = [loc[g] for g in greedy]
+    visited = np.zeros(k, dtype=bool)
+    visited[0] = True
+    path, lifes, masks = [0], [life0], [1]
+    stack = [iter(adj[0])]
+    memo: Dict[tuple, float] = {}
+    aborted = False
+
+    while stack and len(best) < k:
+        if (node_limit is not None and st.expanded >= node_limit) or \
+           (time_limit is not None and time.monotonic() - t0 >= time_limit):
+            aborted = True
+            break
+        nxt = next(stack[-1], None)
+        if nxt is None:
+            stack.pop()
+            v = path.pop()
+            if path:                             # el origen queda marcado
+                visited[v] = False
+            lifes.pop()
+            masks.pop()
+            continue
+        d, v = nxt
+        life = lifes[-1]
+        if visited[v] or d > life:
+            continue
+        nl = life - d
+        mask = masks[-1] | (1 << v)
+        if memo.get((v, mask), -1.0) >= nl:
+            st.memo_hits += 1
+            continue
+        memo[(v, mask)] = nl
+        st.expanded += 1
+
+        visited[v] = True
+        path.append(v)
+        if len(path) > len(best):
+            best = list(path)
+        bound = len(path) + int(np.count_nonzero((sp[v] <= nl) & ~visited))
+        if bound <= len(best):
+            st.pruned += 1
+            visited[v] = False
+            path.pop()
+            continue
+        lifes.append(nl)
+        masks.append(mask)
+        stack.append(iter(adj[v]))
+
+    st.optimal = not aborted
+    st.elapsed = time.monotonic() - t0
+    return [G.ids[nodes[i]] for i in best]
@@ -0,0 +1,145 @@
+"""
+Universo compilado: tabla struct-of-arrays indexada por índice de nodo de SpaceGraph.
+Se construye una vez por carga (o tras guardar en StarEditor) y la comparten
+reglas, simulador y planificadores, evitando recorrer los modelos pydantic.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from core.models.enums import StarType
+
+# Códigos de la columna 'type'
+STAR_TYPES: List[StarType] = [StarType.NORMAL, StarType.HYPERGIANT]
+
+# Investigación por defecto (estrella sin datos): (x_time_per_kg, invest_energy_per_x, disease_life_delta)
+DEFAULT_RESEARCH: Tuple[float, float, float] = (1.0, 0.0, 0.0)
+
+
+# Helpers robustos para leer estrellas e investigación
+def _get_research(star) -> Dict[str, float]:
+    """Lee research compatible con modelo o dict; devuelve dict simple con defaults."""
+    if star is None:
+        return {}
+    r = None
+    if isinstance(star, dict):
+        r = star.get("research")
+    else:
+        r = getattr(star, "research", None)
+    if r is None:
+        return {}
+    def g(o, k, d=0.0):
+        return (o.get(k, d) if isinstance(o, dict) else getattr(o, k, d))
+    # x_time_per_kg = "X tiempo por kg"
+    # invest_energy_per_x = "energía por X tiempo"
+    return {
+        "x_time_per_kg":       float(g(r, "x_time_per_kg", 1.0) or 1.0),
+        "invest_energy_per_x": float(g(r, "invest_energy_per_x", 0.0) or 0.0),
+        "disease_life_delta":  float(g(r, "disease_life_delta", 0.0) or 0.0),
+    }
+
+def _field(obj, name, default=None):
+    return obj.get(name, default) if isinstance(obj, dict) else getattr(obj, name, default)
+
+
+@dataclass
+class CompiledUniverse:
+    """Columnas por índice de nodo (mismo orden que SpaceGraph.ids)."""
+    ids: List[str]
+    index_of: Dict[str, int]
+    x_time_per_kg: np.ndarray          # float64
+    invest_energy_per_x: np.ndarray    # float64
+    disease_life_delta: np.ndarray     # float64
+    type: np.ndarray                   # int8, código en STAR_TYPES
+    galaxy: np.ndarray                 # int32, código en 'galaxies' (-1 si falta)
+    constellation: np.ndarray          # int32, primera membresía en 'constellations' (-1 si falta)
+    galaxies: List[str]
+    constellations: List[str]
+
+    @property
+    def n(self) -> int:
+        return len(self.ids)
+
+    def research(self, i: Optional[int]) -> Tuple[float, float, float]:
+        """(x_time_per_kg, invest_energy_per_x, disease_life_delta) del nodo 'i'."""
+        if i is None or i < 0:
+            return DEFAULT_RESEARCH
+        return (float(self.x_time_per_kg[i]),
+                float(self.invest_energy_per_x[i]),
+                float(self.disease_life_delta[i]))
+
+    def is_hypergiant(self, i: int) -> bool:
+        return bool(self.type[i] == 1)
+
+
+def compile_universe(u, G) -> CompiledUniverse:
+    """
+    Compila 'u' sobre los índices de 'G' en una sola pasada.
+    Si un id se repite gana la primera estrella.
+    Nodos sin estrella quedan con DEFAULT_RESEARCH.
+    """
+    n = G.n
+    x_time = np.full(n, DEFAULT_RESEARCH[0], dtype=np.float64)
+    invest = np.full(n, DEFAULT_RESEARCH[1], dtype=np.float64)
+    delta = np.full(n, DEFAULT_RESEARCH[2], dtype=np.float64)
+    types = np.zeros(n, dtype=np.int8)
+    galaxy = np.full(n, -1, dtype=np.int32)
+    constellation = np.full(n, -1, dtype=np.int32)
+    seen = np.zeros(n, dtype=bool)
+
+    galaxies: List[str] = []
+    galaxy_code: Dict[str, int] = {}
+    for s in getattr(u, "stars", []):
+        i = G.index_of.get(str(_field(s, "id")))
+        if i is None or seen[i]:
+            continue
+        seen[i] = True
+        r = _get_research(s)
+        if r:
+            x_time[i] = r["x_time_per_kg"]
+            invest[i] = r["invest_energy_per_x"]
+            delta[i] = r["disease_life_delta"]
+        if _field(s, "type") == StarType.HYPERGIANT:
+            types[i] = 1
+        g = _field(s, "galaxyId")
+        if g is not None:
+            galaxy[i] = galaxy_code.setdefault(str(g), len(galaxy_code))
+            if galaxy[i] == len(galaxies):
+                galaxies.append(str(g))
+
+    constellations: List[str] = []
+    const_code: Dict[str, int] = {}
+    for m in getattr(u, "memberships", []):
+        i = G.index_of.get(str(_field(m, "starId")))
+        cid = str(_field(m, "constellationId"))
+        c = const_code.setdefault(cid, len(const_code))
+        if c == len(constellations):
+            constellations.append(cid)
+        if i is not None and constellation[i] < 0:
+            constellation[i] = c
+
+    return CompiledUniverse(
+        ids=G.ids,
+        index_of=G.index_of,
+        x_time_per_kg=x_time,
+        invest_energy_per_x=invest,
+        disease_life_delta=delta,
+        type=types,
+        galaxy=galaxy,
+        constellation=constellation,
+        galaxies=galaxies,
+        constellations=constellations,
+    )
+
+
+def as_compiled(u, G) -> CompiledUniverse:
+    """Devuelve 'u' si ya está compilado; si no, lo compila sobre 'G'."""
+    return u if isinstance(u, CompiledUniverse) else compile_universe(u, G)
+
+
+def changed_stars(old: CompiledUniverse, new: CompiledUniverse) -> List[str]:
+    """Ids cuya investigación difiere entre dos compilaciones sobre el mismo grafo."""
+    diff = ((old.x_time_per_kg != new.x_time_per_kg)
+            | (old.invest_energy_per_x != new.invest_energy_per_x)
+            | (old.disease_life_delta != new.disease_life_delta))
+    return [new.ids[i] for i in np.flatnonzero(diff).tolist()]
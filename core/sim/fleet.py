@@ -0,0 +1,174 @@
+"""
+Flota: muchos burros (Donkey) avanzando a la vez sobre un mismo grafo compilado.
+
+Planificador por rondas: en cada ronda todos los burros activos hacen su
+estancia y eligen su salto en lote (NumPy, como run_step3_lanes). Sin estado
+compartido cada burro sigue exactamente run_full_step3. Opcionalmente:
+- share_research: una estrella investigada por la flota no se vuelve a
+  investigar (no cobra el gasto) y nadie salta a ella; así la flota se reparte.
+- claim_lanes: la primera vía que recorre un burro queda reclamada y el resto
+  de la flota ya no puede usarla.
+Los conflictos dentro de una ronda (dos burros al mismo destino o por la misma
+vía) los gana el de menor índice; los demás vuelven a elegir en la misma ronda.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional, Sequence
+import numpy as np
+
+from core.models.donkey import Donkey
+from core.sim.compiled import as_compiled
+from core.sim.lanes import (
+    DIED, MAX_STEPS, NO_MOVE, NO_ORIGIN, LaneResult, _nearest_lanes,
+)
+from core.sim.rules import _HEALTH_ENERGY_FACTOR, _GAIN_PER_KG, _UI2ENUM, _norm_id
+
+
+@dataclass
+class FleetResult:
+    """Resultado por burro (tabla columnar) y estado compartido al final."""
+    lanes: LaneResult
+    researched_by: np.ndarray        # por nodo: burro que la investigó primero (-1 nadie)
+    claimed_by: np.ndarray           # por arista no dirigida: burro dueño (-1 libre)
+    rounds: int
+
+
+def _first_of_each(keys: np.ndarray) -> np.ndarray:
+    """Máscara de la primera aparición de cada clave (orden de carril)."""
+    mask = np.zeros(len(keys), dtype=bool)
+    if len(keys):
+        _, first = np.unique(keys, return_index=True)
+        mask[first] = True
+    return mask
+
+
+def run_fleet(u, G, donkeys: Sequence[Donkey], origins: Sequence[str],
+              share_research: bool = False, claim_lanes: bool = False,
+              max_steps: int = 1000, track_visited: bool = False) -> FleetResult:
+    """
+    Simula la flota: donkeys[k] parte de origins[k]. Usa de cada Donkey la
+    salud, energy_pct, grass_kg y life_ly. max_steps limita las rondas.
+    track_visited=True lleva la matriz burros x n de visitados para contar
+    estrellas distintas ('stars'). Sin ella, con share_research cada salto llega
+    a una estrella que nadie investigó, así que stars = saltos + 1 sale de los
+    contadores; sin estado compartido 'stars' queda en None.
+    """
+    cu = as_compiled(u, G)
+    n_l = len(donkeys)
+    if len(origins) != n_l:
+        raise ValueError("donkeys y origins deben tener el mismo largo")
+
+    health = [_UI2ENUM.get(d.health, d.health) for d in donkeys]
+    factor = np.array([_HEALTH_ENERGY_FACTOR.get(h, 1.3) for h in health])
+    gain = np.array([_GAIN_PER_KG.get(h, 2.0) for h in health])
+    origin = np.array([G.index_of.get(_norm_id(o), -1) for o in origins], dtype=np.int64)
+    energy = np.array([float(d.energy_pct) for d in donkeys])
+    hay = np.array([float(d.grass_kg) for d in donkeys])
+    life = np.array([float(d.life_ly) for d in donkeys])
+    res = LaneResult(
+        origin=origin, health=[str(getattr(h, "value", h)) for h in health],
+        energy0=energy.copy(), hay0=hay.copy(), life0=life.copy(),
+        final_node=origin.copy(), final_energy=energy, final_hay=hay, final_life=life,
+        distance=np.zeros(n_l), steps=np.zeros(n_l, dtype=np.int64),
+        moves=np.zeros(n_l, dtype=np.int64), stars=None,
+        died=np.zeros(n_l, dtype=bool), stop=np.zeros(n_l, dtype=np.int8),
+        ids=list(G.ids),
+    )
+    res.stop[origin < 0] = NO_ORIGIN
+
+    x_time = np.maximum(1e-9, cu.x_time_per_kg)
+    invest = cu.invest_energy_per_x
+    delta = cu.disease_life_delta
+    researched = np.full(G.n, -1, dtype=np.int64)
+    owner = np.full(len(G.edge_u), -1, dtype=np.int64)
+    ok0 = np.flatnonzero(origin >= 0)
+    visited = None
+    if track_visited:
+        visited = np.zeros((n_l, G.n), dtype=bool)
+        visited[ok0, origin[ok0]] = True
+
+    cur = origin.copy()
+    act = ok0
+    rounds = 0
+    for _ in range(max_steps):
+        if len(act) == 0:
+            break
+        rounds += 1
+        c = cur[act]
+        e, h, l = energy[act], hay[act], life[act]
+
+        # --- estancia ---
+        kg = np.minimum(h, 0.5 / x_time[c])
+        eat = (e < 50.0) & (h > 0.0) & (kg > 0.0)
+        e = np.where(eat, np.minimum(100.0, e + kg * gain[act]), e)
+        h = np.where(eat, h - kg, h)
+        if share_research:
+            pay = (researched[c] < 0) & _first_of_each(c)
+            researched[c[pay]] = act[pay]
+            e = e - np.where(pay, invest[c] * 0.5, 0.0)
+        else:
+            e = e - invest[c] * 0.5
+        l = l + delta[c]
+
+        dead = (e <= 0.0) | (l <= 0.0)
+        if dead.any():
+            k = act[dead]
+            energy[k] = np.maximum(0.0, e[dead])
+            hay[k] = np.maximum(0.0, h[dead])
+            life[k] = np.maximum(0.0, l[dead])
+            res.died[k] = True
+            res.stop[k] = DIED
+        alive = ~dead
+        act, c, e, h, l = act[alive], c[alive], e[alive], h[alive], l[alive]
+        res.steps[act] += 1
+        energy[act], hay[act], life[act] = e, h, l
+
+        # --- movimiento por lotes, con reintentos si hay conflictos ---
+        moved = []
+        pending = np.arange(len(act))
+        reserved = np.zeros(G.n, dtype=bool)
+        while len(pending):
+            p_act = act[pending]
+            node_ok = ~reserved & (researched < 0) if share_research else None
+            nxt, d, slot = _nearest_lanes(G, c[pending], l[pending], e[pending], factor[p_act],
+                                          node_ok=node_ok,
+                                          edge_owner=owner if claim_lanes else None,
+                                          owner=p_act, with_slot=True)
+            stuck = nxt < 0
+            res.stop[p_act[stuck]] = NO_MOVE
+            go = np.flatnonzero(~stuck)
+            win = np.ones(len(go), dtype=bool)
+            edge = None
+            if share_research:
+                win &= _first_of_each(nxt[go])
+            if claim_lanes:
+                edge = G.edge_of[slot[go]]
+                keep = np.flatnonzero(win)
+                win[keep[~_first_of_each(edge[keep])]] = False
+            w = go[win]
+            k = p_act[w]
+            energy[k] = e[pending][w] - d[w] * factor[k]
+            life[k] = l[pending][w] - d[w]
+            cur[k] = nxt[w]
+            res.distance[k] += d[w]
+            res.moves[k] += 1
+            if visited is not None:
+                visited[k, nxt[w]] = True
+            if share_research:
+                reserved[nxt[w]] = True
+            if claim_lanes:
+                e_w = edge[win]
+                free = owner[e_w] < 0
+                owner[e_w[free]] = k[free]
+            moved.append(k)
+            pending = pending[go[~win]]
+        act = np.sort(np.concatenate(moved)) if moved else act[:0]
+    else:
+        res.stop[act] = MAX_STEPS
+
+    res.final_node = np.where(origin >= 0, cur, -1)
+    if visited is not None:
+        res.stars = visited.sum(axis=1)
+    elif share_research:
+        res.stars = np.where(origin >= 0, res.moves + 1, 0)
+    return FleetResult(res, researched, owner, rounds)
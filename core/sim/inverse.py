@@ -0,0 +1,97 @@
+"""
+Planificación inversa del punto 3: ¿cuánto pasto (o energía) hace falta para
+visitar al menos N estrellas, o para sobrevivir, desde un origen?
+
+Cada llamada a run_step3_lanes evalúa una grilla entera de valores a la vez.
+Primero se busca un valor que cumpla (ampliando el rango si hace falta) y
+luego se achica el intervalo [último que falla, primero que cumple] con nuevas
+grillas hasta 'tol'. Con 64 muestras bastan unas pocas llamadas.
+Se asume que más recurso no empeora el objetivo (vale en casi todos los casos;
+más energía puede habilitar otro vecino y cambiar la ruta, por eso el resultado
+es el menor valor que cumple entre los evaluados).
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+
+from core.sim.compiled import as_compiled
+from core.sim.lanes import run_step3_lanes
+
+RESOURCES = ("hay_kg", "energy_pct")
+_HAY_LIMIT = 1e6          # tope de la ampliación del rango de pasto
+
+
+@dataclass
+class InverseResult:
+    """Menor valor de 'resource' que cumple el objetivo (None si no se encontró)."""
+    resource: str
+    value: Optional[float]
+    stars: int                # estrellas distintas visitadas con ese valor
+    died: bool
+    calls: int                # llamadas por lotes a run_step3_lanes
+    evaluations: int          # simulaciones (carriles) en total
+
+
+def min_resource_step3(G, u, origin_id: str, health_txt: str, energy_pct: float,
+                       hay_kg: float, life_ly: float, resource: str = "hay_kg",
+                       target_stars: Optional[int] = None, survive: bool = False,
+                       lo: float = 0.0, hi: Optional[float] = None, tol: float = 0.01,
+                       samples: int = 64, max_steps: int = 1000) -> InverseResult:
+    """
+    Menor 'resource' ('hay_kg' o 'energy_pct') en [lo, hi] con el que run_full_step3
+    visita al menos 'target_stars' estrellas distintas y/o (survive=True) no muere.
+    El otro recurso queda fijo en el valor dado. hi por defecto: 100 para la
+    energía; para el pasto 100 y se multiplica por 10 mientras nada cumpla.
+    """
+    if resource not in RESOURCES:
+        raise ValueError(f"Recurso desconocido: {resource} (usar {', '.join(RESOURCES)})")
+    if target_stars is None and not survive:
+        raise ValueError("Indicar target_stars y/o survive=True")
+    cu = as_compiled(u, G)
+    samples = max(3, samples)
+    grow = resource == "hay_kg" and hi is None
+    hi = 100.0 if hi is None else float(hi)
+    calls = evaluations = 0
+
+    def run(values: np.ndarray):
+        nonlocal calls, evaluations
+        calls += 1
+        evaluations += len(values)
+        k = len(values)
+        hay = values if resource == "hay_kg" else hay_kg
+        energy = values if resource == "energy_pct" else energy_pct
+        res = run_step3_lanes(cu, G, [origin_id] * k, [health_txt] * k, energy, hay, life_ly,
+                              max_steps=max_steps)
+        ok = np.ones(k, dtype=bool)
+        if target_stars is not None:
+            ok &= res.stars >= target_stars
+        if survive:
+            ok &= ~res.died
+        return res, ok
+
+    # --- 1) encontrar un valor que cumpla ---
+    a = float(lo)
+    while True:
+        grid = np.linspace(a, hi, samples)
+        res, ok = run(grid)
+        if ok.any():
+            break
+        if not grow or hi >= _HAY_LIMIT:
+            return InverseResult(resource, None, int(res.stars[-1]), bool(res.died[-1]),
+                                 calls, evaluations)
+        a, hi = hi, hi * 10.0
+
+    j = int(np.argmax(ok))
+    best = (float(grid[j]), int(res.stars[j]), bool(res.died[j]))
+    lo_fail = float(grid[j - 1]) if j > 0 else None
+
+    # --- 2) achicar [último que falla, primero que cumple] ---
+    while lo_fail is not None and best[0] - lo_fail > tol:
+        grid = np.linspace(lo_fail, best[0], samples)[1:]
+        res, ok = run(grid)
+        j = int(np.argmax(ok)) if ok.any() else len(grid) - 1
+        best = (float(grid[j]), int(res.stars[j]), bool(res.died[j]))
+        lo_fail = float(grid[j - 1]) if j > 0 else lo_fail
+
+    return InverseResult(resource, best[0], best[1], best[2], calls, evaluations)
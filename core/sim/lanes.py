@@ -0,0 +1,294 @@
+"""
+Simulación del punto 3 vectorizada: N burros avanzan a la vez, uno por "carril".
+
+Cada carril tiene su origen, salud, energía, pasto y vida, y sigue exactamente
+las reglas de simulate_step3 / run_full_step3 (estancia + vecino más cercano
+viable, con revisitas). Los carriles detenidos o muertos quedan enmascarados y
+no se vuelven a tocar. El resultado es una tabla columnar (un array por campo).
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+from core.sim.compiled import as_compiled
+from core.sim.rules import _HEALTH_ENERGY_FACTOR, _GAIN_PER_KG, _norm_id, _parse_health
+
+# Códigos de parada (índices de STOP_REASONS)
+RUNNING, NO_MOVE, DIED, MAX_STEPS, NO_ORIGIN = range(5)
+STOP_REASONS = ("", "Sin vecinos viables", "Muere durante la estancia",
+                "Límite de pasos alcanzado", "Origen inexistente en el grafo")
+
+
+@dataclass
+class LaneResult:
+    """Tabla columnar: posición k de cada array = carril k."""
+    origin: np.ndarray          # índice de nodo de origen (-1 si no existe)
+    health: List[str]           # texto de salud de la UI
+    energy0: np.ndarray
+    hay0: np.ndarray
+    life0: np.ndarray
+    final_node: np.ndarray      # último nodo alcanzado
+    final_energy: np.ndarray
+    final_hay: np.ndarray
+    final_life: np.ndarray
+    distance: np.ndarray        # años luz recorridos
+    steps: np.ndarray           # pasos registrados (como len(RunLog.steps))
+    moves: np.ndarray           # saltos (len(visited_order) - 1)
+    stars: Optional[np.ndarray] # estrellas distintas visitadas (None si no se siguió)
+    died: np.ndarray
+    stop: np.ndarray            # código en STOP_REASONS
+    ids: List[str]              # id de estrella por índice de nodo
+
+    def __len__(self) -> int:
+        return len(self.origin)
+
+    def to_frame(self):
+        """DataFrame de pandas con una fila por carril."""
+        import pandas as pd
+        ids = np.asarray(self.ids + [""], dtype=object)   # -1 -> ""
+        cols: Dict[str, object] = {
+            "origin": ids[self.origin],
+            "health": self.health,
+            "energy0": self.energy0,
+            "hay0": self.hay0,
+            "life0": self.life0,
+            "final_star": ids[self.final_node],
+            "final_energy": self.final_energy,
+            "final_hay": self.final_hay,
+            "final_life": self.final_life,
+            "distance": self.distance,
+            "steps": self.steps,
+            "moves": self.moves,
+        }
+        if self.stars is not None:
+            cols["stars"] = self.stars
+        cols["died"] = self.died
+        cols["stop_reason"] = np.asarray(STOP_REASONS, dtype=object)[self.stop]
+        return pd.DataFrame(cols)
+
+
+@dataclass
+class Noise:
+    """
+    Efectos aleatorios del modo estocástico (0 = sin ruido en ese efecto):
+    - research: sigma lognormal (mediana 1) que multiplica el gasto de investigación
+    - life: desvío normal (a-luz) sumado a disease_life_delta en cada estancia
+    - travel: sigma lognormal (mediana 1) que multiplica el costo de cada salto
+    """
+    research: float = 0.2
+    life: float = 1.0
+    travel: float = 0.1
+
+    def research_factor(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.lognormal(0.0, self.research, n) if self.research > 0 else np.ones(n)
+
+    def life_shift(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.normal(0.0, self.life, n) if self.life > 0 else np.zeros(n)
+
+    def travel_factor(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.lognormal(0.0, self.travel, n) if self.travel > 0 else np.ones(n)
+
+
+def _lane_rates(health: Sequence[str]):
+    """(factor, ganancia por kg) por carril, como en simulate_step3."""
+    cache: Dict[str, tuple] = {}
+    factor = np.empty(len(health))
+    gain = np.empty(len(health))
+    for k, h in enumerate(health):
+        r = cache.get(h)
+        if r is None:
+            e = _parse_health(h)
+            r = cache[h] = (_HEALTH_ENERGY_FACTOR.get(e, 1.3), _GAIN_PER_KG.get(e, 2.0))
+        factor[k], gain[k] = r
+    return factor, gain
+
+
+def _nearest_lanes(G, cur, life, energy, factor, node_ok=None, edge_owner=None,
+                   owner=None, with_slot: bool = False) -> tuple:
+    """
+    Vecino más cercano viable de cada carril (sin filtro de visitados, d=0 permitido),
+    como _nearest_viable(..., visited=None, skip_zero=False). (-1, 0.0) si no hay.
+    Filtros opcionales (flota): 'node_ok' (bool por nodo destino) y 'edge_owner'
+    (carril dueño de cada arista, -1 libre); un carril solo usa aristas libres o
+    propias según 'owner' (id de carril de cada posición de 'cur').
+    with_slot=True agrega la posición CSR del salto elegido (-1 si no hay).
+    """
+    a = len(cur)
+    nxt = np.full(a, -1, dtype=np.int64)
+    dist = np.zeros(a)
+    slot = np.full(a, -1, dtype=np.int64)
+    out = (nxt, dist, slot) if with_slot else (nxt, dist)
+    if node_ok is None and edge_owner is None:
+        # sin filtros el candidato es el primero del índice por distancia: si ese
+        # no alcanza, ninguno alcanza
+        has = np.flatnonzero(G.near_open[cur] > 0)
+        s = G.near[G.indptr[cur[has]]]
+        d = G.distance[s]
+        ok = (life[has] - d > 0.0) & (energy[has] - d * factor[has] > 0.0)
+        hit = has[ok]
+        nxt[hit] = G.indices[s[ok]]
+        dist[hit] = d[ok]
+        slot[hit] = s[ok]
+        return out
+    starts = G.indptr[cur]
+    lens = G.indptr[cur + 1] - starts
+    total = int(lens.sum())
+    if total == 0:
+        return out
+    lane = np.repeat(np.arange(a), lens)
+    first = np.cumsum(lens) - lens
+    slots = np.repeat(starts - first, lens) + np.arange(total)
+    d = G.distance[slots]
+    ok = ~G.blocked[slots] & (life[lane] - d > 0.0) & (energy[lane] - d * factor[lane] > 0.0)
+    if node_ok is not None:
+        ok &= node_ok[G.indices[slots]]
+    if edge_owner is not None:
+        own = edge_owner[G.edge_of[slots]]
+        ok &= (own < 0) | (own == owner[lane])
+    if not ok.any():
+        return out
+    dm = np.where(ok, d, np.inf)
+    nz = lens > 0
+    mins = np.full(a, np.inf)
+    mins[nz] = np.minimum.reduceat(dm, first[nz])
+    hit = np.flatnonzero(ok & (dm == mins[lane]))
+    lanes_hit, pos = np.unique(lane[hit], return_index=True)   # primero en adyacencia
+    s = slots[hit[pos]]
+    nxt[lanes_hit] = G.indices[s]
+    dist[lanes_hit] = d[hit[pos]]
+    slot[lanes_hit] = s
+    return out
+
+
+def run_step3_lanes(u, G, origins: Sequence[str], health: Sequence[str],
+                    energy_pct, hay_kg, life_ly, max_steps: int = 1000,
+                    track_visited: bool = True, noise: Optional[Noise] = None,
+                    rng: Optional[np.random.Generator] = None) -> LaneResult:
+    """
+    Corre run_full_step3 para N carriles a la vez. 'origins' y 'health' son
+    secuencias de largo N; energy_pct / hay_kg / life_ly son escalares o arrays
+    (se difunden a N). track_visited=False evita la matriz N x n de visitados
+    (entonces 'stars' queda en None).
+    Con 'noise' (y 'rng') cada estancia y cada salto sortean sus efectos según
+    Noise; sin 'noise' el resultado es exactamente el de run_full_step3.
+    """
+    cu = as_compiled(u, G)
+    if noise is not None and rng is None:
+        rng = np.random.default_rng()
+    n_l = len(origins)
+    health = [str(h) for h in health]
+    if len(health) != n_l:
+        raise ValueError("origins y health deben tener el mismo largo")
+
+    origin = np.array([G.index_of.get(_norm_id(o), -1) for o in origins], dtype=np.int64)
+    energy = np.broadcast_to(np.asarray(energy_pct, dtype=np.float64), (n_l,)).copy()
+    hay = np.broadcast_to(np.asarray(hay_kg, dtype=np.float64), (n_l,)).copy()
+    life = np.broadcast_to(np.asarray(life_ly, dtype=np.float64), (n_l,)).copy()
+    res = LaneResult(
+        origin=origin, health=health,
+        energy0=energy.copy(), hay0=hay.copy(), life0=life.copy(),
+        final_node=origin.copy(), final_energy=energy, final_hay=hay, final_life=life,
+        distance=np.zeros(n_l), steps=np.zeros(n_l, dtype=np.int64),
+        moves=np.zeros(n_l, dtype=np.int64), stars=None,
+        died=np.zeros(n_l, dtype=bool), stop=np.zeros(n_l, dtype=np.int8),
+        ids=list(G.ids),
+    )
+    res.stop[origin < 0] = NO_ORIGIN
+
+    factor, gain = _lane_rates(health)
+    x_time = np.maximum(1e-9, cu.x_time_per_kg)
+    invest = cu.invest_energy_per_x
+    delta = cu.disease_life_delta
+    visited = None
+    if track_visited:
+        visited = np.zeros((n_l, G.n), dtype=bool)
+        ok0 = np.flatnonzero(origin >= 0)
+        visited[ok0, origin[ok0]] = True
+
+    cur = origin.copy()
+    act = np.flatnonzero(origin >= 0)
+    for _ in range(max_steps):
+        if len(act) == 0:
+            break
+        c = cur[act]
+        e, h, l = energy[act], hay[act], life[act]
+
+        # --- estancia: comer si energía < 50 ---
+        kg = np.minimum(h, 0.5 / x_time[c])
+        eat = (e < 50.0) & (h > 0.0) & (kg > 0.0)
+        e = np.where(eat, np.minimum(100.0, e + kg * gain[act]), e)
+        h = np.where(eat, h - kg, h)
+        if noise is None:
+            e = e - invest[c] * 0.5
+            l = l + delta[c]
+        else:
+            e = e - invest[c] * noise.research_factor(rng, len(c)) * 0.5
+            l = l + delta[c] + noise.life_shift(rng, len(c))
+
+        # --- muerte tras la estancia ---
+        dead = (e <= 0.0) | (l <= 0.0)
+        if dead.any():
+            k = act[dead]
+            energy[k] = np.maximum(0.0, e[dead])
+            hay[k] = np.maximum(0.0, h[dead])
+            life[k] = np.maximum(0.0, l[dead])
+            res.died[k] = True
+            res.stop[k] = DIED
+        alive = ~dead
+        act, c, e, h, l = act[alive], c[alive], e[alive], h[alive], l[alive]
+        res.steps[act] += 1
+
+        # --- movimiento ---
+        nxt, d = _nearest_lanes(G, c, l, e, factor[act])
+        stuck = nxt < 0
+        if stuck.any():
+            k = act[stuck]
+            energy[k], hay[k], life[k] = e[stuck], h[stuck], l[stuck]
+            res.stop[k] = NO_MOVE
+        mv = ~stuck
+        k = act[mv]
+        if noise is not None:
+            # la elección usa la distancia nominal; el costo real se sortea
+            d = d.copy()
+            d[mv] *= noise.travel_factor(rng, int(mv.sum()))
+        energy[k] = e[mv] - d[mv] * factor[k]
+        life[k] = l[mv] - d[mv]
+        hay[k] = h[mv]
+        cur[k] = nxt[mv]
+        res.distance[k] += d[mv]
+        res.moves[k] += 1
+        if visited is not None:
+            visited[k, nxt[mv]] = True
+        if noise is not None:
+            # el costo sorteado puede superar lo que quedaba: muere al llegar
+            spent = (energy[k] <= 0.0) | (life[k] <= 0.0)
+            if spent.any():
+                kd = k[spent]
+                energy[kd] = np.maximum(0.0, energy[kd])
+                life[kd] = np.maximum(0.0, life[kd])
+                res.died[kd] = True
+                res.stop[kd] = DIED
+                k = k[~spent]
+        act = k
+    else:
+        res.stop[act] = MAX_STEPS
+
+    res.final_node = np.where(origin >= 0, cur, -1)
+    if visited is not None:
+        res.stars = visited.sum(axis=1)
+    return res
+
+
+def sweep_step3(u, G, origins: Sequence[str], health: Sequence[str],
+                energy_pct: Sequence[float], hay_kg: Sequence[float],
+                life_ly: Sequence[float], **kwargs) -> LaneResult:
+    """Producto cartesiano origen x salud x energía x pasto x vida, en un solo lote."""
+    grid = list(product(origins, health, energy_pct, hay_kg, life_ly))
+    if not grid:
+        return run_step3_lanes(u, G, [], [], [], [], [], **kwargs)
+    o, h, e, k, l = zip(*grid)
+    return run_step3_lanes(u, G, o, h, np.array(e, dtype=np.float64),
+                           np.array(k, dtype=np.float64), np.array(l, dtype=np.float64),
+                           **kwargs)
@@ -0,0 +1,130 @@
+"""
+Modo estocástico del punto 3 (Monte Carlo).
+
+Cada réplica corre las reglas de run_full_step3 con efectos sorteados (Noise):
+gasto de investigación, efecto sobre la vida y costo de los saltos. Las réplicas
+se agrupan en bloques de carriles (run_step3_lanes) repartidos en un pool de
+procesos. La semilla de cada bloque sale de (seed, índice del origen en el
+grafo, bloque), así que los resultados de un origen son reproducibles y no
+dependen de 'workers' ni de qué otros orígenes se pidan.
+"""
+from __future__ import annotations
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import math
+from statistics import NormalDist
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+from core.graph.shared import SharedGraph, init_worker, worker_graph
+from core.sim.compiled import as_compiled
+from core.sim.lanes import Noise, run_step3_lanes
+from core.sim.rules import _norm_id
+
+# Réplicas por bloque (fijo: cambiarlo cambia los sorteos)
+BLOCK = 256
+
+
+@dataclass
+class OriginStats:
+    """Resumen de las réplicas de un origen."""
+    origin: str
+    replicas: int
+    survival: float                        # fracción de réplicas que no murieron
+    survival_ci: Tuple[float, float]       # intervalo de Wilson
+    stars_mean: float                      # estrellas distintas visitadas (NaN si no se siguió)
+    stars_ci: Tuple[float, float]          # intervalo normal para la media
+    stars_std: float
+    life_mean: float
+    energy_mean: float
+
+
+def _wilson(k: int, n: int, z: float) -> Tuple[float, float]:
+    if n == 0:
+        return 0.0, 1.0
+    p = k / n
+    den = 1.0 + z * z / n
+    mid = (p + z * z / (2 * n)) / den
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / den
+    return max(0.0, mid - half), min(1.0, mid + half)
+
+
+def _run_block(G, cu, origin: str, o_idx: int, b_idx: int, size: int, params,
+               noise: Noise, seed: int, max_steps: int, track_stars: bool):
+    health_txt, energy_pct, hay_kg, life_ly = params
+    # semilla por nodo (no por posición en 'origins'); un origen inexistente no sortea
+    node = G.index_of.get(_norm_id(origin), G.n)
+    rng = np.random.default_rng(np.random.SeedSequence([seed, node, b_idx]))
+    res = run_step3_lanes(cu, G, [origin] * size, [health_txt] * size, energy_pct, hay_kg,
+                          life_ly, max_steps=max_steps, track_visited=track_stars,
+                          noise=noise, rng=rng)
+    return o_idx, res.died, res.stars, res.final_life, res.final_energy
+
+
+def _block_task(args):
+    """Tarea de worker: un bloque de réplicas sobre el grafo compartido."""
+    G, cu = worker_graph()
+    return _run_block(G, cu, *args)
+
+
+def monte_carlo_step3(G, u, origins: Optional[Sequence[str]], health_txt: str,
+                      energy_pct: float, hay_kg: float, life_ly: float,
+                      replicas: int = 1000, noise: Optional[Noise] = None, seed: int = 0,
+                      confidence: float = 0.95, max_steps: int = 1000,
+                      workers: Optional[int] = None,
+                      track_stars: bool = True) -> List[OriginStats]:
+    """
+    'replicas' corridas estocásticas de run_full_step3 por origen (None = todos).
+    Devuelve, por origen: probabilidad de sobrevivir, estrellas esperadas e
+    intervalos de confianza al nivel 'confidence'. Mismo 'seed' => mismos números.
+    workers=1 corre en el proceso actual.
+    track_stars=False no cuenta estrellas distintas (evita la matriz de visitados
+    BLOCK x n por bloque); las columnas stars_* quedan en NaN.
+    """
+    cu = as_compiled(u, G)
+    noise = noise if noise is not None else Noise()
+    origins = list(G.ids) if origins is None else [str(o) for o in origins]
+    params = (health_txt, float(energy_pct), float(hay_kg), float(life_ly))
+    tasks = []
+    for oi, o in enumerate(origins):
+        for b, start in enumerate(range(0, replicas, BLOCK)):
+            tasks.append((o, oi, b, min(BLOCK, replicas - start), params, noise, seed, max_steps,
+                          track_stars))
+
+    if workers == 1 or len(tasks) <= 1:
+        blocks = [_run_block(G, cu, *t) for t in tasks]
+    else:
+        with SharedGraph(G, cu) as shared, ProcessPoolExecutor(
+                max_workers=workers, initializer=init_worker, initargs=(shared.spec,)) as pool:
+            blocks = list(pool.map(_block_task, tasks))
+
+    by_origin = defaultdict(list)
+    for b in blocks:
+        by_origin[b[0]].append(b)
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+    out: List[OriginStats] = []
+    for oi, o in enumerate(origins):
+        mine = by_origin[oi]
+        died = np.concatenate([b[1] for b in mine]) if mine else np.zeros(0, dtype=bool)
+        if not track_stars:
+            stars = np.full(len(died), np.nan)
+        else:
+            stars = np.concatenate([b[2] for b in mine]).astype(np.float64) if mine else np.zeros(0)
+        life = np.concatenate([b[3] for b in mine]) if mine else np.zeros(0)
+        energy = np.concatenate([b[4] for b in mine]) if mine else np.zeros(0)
+        n = len(died)
+        alive = int(n - died.sum())
+        mean = float(stars.mean()) if n else 0.0
+        std = float(stars.std(ddof=1)) if n > 1 else 0.0
+        half = z * std / math.sqrt(n) if n else 0.0
+        out.append(OriginStats(
+            origin=o, replicas=n,
+            survival=alive / n if n else 0.0,
+            survival_ci=_wilson(alive, n, z),
+            stars_mean=mean, stars_ci=(mean - half, mean + half), stars_std=std,
+            life_mean=float(life.mean()) if n else 0.0,
+            energy_mean=float(energy.mean()) if n else 0.0,
+        ))
+    return out
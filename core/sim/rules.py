@@ -1,7 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Sequence, Tuple, Any
+import numpy as np
 from core.models.enums import Health
+from core.sim.compiled import as_compiled
 
 # Texto UI -> enum (y marcadores especiales)
 _UI2ENUM = {
@@ -47,14 +49,120 @@ def _norm_id(x: Any) -> str:
 def _parse_health(txt: str):
     return _UI2ENUM.get(txt, Health.EXCELLENT)
 
+def eat_energy_gain(health, kg: float) -> float:
+    """Energía ganada al comer 'kg' de pasto según la salud (sin tope)."""
+    return kg * _GAIN_PER_KG.get(health, 2.0)
+
+def _nearest_viable(G, i: int, visited, life: float, energy: float, factor: float,
+                    skip_zero: bool = True) -> Tuple[int, float]:
+    """
+    Vecino más cercano de 'i' (no bloqueado, no visitado) cuyo coste quepa en vida/energía.
+    'visited' es un array booleano por índice de nodo (o None para no filtrar).
+    Empates: el primero en orden de adyacencia. Devuelve (-1, 0.0) si no hay.
+    Recorre el índice por distancia de G (near) y corta en el primer viable, o en
+    el primero que ya no alcanza (los siguientes son igual o más largos).
+    """
+    near, dist, indices = G.near, G.distance, G.indices
+    a = int(G.indptr[i])
+    for k in range(a, a + int(G.near_open[i])):
+        s = near[k]
+        d = float(dist[s])
+        if skip_zero and d <= 0.0:
+            continue
+        if life - d <= 0.0 or energy - d * factor <= 0.0:
+            break
+        v = int(indices[s])
+        if visited is not None and visited[v]:
+            continue
+        return v, d
+    return -1, 0.0
+
+def _viable_hop(G, i: int, j: int, visited, life: float, energy: float,
+                factor: float) -> Tuple[int, float]:
+    """
+    Igual que _nearest_viable pero con destino fijo 'j': (j, d) si la arista i->j
+    existe y cumple las mismas condiciones; si no, (-1, 0.0).
+    """
+    if j < 0 or visited[j]:
+        return -1, 0.0
+    nbrs, dist, blocked = G.row(i)
+    for k in np.flatnonzero(nbrs == j).tolist():
+        d = float(dist[k])
+        if blocked[k] or d <= 0.0:
+            continue
+        if life - d <= 0.0 or energy - d * factor <= 0.0:
+            continue
+        return j, d
+    return -1, 0.0
+
+def _next_hop(G, current: int, follow, step: int, visited, life: float, energy: float,
+              factor: float) -> Tuple[int, float]:
+    """Siguiente salto: voraz, o el indicado por la ruta fija 'follow' (índices)."""
+    if follow is None:
+        return _nearest_viable(G, current, visited, life, energy, factor)
+    j = follow[step] if step < len(follow) else -1
+    return _viable_hop(G, current, j, visited, life, energy, factor)
+
+def _stop_reason(follow, step: int) -> str:
+    if follow is None:
+        return "Sin vecinos viables (vida/energía insuficientes o todo visitado)"
+    if step >= len(follow):
+        return "Fin de la ruta"
+    return "Salto inviable en la ruta (vida/energía insuficientes, vía bloqueada o repetida)"
+
+def _follow_indices(G, path: Optional[Sequence[str]]):
+    """Ruta fija (ids) -> índices; ids inexistentes cortan la ruta ahí."""
+    if path is None:
+        return None
+    out = []
+    for sid in path:
+        i = G.index_of.get(_norm_id(sid))
+        if i is None:
+            break
+        out.append(i)
+    return out
+
+def _step3_rates(health) -> Tuple[float, float]:
+    """(factor de energía por a-luz, ganancia por kg) del punto 3 según la salud."""
+    factor = 2.0 if health == "moribundo" else _HEALTH_ENERGY_FACTOR.get(health, 1.3)
+    gain_per_kg = _GAIN_PER_KG.get(health if isinstance(health, Health) else Health.BAD, 2.0)
+    return factor, gain_per_kg
+
+def _stay_step3(cu, i: int, energy: float, hay: float, life: float,
+                gain_per_kg: float) -> Tuple[float, float, float]:
+    """Estancia del punto 3 en el nodo 'i': devuelve (energy, hay, life)."""
+    x_time, invest_e_per_x, life_delta = cu.research(i)
+    x_time = max(1e-6, x_time)                  # evita división por cero
+    invest_e_per_x = max(0.0, invest_e_per_x)
+
+    # Comer (solo si energía < 50%)
+    if energy < 50.0 and hay > 0.0:
+        max_kg_by_time = 0.5 / x_time     # 50% del tiempo disponible para comer
+        kg_to_eat = max(0.0, min(hay, max_kg_by_time))
+        if kg_to_eat > 0.0:
+            gained = kg_to_eat * gain_per_kg
+            energy = min(100.0, energy + gained)
+            hay -= kg_to_eat
+
+    # Investigación en el 50% restante del tiempo:
+    # gasto correcto: (0.5 / X) * (energía por X)
+    energy -= (0.5 / x_time) * invest_e_per_x
+
+    # Efecto vida de la estrella
+    life += life_delta
+    return energy, hay, life
+
 # ----- Punto 2 -----
 def compute_route_step2(G, origin_id: str, health_txt: str,
-                        energy_pct: float, hay_kg: float, life_ly: float) -> RouteResult:
+                        energy_pct: float, hay_kg: float, life_ly: float,
+                        path: Optional[Sequence[str]] = None) -> RouteResult:
     """
     Ruta simple (sin comer ni investigar):
     - consumo = distancia * factor
     - vida = distancia
     - movimiento voraz al vecino NO visitado más cercano
+    Si se da 'path' (empezando en el origen), se sigue esa ruta con las mismas
+    reglas en vez de elegir el vecino más cercano, cortando en el primer salto inviable.
     """
     origin = _norm_id(origin_id)
     health = _parse_health(health_txt)
@@ -70,58 +178,39 @@ def compute_route_step2(G, origin_id: str, health_txt: str,
     energy = float(energy_pct)
     life   = float(life_ly)
 
-    if origin not in G.G.nodes:
+    o = G.index_of.get(origin)
+    if o is None:
         return RouteResult([], [], [], energy, life,
                         "Origen inexistente en el grafo", hay_left=float(hay_kg),
                         initial_energy=energy, initial_hay=float(hay_kg), initial_life=life)
 
-    visited = {origin}
-    path = [origin]
-    edges = []
-    current = origin
+    follow = _follow_indices(G, path)
+    visited = np.zeros(G.n, dtype=bool)
+    visited[o] = True
+    order = [o]
+    current = o
 
     while True:
-        candidates = []
-        for v in G.G.neighbors(current):
-            v_id = _norm_id(v)
-            if v_id in visited:
-                continue
-            e = G.G[current][v]
-            if e.get("blocked", False):
-                continue
-
-            d = float(e.get("distance", 0.0))
-            if d <= 0:
-                continue
-
-            life_cost = d
-            energy_cost = d * factor
-
-            if life - life_cost <= 0 or energy - energy_cost <= 0:
-                continue
-
-            candidates.append((d, v_id, energy_cost, life_cost))
-
-        if not candidates:
-            reason = "Sin vecinos viables (vida/energía insuficientes o todo visitado)"
+        # Tomar el vecino más cercano que quepa en vida/energía
+        nxt, d = _next_hop(G, current, follow, len(order), visited, life, energy, factor)
+        if nxt < 0:
+            reason = _stop_reason(follow, len(order))
             break
 
-        # Tomar el vecino más cercano
-        candidates.sort(key=lambda t: t[0])
-        d, nxt, e_cost, l_cost = candidates[0]
-
-        life -= l_cost
-        energy -= e_cost
+        life -= d
+        energy -= d * factor
 
-        edges.append((current, nxt))
-        path.append(nxt)
-        visited.add(nxt)
+        order.append(nxt)
+        visited[nxt] = True
         current = nxt
 
+    path = [G.ids[i] for i in order]
+    edges = list(zip(path, path[1:]))
+
     return RouteResult(
         path=path,
         edges=edges,
-        visited=list(visited),
+        visited=list(path),
         remaining_energy=max(0.0, min(100.0, energy)),
         remaining_life=max(0.0, life),
         reason=reason,
@@ -131,42 +220,12 @@ def compute_route_step2(G, origin_id: str, health_txt: str,
        initial_life=float(life_ly),
     )
 
-# Helpers robustos para leer estrellas e investigación
-def _get_star(u, sid: str):
-    """Busca la estrella por id en u.stars (lista de modelos o dicts)."""
-    for s in getattr(u, "stars", []):
-        if isinstance(s, dict):
-            _id = s.get("id")
-        else:
-            _id = getattr(s, "id", None)
-        if str(_id) == str(sid):
-            return s
-    return None
-
-def _get_research(star) -> Dict[str, float]:
-    """Lee research compatible con modelo o dict; devuelve dict simple con defaults."""
-    if star is None:
-        return {}
-    r = None
-    if isinstance(star, dict):
-        r = star.get("research")
-    else:
-        r = getattr(star, "research", None)
-    if r is None:
-        return {}
-    def g(o, k, d=0.0):
-        return (o.get(k, d) if isinstance(o, dict) else getattr(o, k, d))
-    # x_time_per_kg = "X tiempo por kg"
-    # invest_energy_per_x = "energía por X tiempo"
-    return {
-        "x_time_per_kg":       float(g(r, "x_time_per_kg", 1.0) or 1.0),
-        "invest_energy_per_x": float(g(r, "invest_energy_per_x", 0.0) or 0.0),
-        "disease_life_delta":  float(g(r, "disease_life_delta", 0.0) or 0.0),
-    }
-
 def compute_route_step3(G, u, origin_id: str, health_txt: str,
-                        energy_pct: float, hay_kg: float, life_ly: float) -> RouteResult:
+                        energy_pct: float, hay_kg: float, life_ly: float,
+                        path: Optional[Sequence[str]] = None) -> RouteResult:
     """
+    'u' puede ser el universo o un CompiledUniverse (se compila aquí si hace falta).
+    'path' opcional: evalúa esa ruta fija con las mismas reglas (ver compute_route_step2).
     Heurística voraz con estancia por estrella:
     - 50% del tiempo: comer si energía < 50% (kg = min(hay, 0.5 / X))
     * ganancia_energía = kg * gain_per_kg (cap a 100%)
@@ -183,8 +242,7 @@ def compute_route_step3(G, u, origin_id: str, health_txt: str,
                             initial_energy=float(energy_pct), initial_hay=float(hay_kg), 
                             initial_life=float(life_ly))
 
-    factor = 2.0 if health == "moribundo" else _HEALTH_ENERGY_FACTOR.get(health, 1.3)
-    gain_per_kg = _GAIN_PER_KG.get(health if isinstance(health, Health) else Health.BAD, 2.0)
+    factor, gain_per_kg = _step3_rates(health)
 
     energy = float(energy_pct)
     life   = float(life_ly)
@@ -195,39 +253,23 @@ def compute_route_step3(G, u, origin_id: str, health_txt: str,
     initial_hay = hay
     initial_life = life
 
-    if origin not in G.G.nodes:
+    o = G.index_of.get(origin)
+    if o is None:
         return RouteResult([], [], [], energy, life, "Origen inexistente en el grafo", hay_left=hay,
                           initial_energy=initial_energy, initial_hay=initial_hay, initial_life=initial_life)
 
-    visited = {origin}
-    path: List[str] = [origin]
-    edges_path: List[Tuple[str, str]] = []
-    current = origin
+    cu = as_compiled(u, G)
+    follow = _follow_indices(G, path)
+    visited = np.zeros(G.n, dtype=bool)
+    visited[o] = True
+    order = [o]
+    current = o
     died = False
     reason = "OK"
 
     while True:
         # ----- Estancia en estrella actual -----
-        r = _get_research(_get_star(u, current))
-        x_time = max(1e-6, r.get("x_time_per_kg", 1.0))         # evita división por cero
-        invest_e_per_x = max(0.0, r.get("invest_energy_per_x", 0.0))
-        life_delta     = float(r.get("disease_life_delta", 0.0))
-
-        # Comer (solo si energía < 50%)
-        if energy < 50.0 and hay > 0.0:
-            max_kg_by_time = 0.5 / x_time     # 50% del tiempo disponible para comer
-            kg_to_eat = max(0.0, min(hay, max_kg_by_time))
-            if kg_to_eat > 0.0:
-                gained = kg_to_eat * gain_per_kg
-                energy = min(100.0, energy + gained)
-                hay -= kg_to_eat
-
-        # Investigación en el 50% restante del tiempo:
-        # gasto correcto: (0.5 / X) * (energía por X)
-        energy -= (0.5 / x_time) * invest_e_per_x
-
-        # Efecto vida de la estrella
-        life += life_delta
+        energy, hay, life = _stay_step3(cu, current, energy, hay, life, gain_per_kg)
 
         # corte si muere o queda sin energía tras la estancia
         if energy <= 0.0 or life <= 0.0:
@@ -236,41 +278,25 @@ def compute_route_step3(G, u, origin_id: str, health_txt: str,
             break
 
         # ----- Movimiento voraz -----
-        candidates: List[Tuple[float, str, float, float]] = []  # (dist, v, e_cost, l_cost)
-        for v in G.G.neighbors(current):
-            v_id = _norm_id(v)
-            if v_id in visited:
-                continue
-            e = G.G[current][v]
-            if e.get("blocked", False):
-                continue
-            d = float(e.get("distance", 0.0))
-            if d <= 0.0:
-                continue
-            life_cost   = d
-            energy_cost = d * factor
-            if life - life_cost <= 0.0 or energy - energy_cost <= 0.0:
-                continue
-            candidates.append((d, v_id, energy_cost, life_cost))
-
-        if not candidates:
-            reason = "Sin vecinos viables (vida/energía insuficientes o todo visitado)"
+        nxt, d = _next_hop(G, current, follow, len(order), visited, life, energy, factor)
+        if nxt < 0:
+            reason = _stop_reason(follow, len(order))
             break
 
-        candidates.sort(key=lambda t: t[0])
-        d, nxt, e_cost, l_cost = candidates[0]
-        life   -= l_cost
-        energy -= e_cost
+        life   -= d
+        energy -= d * factor
 
-        edges_path.append((current, nxt))
-        path.append(nxt)
-        visited.add(nxt)
+        order.append(nxt)
+        visited[nxt] = True
         current = nxt
 
+    path = [G.ids[i] for i in order]
+    edges_path = list(zip(path, path[1:]))
+
     return RouteResult(
         path=path,
         edges=edges_path,
-        visited=list(visited),
+        visited=list(path),
         remaining_energy=max(0.0, min(100.0, energy)),
         remaining_life=max(0.0, life),
         reason=reason,
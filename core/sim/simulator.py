@@ -1,15 +1,16 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Tuple
+import asyncio
+import numpy as np
+from typing import Any,  AsyncIterator, Iterable, Iterator, List, Dict, Optional, Tuple
 
+from core.sim.compiled import as_compiled
 from core.sim.rules import (
-    _get_star,
-    _get_research,
-    _UI2ENUM,
     _HEALTH_ENERGY_FACTOR,
     _GAIN_PER_KG,
     _norm_id,
     _parse_health,
+    _nearest_viable,
 )
 
 # ---------------------------------------------------------------------
@@ -29,10 +30,140 @@ class Step:
     life_before: float
     life_after: float
 
+_FLOAT_FIELDS = ("distance", "energy_before", "energy_after", "grass_before",
+                 "grass_after", "life_before", "life_after")
+
+class StepColumns:
+    """
+    Almacén columnar de pasos: un array NumPy por campo (crece por duplicación)
+    y una tabla de ids de estrella. 'from_star'/'to_star' se guardan como códigos
+    de esa tabla; el código 0 es "" (= sin salto, to_star None).
+    Se comporta como la lista de Step de antes: len, iteración, índices y
+    cortes devuelven Step (vistas construidas bajo demanda), append(Step).
+    """
+
+    def __init__(self, capacity: int = 64):
+        cap = max(1, capacity)
+        self.n = 0
+        self.ids: List[str] = [""]
+        self._code: Dict[str, int] = {"": 0}
+        self.from_code = np.zeros(cap, dtype=np.int32)
+        self.to_code = np.zeros(cap, dtype=np.int32)
+        self._float = {f: np.zeros(cap, dtype=np.float64) for f in _FLOAT_FIELDS}
+
+    # ---------- escritura ----------
+
+    def _intern(self, sid: Optional[str]) -> int:
+        if sid is None:
+            return 0
+        c = self._code.get(sid)
+        if c is None:
+            c = self._code[sid] = len(self.ids)
+            self.ids.append(sid)
+        return c
+
+    def _grow(self, need: int):
+        cap = len(self.from_code)
+        if need <= cap:
+            return
+        cap = max(need, 2 * cap)
+        self.from_code = np.resize(self.from_code, cap)
+        self.to_code = np.resize(self.to_code, cap)
+        for f, a in self._float.items():
+            self._float[f] = np.resize(a, cap)
+
+    def append(self, step: Step):
+        i = self.n
+        self._grow(i + 1)
+        self.from_code[i] = self._intern(step.from_star)
+        self.to_code[i] = self._intern(step.to_star)
+        for f in _FLOAT_FIELDS:
+            self._float[f][i] = getattr(step, f)
+        self.n = i + 1
+
+    def extend(self, steps: Iterable[Step]):
+        for st in steps:
+            self.append(st)
+
+    # ---------- lectura ----------
+
+    def column(self, name: str) -> np.ndarray:
+        """Vista (sin copia) de un campo numérico o de los códigos from/to."""
+        if name == "from_code":
+            return self.from_code[:self.n]
+        if name == "to_code":
+            return self.to_code[:self.n]
+        return self._float[name][:self.n]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _step(self, i: int) -> Step:
+        t = int(self.to_code[i])
+        vals = {f: float(self._float[f][i]) for f in _FLOAT_FIELDS}
+        return Step(from_star=self.ids[self.from_code[i]],
+                    to_star=self.ids[t] if t else None, **vals)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            out = StepColumns(0)
+            out.ids, out._code = list(self.ids), dict(self._code)
+            out.from_code = self.from_code[:self.n][key].copy()
+            out.to_code = self.to_code[:self.n][key].copy()
+            out._float = {f: a[:self.n][key].copy() for f, a in self._float.items()}
+            out.n = len(out.from_code)
+            return out
+        i = range(self.n)[key]           # índices negativos y fuera de rango como en list
+        return self._step(i)
+
+    def __iter__(self) -> Iterator[Step]:
+        for i in range(self.n):
+            yield self._step(i)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (StepColumns, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"StepColumns(n={self.n})"
+
+    def to_frame(self):
+        """
+        DataFrame con las columnas de to_rows(): los floats son vistas de los
+        arrays (sin copia) y from_star/to_star categorías sobre la tabla de ids.
+        """
+        import pandas as pd
+        cats = pd.Index(self.ids, dtype=object)
+        cols: Dict[str, Any] = {
+            "from_star": pd.Categorical.from_codes(self.column("from_code"), categories=cats),
+            "to_star": pd.Categorical.from_codes(self.column("to_code"), categories=cats),
+        }
+        for f in _FLOAT_FIELDS:
+            cols[f] = self.column(f)
+        return pd.DataFrame(cols, copy=False)
+
+@dataclass
+class Checkpoint:
+    """Estado justo antes de la estancia en 'node' (para reanudar la simulación)."""
+    node: str
+    energy: float
+    hay: float
+    life: float
+    visited: int                     # largo de visited_order en ese momento
+
+@dataclass
+class StepEvent:
+    """Evento del stream del punto 3: estancia 'index' y su resultado."""
+    index: int
+    checkpoint: Checkpoint           # estado antes de la estancia
+    step: Optional[Step]             # None si murió durante la estancia
+    state: Dict                      # estado tras el paso (como simulate_step3)
+
 @dataclass
 class RunLog:
     """Bitácora de la simulación completa."""
-    steps: List[Step] = field(default_factory=list)
+    steps: StepColumns = field(default_factory=StepColumns)   # columnar; se usa como List[Step]
     visited_order: List[str] = field(default_factory=list)   # orden de visita (IDs)
     stop_reason: str = ""                                    # por qué se detuvo
     final_energy: float = 0.0
@@ -44,6 +175,55 @@ class RunLog:
     visited_stars: List[Dict] = field(default_factory=list)  # [{"star_id": str, "constellation_id": str, "grass_consumed": float, "time_invested": float}, ...]
     total_time_invested: float = 0.0                         # tiempo total de investigación
     died: bool = False                                        # si el burro murió
+    death_checkpoint: Optional[Checkpoint] = None             # estancia en la que murió
+    health: str = ""                                          # salud usada (texto UI)
+    max_steps: int = 0
+
+    def record(self, ev: StepEvent):
+        """Acumula un evento de iter_step3 (RunLog como colector del stream)."""
+        state = ev.state
+        if ev.step is None:
+            # murió durante la estancia (su checkpoint no tiene paso donde leerlo)
+            self.death_checkpoint = ev.checkpoint
+            self.stop_reason = state["reason"]
+            self.final_energy = state["energy"]
+            self.final_grass = state["hay"]
+            self.final_life = state["life"]
+            self.died = True  # Marcar que murió
+            return
+
+        # registrar el paso
+        self.steps.append(ev.step)
+        if state["next"] is None:
+            # no hay movimiento posible
+            self.stop_reason = state["reason"]
+            self.final_energy = state["energy"]
+            self.final_grass = state["hay"]
+            self.final_life = state["life"]
+        else:
+            self.visited_order.append(state["next"])
+
+    def n_checkpoints(self) -> int:
+        """Cantidad de estancias (pasos + la estancia de la muerte, si la hubo)."""
+        return len(self.steps) + (self.death_checkpoint is not None)
+
+    def checkpoint(self, k: int) -> Checkpoint:
+        """
+        Estado antes de la estancia k, leído de la columna k de los pasos
+        (from_star / *_before); antes de la estancia k visited_order tenía k + 1
+        estrellas, porque solo el último paso puede quedar sin salto.
+        """
+        if k == len(self.steps) and self.death_checkpoint is not None:
+            return self.death_checkpoint
+        st = self.steps[k]
+        return Checkpoint(st.from_star, st.energy_before, st.grass_before, st.life_before, k + 1)
+
+    def to_frame(self):
+        """Pasos como DataFrame (mismas columnas que to_rows, sin pasar por dicts)."""
+        if isinstance(self.steps, StepColumns):
+            return self.steps.to_frame()
+        import pandas as pd
+        return pd.DataFrame(self.to_rows())
 
     def to_rows(self) -> List[Dict]:
         """Convierte los pasos a filas"""
@@ -96,7 +276,11 @@ def simulate_step3(
     - Vida += disease_life_delta
     2) Si sigue vivo, escoge **vecino más cercano** cuyo coste quepa
     en energía/vida y no esté bloqueado. Aplica movimiento.
+
+    'u' puede ser el universo o un CompiledUniverse; en bucles conviene pasar
+    el compilado para no recompilar en cada paso.
     """
+    cu = as_compiled(u, G)
     current = _norm_id(origin_id)
     health = _parse_health(health_txt)
     energy = float(energy_pct)
@@ -104,11 +288,9 @@ def simulate_step3(
     life = float(life_ly)
 
     # --- datos de la estrella actual
-    star = _get_star(u, current)
-    r = _get_research(star)
-    x_time = max(1e-9, r.get("x_time_per_kg", 1.0))
-    invest_e = r.get("invest_energy_per_x", 0.0)
-    life_delta = r.get("disease_life_delta", 0.0)
+    i = G.index_of.get(current)
+    x_time, invest_e, life_delta = cu.research(i)
+    x_time = max(1e-9, x_time)
 
     # estados antes de la estancia
     energy_before = energy
@@ -140,21 +322,11 @@ def simulate_step3(
 
     # --- elección de vecino: más cercano quepa en presupuesto
     factor = _HEALTH_ENERGY_FACTOR.get(health, 1.3)
-    candidates: List[Tuple[float, str, float, float]] = []  # (d, v_id, e_cost, l_cost)
-
-    for v in G.G.neighbors(current):
-        v_id = _norm_id(v)
-        e = G.G[current][v]
-        if e.get("blocked", False):
-            continue
-        d = float(e.get("distance", 0.0))
-        life_cost = d
-        energy_cost = d * factor
-        if life - life_cost <= 0.0 or energy - energy_cost <= 0.0:
-            continue
-        candidates.append((d, v_id, energy_cost, life_cost))
-
-    if not candidates:
+    nxt_i, d = -1, 0.0
+    if i is not None:
+        nxt_i, d = _nearest_viable(G, i, None, life, energy, factor, skip_zero=False)
+
+    if nxt_i < 0:
         # No se puede mover: generamos un Step de "estancia sin salto"
         step = Step(
             from_star=current,
@@ -175,11 +347,9 @@ def simulate_step3(
             "reason": "Sin vecinos viables",
         }
 
-    candidates.sort(key=lambda t: t[0])  # más cercano primero
-    d, nxt, e_cost, l_cost = candidates[0]
-
-    energy_after = energy - e_cost
-    life_after = life - l_cost
+    nxt = G.ids[nxt_i]
+    energy_after = energy - d * factor
+    life_after = life - d
     hay_after = hay
 
     step = Step(
@@ -206,6 +376,83 @@ def simulate_step3(
 # EJECUTAR SIMULACIÓN COMPLETA (Punto 3)
 # ---------------------------------------------------------------------
 
+def _iter_step3_from(u, G, current: str, health_txt: str, energy: float, hay: float,
+                     life: float, steps_left: int, visited: int) -> Iterator[StepEvent]:
+    """Stream del punto 3 desde un estado dado ('visited' = largo de visited_order)."""
+    for index in range(steps_left):
+        cp = Checkpoint(current, energy, hay, life, visited)
+        step, state = simulate_step3(u, G, current, health_txt, energy, hay, life)
+        yield StepEvent(index, cp, step, state)
+        if step is None or state["next"] is None:
+            return
+        current = state["next"]
+        energy, hay, life = state["energy"], state["hay"], state["life"]
+        visited += 1
+
+
+def iter_step3(
+    u,
+    G,
+    origin_id: str,
+    health_txt: str,
+    energy_pct: float,
+    hay_kg: float,
+    life_ly: float,
+    max_steps: int = 1000,
+) -> Iterator[StepEvent]:
+    """
+    Igual que run_full_step3 pero sin acumular: genera un StepEvent por estancia
+    apenas se calcula (paso + estado resultante). El último evento tiene
+    state["next"] None (muerte o sin vecinos); si se llega a max_steps el stream
+    simplemente termina. Memoria constante: el consumidor decide qué guardar.
+    """
+    cu = as_compiled(u, G)
+    yield from _iter_step3_from(cu, G, _norm_id(origin_id), health_txt, float(energy_pct),
+                                float(hay_kg), float(life_ly), max_steps, 1)
+
+
+async def aiter_step3(
+    u,
+    G,
+    origin_id: str,
+    health_txt: str,
+    energy_pct: float,
+    hay_kg: float,
+    life_ly: float,
+    max_steps: int = 1000,
+    every: int = 1,
+) -> AsyncIterator[StepEvent]:
+    """
+    Variante asíncrona de iter_step3: cede el control al event loop cada
+    'every' pasos (>= 1) para que la UI/servidor siga respondiendo.
+    """
+    if every < 1:
+        raise ValueError(f"'every' debe ser al menos 1 (se recibió {every})")
+    for ev in iter_step3(u, G, origin_id, health_txt, energy_pct, hay_kg, life_ly, max_steps):
+        yield ev
+        if (ev.index + 1) % every == 0:
+            await asyncio.sleep(0)
+
+
+def _run_step3_from(u, G, log: RunLog, current: str, health_txt: str,
+                    energy: float, hay: float, life: float, steps_left: int) -> RunLog:
+    """Acumula en 'log' el stream del punto 3 desde un estado dado."""
+    for ev in _iter_step3_from(u, G, current, health_txt, energy, hay, life, steps_left,
+                               len(log.visited_order)):
+        log.record(ev)
+        energy, hay, life = ev.state["energy"], ev.state["hay"], ev.state["life"]
+        if ev.step is None or ev.state["next"] is None:
+            break
+    else:
+        # agotó max_steps
+        log.stop_reason = "Límite de pasos alcanzado"
+        log.final_energy = energy
+        log.final_grass = hay
+        log.final_life = life
+
+    return log
+
+
 def run_full_step3(
     u,
     G,
@@ -224,7 +471,11 @@ def run_full_step3(
     - stop_reason
     - final_energy / final_grass / final_life
     - initial_energy / initial_grass / initial_life (guardados al inicio)
+    - checkpoint(k) (estado antes de cada estancia, para resume_step3)
+
+    'u' puede ser el universo o un CompiledUniverse (se compila una sola vez).
     """
+    u = as_compiled(u, G)
     current = _norm_id(origin_id)
     energy = float(energy_pct)
     hay = float(hay_kg)
@@ -234,43 +485,54 @@ def run_full_step3(
     log.initial_energy = energy    # Guardar valores iniciales
     log.initial_grass = hay
     log.initial_life = life
+    log.health = health_txt
+    log.max_steps = max_steps
     log.visited_order.append(current)
 
-    for _ in range(max_steps):
-        step, state = simulate_step3(u, G, current, health_txt, energy, hay, life)
-
-        if step is None:
-            # murió durante la estancia
-            log.stop_reason = state["reason"]
-            log.final_energy = state["energy"]
-            log.final_grass = state["hay"]
-            log.final_life = state["life"]
-            log.died = True  # Marcar que murió
-            break
-
-        # registrar el paso
-        log.steps.append(step)
-        energy = state["energy"]
-        hay = state["hay"]
-        life = state["life"]
-        nxt = state["next"]
+    return _run_step3_from(u, G, log, current, health_txt, energy, hay, life, max_steps)
 
-        if nxt is None:
-            # no hay movimiento posible
-            log.stop_reason = state["reason"]
-            log.final_energy = energy
-            log.final_grass = hay
-            log.final_life = life
-            break
 
-        current = nxt
-        log.visited_order.append(current)
+def resume_step3(
+    log: RunLog,
+    u,
+    G,
+    changed_stars: Iterable[str] = (),
+    changed_edges: Iterable[Tuple[str, str]] = (),
+) -> RunLog:
+    """
+    Re-simula 'log' (de run_full_step3) tras editar estrellas o vías.
+    Una estancia solo depende de la investigación de su estrella y de las vías
+    que salen de ella, así que se reutiliza el prefijo de pasos anterior a la
+    primera estancia en una estrella tocada (editada o extremo de una vía
+    cambiada) y se sigue desde su checkpoint. 'log' no se modifica.
+    """
+    touched = {_norm_id(s) for s in changed_stars}
+    for a, b in changed_edges:
+        touched.add(_norm_id(a))
+        touched.add(_norm_id(b))
 
+    n = len(log.steps)
+    if isinstance(log.steps, StepColumns):
+        codes = [c for sid, c in log.steps._code.items() if sid in touched]
+        hits = np.flatnonzero(np.isin(log.steps.column("from_code"), codes))
+        k = int(hits[0]) if len(hits) else None
     else:
-        # agotó max_steps
-        log.stop_reason = "Límite de pasos alcanzado"
-        log.final_energy = energy
-        log.final_grass = hay
-        log.final_life = life
+        k = next((i for i, st in enumerate(log.steps) if st.from_star in touched), None)
+    if k is None:
+        dc = log.death_checkpoint
+        if dc is None or dc.node not in touched:
+            return log
+        k = n
 
-    return log
+    c = log.checkpoint(k)
+    out = RunLog(
+        steps=log.steps[:k],
+        visited_order=log.visited_order[:c.visited],
+        initial_energy=log.initial_energy,
+        initial_grass=log.initial_grass,
+        initial_life=log.initial_life,
+        health=log.health,
+        max_steps=log.max_steps,
+    )
+    return _run_step3_from(as_compiled(u, G), G, out, c.node, log.health,
+                           c.energy, c.hay, c.life, log.max_steps - k)
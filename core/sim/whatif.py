@@ -0,0 +1,140 @@
+"""
+¿Qué pasa si se bloquea esta vía? Criticidad de aristas para una ruta.
+
+Las rutas del punto 2 / punto 3 son voraces: en cada estrella toman el vecino
+viable más cercano. Bloquear una arista que la ruta no recorre solo quita un
+candidato que no se eligió, así que la ruta no cambia. Por eso solo se
+re-simulan los escenarios que bloquean una arista usada; los demás heredan el
+resultado del escenario del que provienen.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from core.sim.compiled import as_compiled
+from core.sim.rules import compute_route_step2, compute_route_step3
+from core.sim.simulator import run_full_step3
+
+RULES = ("step2", "step3", "sim3")
+
+
+@dataclass
+class EdgeImpact:
+    """Una fila de la tabla: resultado con 'edges' bloqueadas frente a la ruta base."""
+    edges: Tuple[Tuple[str, str], ...]
+    used: bool                  # la ruta base recorre alguna de 'edges'
+    simulated: bool             # False si se heredó sin volver a simular
+    stars: int
+    delta_stars: int
+    remaining_life: float
+    delta_life: float
+    remaining_energy: float
+    delta_energy: float
+    died: bool
+    path: List[str]
+
+
+@dataclass
+class _Outcome:
+    path: List[str]
+    life: float
+    energy: float
+    died: bool
+    used: FrozenSet[int]        # aristas (id no dirigido) recorridas
+
+
+def _evaluate(G, cu, rules: str, params) -> _Outcome:
+    """Corre la ruta con las reglas pedidas y anota las aristas recorridas."""
+    if rules == "sim3":
+        log = run_full_step3(cu, G, *params)
+        path, life, energy, died = log.visited_order, log.final_life, log.final_energy, log.died
+        hops = log.edges()
+    else:
+        if rules == "step2":
+            r = compute_route_step2(G, *params)
+        else:
+            r = compute_route_step3(G, cu, *params)
+        path, life, energy, died, hops = r.path, r.remaining_life, r.remaining_energy, r.died, r.edges
+    used = frozenset(int(G.edge_of[G.edge_slot(a, b)]) for a, b in hops)
+    return _Outcome(list(path), life, energy, died, used)
+
+
+def edge_criticality(G, u, origin_id: str, health_txt: str, energy_pct: float,
+                     hay_kg: float, life_ly: float, rules: str = "step3", k: int = 1,
+                     max_scenarios: Optional[int] = 10000) -> List[EdgeImpact]:
+    """
+    Tabla de criticidad para bloquear cada arista no bloqueada (k=1) y, con k>1,
+    combinaciones de hasta k aristas. rules: 'step2' (compute_route_step2),
+    'step3' (compute_route_step3) o 'sim3' (run_full_step3).
+    Las combinaciones se arman agregando solo aristas que usa la ruta del escenario
+    anterior (las demás no la cambian); 'max_scenarios' limita las re-simulaciones.
+    Orden: más estrellas perdidas primero, luego muerte, luego vida perdida.
+    G se modifica temporalmente y se restaura al terminar.
+    """
+    if rules not in RULES:
+        raise ValueError(f"Reglas desconocidas: {rules} (usar {', '.join(RULES)})")
+    cu = as_compiled(u, G)
+    params = (origin_id, health_txt, energy_pct, hay_kg, life_ly)
+    free = [e for e in range(len(G.edge_u)) if not G.blocked[G.edge_slots[e, 0]]]
+
+    base = _evaluate(G, cu, rules, params)
+    results: Dict[FrozenSet[int], _Outcome] = {frozenset(): base}
+    simulated: Dict[FrozenSet[int], bool] = {}
+    budget = max_scenarios
+
+    def run(scenario: FrozenSet[int]) -> _Outcome:
+        edges = list(scenario)
+        G.set_blocked_edges(edges, True)
+        try:
+            return _evaluate(G, cu, rules, params)
+        finally:
+            G.set_blocked_edges(edges, False)
+
+    frontier = [frozenset()]
+    for _ in range(max(0, k)):
+        nxt = []
+        for parent in frontier:
+            prev = results[parent]
+            for e in free:
+                if e in parent:
+                    continue
+                s = parent | {e}
+                if s in results:
+                    continue
+                if e not in prev.used:
+                    # arista no recorrida: misma ruta que el escenario padre
+                    if len(s) == 1:
+                        results[s] = prev
+                        simulated[s] = False
+                    continue
+                if budget is not None and budget <= 0:
+                    continue
+                results[s] = run(s)
+                simulated[s] = True
+                if budget is not None:
+                    budget -= 1
+                nxt.append(s)
+        frontier = nxt
+
+    ids = G.ids
+    table = []
+    for s, out in results.items():
+        if not s:
+            continue
+        edges = tuple(sorted((ids[G.edge_u[e]], ids[G.edge_v[e]]) for e in s))
+        table.append(EdgeImpact(
+            edges=edges,
+            used=bool(s & base.used),
+            simulated=simulated[s],
+            stars=len(set(out.path)),
+            delta_stars=len(set(out.path)) - len(set(base.path)),
+            remaining_life=out.life,
+            delta_life=out.life - base.life,
+            remaining_energy=out.energy,
+            delta_energy=out.energy - base.energy,
+            died=out.died,
+            path=out.path,
+        ))
+    table.sort(key=lambda r: (r.delta_stars, not r.died, r.delta_life, r.delta_energy,
+                              len(r.edges), r.edges))
+    return table
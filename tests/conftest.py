@@ -0,0 +1,59 @@
+"""
+Fixtures comunes de las pruebas: universos chicos aleatorios con semilla fija.
+
+Las pruebas comparan cada versión optimizada contra su referencia (la versión
+simple, networkx o fuerza bruta) sobre muchos universos chicos.
+"""
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]  # raíz de PruebaGrafos
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from core.io.schema import UniverseIn
+
+
+def random_universe(seed: int, n: int, p: float, blocked: float = 0.05,
+                    hyper: float = 0.1, extras: bool = False) -> UniverseIn:
+    """
+    'n' estrellas en un cuadrado de 50 x 50 y cada par unido con probabilidad 'p'
+    (distancia sin dar: se calcula por coordenadas). extras=True agrega casos
+    borde: distancias explícitas, aristas repetidas al revés, un lazo y una
+    arista hacia una estrella inexistente.
+    """
+    rng = random.Random(seed)
+    stars = [{
+        "id": str(i), "name": f"Estrella {i}", "galaxyId": "G1",
+        "x": rng.random() * 50, "y": rng.random() * 50,
+        "type": "hypergiant" if rng.random() < hyper else "normal",
+        "research": {"x_time_per_kg": rng.uniform(0.05, 2.0),
+                     "invest_energy_per_x": rng.uniform(0.0, 8.0),
+                     "disease_life_delta": rng.uniform(-5.0, 3.0)},
+    } for i in range(n)]
+    edges = [{"u": str(i), "v": str(j), "blocked": rng.random() < blocked}
+             for i in range(n) for j in range(i + 1, n) if rng.random() < p]
+    if extras and edges:
+        for e in rng.sample(edges, min(3, len(edges))):
+            e["distance"] = rng.uniform(0.5, 30.0)
+        e = rng.choice(edges)
+        edges.append({"u": e["v"], "v": e["u"], "distance": rng.uniform(0.5, 30.0)})
+        edges.append({"u": "0", "v": "0", "distance": 1.0})
+        edges.append({"u": "0", "v": "fantasma", "distance": 1.0})
+    return UniverseIn.model_validate({
+        "galaxies": [{"id": "G1", "name": "Galaxia"}],
+        "constellations": [{"id": "C1", "name": "Constelación", "galaxyId": "G1",
+                            "color": "#1f77b4"}],
+        "stars": stars,
+        "memberships": [{"starId": s["id"], "constellationId": "C1"} for s in stars],
+        "edges": edges,
+        "hyperlanes": [],
+    })
+
+
+@pytest.fixture
+def make_universe():
+    return random_universe
@@ -0,0 +1,40 @@
+"""Planificador anytime: arranca en la voraz y solo entrega mejoras."""
+import random
+
+from core.graph.space_graph import SpaceGraph
+from core.routing.anytime import _route_key, iter_anytime_routes, plan_anytime
+from core.routing.dynamic_route import RESTART_WEIGHTS
+from core.sim.compiled import compile_universe
+from core.sim.rules import compute_route_step3
+
+HEALTHS = ("Excelente", "Buena", "Mala", "Moribundo")
+ROUNDS = dict(time_budget=None, widths=(1, 4, 16), weights=RESTART_WEIGHTS[:3])
+
+
+def _summary(r):
+    return r.path, r.remaining_life, r.remaining_energy, r.hay_left, r.died
+
+
+def test_anytime_starts_greedy_and_only_improves(make_universe):
+    rng = random.Random(5)
+    for seed in range(25):
+        n = rng.randint(3, 30)
+        u = make_universe(seed, n, min(1.0, 5 / n))
+        G = SpaceGraph(u)
+        cu = compile_universe(u, G)
+        args = (str(rng.randrange(n)), rng.choice(HEALTHS), rng.uniform(20, 100),
+                rng.uniform(0, 20), rng.uniform(20, 300))
+        greedy = compute_route_step3(G, cu, *args)
+        # reevaluar la ruta voraz como ruta fija no cambia nada
+        assert _summary(compute_route_step3(G, cu, *args, path=greedy.path)) == _summary(greedy)
+
+        routes = list(iter_anytime_routes(G, cu, *args, **ROUNDS))
+        assert _summary(routes[0]) == _summary(greedy)
+        keys = [_route_key(r) for r in routes]
+        assert keys == sorted(keys) and len(set(keys)) == len(keys)
+        best = plan_anytime(G, cu, *args, **ROUNDS)
+        assert _summary(best) == _summary(routes[-1])
+
+        # sin presupuesto solo queda la voraz
+        only = list(iter_anytime_routes(G, cu, *args, time_budget=None, max_expansions=0))
+        assert [_summary(r) for r in only] == [_summary(greedy)]
@@ -0,0 +1,54 @@
+"""Rutas desde muchos orígenes frente a correr cada método origen por origen."""
+import random
+
+from core.graph.space_graph import SpaceGraph
+from core.models.donkey import Donkey
+from core.routing.batch import METHODS, route_from_origins
+from core.routing.dynamic_route import route_dynamic_beam
+from core.sim.compiled import compile_universe
+from core.sim.rules import _parse_health, compute_route_step2, compute_route_step3
+from core.sim.simulator import run_full_step3
+
+
+def _key(r):
+    return r.origin, r.method
+
+
+def test_batch_matches_single_origin_runs(make_universe):
+    rng = random.Random(4)
+    for seed in range(6):
+        n = rng.randint(3, 15)
+        u = make_universe(seed, n, min(1.0, 5 / n))
+        G = SpaceGraph(u)
+        cu = compile_universe(u, G)
+        params = (rng.choice(("Excelente", "Buena", "Mala")), rng.uniform(20, 100),
+                  rng.uniform(0, 20), rng.uniform(20, 300))
+        rows = route_from_origins(G, cu, *params, workers=1)
+        assert len(rows) == n * len(METHODS)
+        assert sorted(map(_key, rows)) == sorted(map(_key, route_from_origins(
+            G, cu, *params, origins=list(reversed(G.ids)), workers=2)))
+        by_key = {_key(r): r for r in rows}
+        donkey = Donkey(_parse_health(params[0]), 0.0, params[1], params[2], params[3])
+        for o in G.ids:
+            r2 = compute_route_step2(G, o, *params)
+            assert by_key[o, "step2"].stars == len(set(r2.path))
+            log = run_full_step3(cu, G, o, *params)
+            assert by_key[o, "step3"].stars == len(set(log.visited_order))
+            assert by_key[o, "step3"].died == log.died
+            path = route_dynamic_beam(G, cu, o, donkey, batched=True)
+            assert by_key[o, "beam"].stars == len(path)
+        # el rank ordena cada método: vivos primero y luego más estrellas
+        for m in METHODS:
+            group = [r for r in rows if r.method == m]
+            assert [r.rank for r in group] == list(range(1, n + 1))
+            keys = [(r.died, -r.stars) for r in group]
+            assert keys == sorted(keys)
+
+
+def test_dead_donkey_beam_row(make_universe):
+    """El beam no busca con el burro muerto: fila como la de compute_route_step3."""
+    u = make_universe(0, 8, 0.5)
+    G = SpaceGraph(u)
+    dead = compute_route_step3(G, u, "0", "Muerto", 50, 5, 100)
+    for r in route_from_origins(G, u, "Muerto", 50, 5, 100, methods=("beam",), workers=1):
+        assert (r.stars, r.distance, r.died, r.reason) == (1, 0.0, dead.died, dead.reason)
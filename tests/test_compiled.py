@@ -0,0 +1,31 @@
+"""Universo compilado frente a leer los modelos estrella por estrella."""
+import random
+
+from core.graph.space_graph import SpaceGraph
+from core.models.enums import StarType
+from core.sim.compiled import compile_universe
+from core.sim.rules import compute_route_step3
+from core.sim.simulator import run_full_step3
+
+
+def test_compiled_matches_models(make_universe):
+    rng = random.Random(2)
+    for seed in range(10):
+        n = rng.randint(2, 40)
+        u = make_universe(seed, n, min(1.0, 5 / n), extras=True)
+        G = SpaceGraph(u)
+        cu = compile_universe(u, G)
+        for s in u.stars:
+            i = G.index_of[s.id]
+            r = s.research
+            assert cu.research(i) == (r.x_time_per_kg, r.invest_energy_per_x,
+                                      r.disease_life_delta)
+            assert cu.is_hypergiant(i) == (s.type == StarType.HYPERGIANT)
+            assert cu.galaxies[cu.galaxy[i]] == s.galaxyId
+        # compilar antes o dejar que cada llamada compile da lo mismo
+        params = (str(rng.randrange(n)), "Buena", rng.uniform(20, 100), rng.uniform(0, 20),
+                  rng.uniform(50, 300))
+        assert compute_route_step3(G, u, *params) == compute_route_step3(G, cu, *params)
+        a, b = run_full_step3(u, G, *params), run_full_step3(cu, G, *params)
+        assert (a.steps, a.visited_order, a.stop_reason) == (b.steps, b.visited_order,
+                                                             b.stop_reason)
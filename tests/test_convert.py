@@ -0,0 +1,33 @@
+"""Conversor vectorizado del formato original frente al conversor de siempre."""
+import json
+from pathlib import Path
+
+import pytest
+
+from tools.convert_from_original import convert_original_fast, convert_original_to_universe
+from tools.universe_bin import universe_to_original
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+
+
+def _assert_same(fast, legacy):
+    assert fast.keys() == legacy.keys()
+    for k in legacy:
+        if k != "edges":
+            assert fast[k] == legacy[k], k
+    # distancias rellenadas con np.hypot: pueden diferir en el último bit de math.hypot
+    assert [dict(e, distance=None) for e in fast["edges"]] == \
+           [dict(e, distance=None) for e in legacy["edges"]]
+    assert [e["distance"] for e in fast["edges"]] == \
+           pytest.approx([e["distance"] for e in legacy["edges"]], rel=1e-12)
+
+
+def test_fast_converter_matches_legacy(make_universe):
+    sources = [json.loads((DATA / "Constellations (1).json").read_text(encoding="utf-8"))]
+    sources += [universe_to_original(make_universe(seed, 40, 0.2, extras=True))[0]
+                for seed in range(6)]
+    for src in sources:
+        legacy, legacy_warnings = convert_original_to_universe(src)
+        warnings = []
+        _assert_same(convert_original_fast(src, warnings.append), legacy)
+        assert warnings == legacy_warnings
@@ -0,0 +1,108 @@
+"""Beam dinámico: bitset + punteros al padre frente al beam original."""
+import heapq
+import random
+
+import pytest
+
+from core.graph.space_graph import SpaceGraph
+from core.models.donkey import Donkey
+from core.models.enums import Health
+from core.routing.dynamic_route import (ALPHA, BETA, GAMMA, _pareto_keep, route_dynamic_beam,
+                                        route_dynamic_beam_parallel, simulate_visit)
+from core.sim.compiled import compile_universe
+
+
+def _reference_beam(G, cu, s0, donkey, width):
+    """Beam original: visitados en frozenset y camino copiado en una tupla."""
+    start = (donkey.life_ly, donkey.energy_pct, donkey.grass_kg, frozenset([s0]), (s0,), 0.0)
+    beam, best = [start], start
+    while beam:
+        cand = []
+        for life0, energy0, grass0, visited, path, _ in beam:
+            for v, dist in G.neighbors_idx(path[-1]):
+                if v in visited:
+                    continue
+                life = life0 - dist
+                if life <= 0:
+                    continue
+                energy, grass = energy0, grass0
+                if G.hypergiant[v]:
+                    energy *= 1.5
+                    grass *= 2.0
+                energy, grass, life = simulate_visit(cu, v, energy, grass, life, donkey.health)
+                if energy <= 0 or life <= 0:
+                    continue
+                stars = len(visited) + 1
+                score = stars - ALPHA * (donkey.life_ly - life) + BETA * life + GAMMA * energy
+                ns = (life, energy, grass, visited | {v}, path + (v,), score)
+                cand.append(ns)
+                if stars > len(best[3]) or (stars == len(best[3]) and score > best[5]):
+                    best = ns
+        beam = heapq.nlargest(width, cand, key=lambda x: x[5])
+    return [G.ids[i] for i in best[4]]
+
+
+def _cases(make_universe, count):
+    rng = random.Random(7)
+    for seed in range(count):
+        n = rng.randint(3, 40)
+        u = make_universe(seed, n, min(1.0, 5 / n))
+        G = SpaceGraph(u)
+        donkey = Donkey(Health.EXCELLENT, 1, rng.uniform(20, 100), rng.uniform(0, 20),
+                        rng.uniform(20, 300))
+        yield G, compile_universe(u, G), rng.randrange(n), donkey, rng.choice([1, 4, 16])
+
+
+def test_scalar_matches_reference(make_universe):
+    for G, cu, s0, donkey, width in _cases(make_universe, 60):
+        got = route_dynamic_beam(G, cu, G.ids[s0], donkey, beam_width=width, prune=False)
+        assert got == _reference_beam(G, cu, s0, donkey, width)
+
+
+def test_batched_matches_scalar(make_universe):
+    for G, cu, s0, donkey, width in _cases(make_universe, 60):
+        kw = dict(beam_width=width, prune=False)
+        assert (route_dynamic_beam(G, cu, G.ids[s0], donkey, batched=True, **kw)
+                == route_dynamic_beam(G, cu, G.ids[s0], donkey, batched=False, **kw))
+
+
+def _dom(a, b):
+    return all(x >= y for x, y in zip(a, b))
+
+
+def test_pareto_keep_keeps_undominated():
+    """Sobrevive quien nadie de su grupo domina; ante empate, el primero."""
+    rng = random.Random(3)
+    for _ in range(300):
+        keys = [rng.randrange(3) for _ in range(rng.randint(1, 12))]
+        res = [tuple(rng.randrange(3) for _ in range(3)) for _ in keys]
+        expected = [i for i in range(len(keys))
+                    if not any(keys[j] == keys[i] and _dom(res[j], res[i])
+                               and (j < i or not _dom(res[i], res[j]))
+                               for j in range(len(keys)) if j != i)]
+        assert _pareto_keep(keys, res, None) == expected
+
+
+def test_pruned_batched_matches_scalar(make_universe):
+    for G, cu, s0, donkey, width in _cases(make_universe, 60):
+        kw = dict(beam_width=width, prune=True)
+        assert (route_dynamic_beam(G, cu, G.ids[s0], donkey, batched=True, **kw)
+                == route_dynamic_beam(G, cu, G.ids[s0], donkey, batched=False, **kw))
+
+
+def test_parallel_restarts_do_not_depend_on_workers(make_universe):
+    for G, cu, s0, donkey, width in _cases(make_universe, 4):
+        serial = route_dynamic_beam_parallel(G, cu, G.ids[s0], donkey, beam_width=width,
+                                             workers=1)
+        assert route_dynamic_beam_parallel(G, cu, G.ids[s0], donkey, beam_width=width,
+                                           workers=2) == serial
+
+
+def test_old_signature_raises_clear_error(make_universe):
+    u = make_universe(0, 5, 0.5)
+    G = SpaceGraph(u)
+    donkey = Donkey(Health.EXCELLENT, 50, 50, 10, 40)
+    with pytest.raises(TypeError, match="ya no se admite"):
+        route_dynamic_beam(G, "0", donkey)
+    assert route_dynamic_beam(G, u, "0", donkey) == route_dynamic_beam(G, compile_universe(u, G),
+                                                                      "0", donkey)
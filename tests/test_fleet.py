@@ -0,0 +1,58 @@
+"""Flota: sin estado compartido cada burro es run_full_step3."""
+import random
+
+from core.graph.space_graph import SpaceGraph
+from core.models.donkey import Donkey
+from core.models.enums import Health
+from core.sim.compiled import compile_universe
+from core.sim.fleet import run_fleet
+from core.sim.lanes import STOP_REASONS
+from core.sim.simulator import run_full_step3
+
+HEALTHS = {"Excelente": Health.EXCELLENT, "Buena": Health.REGULAR, "Mala": Health.BAD,
+           "Moribundo": "moribundo"}
+
+
+def _fleet(rng, n, size):
+    health = [rng.choice(list(HEALTHS)) for _ in range(size)]
+    donkeys = [Donkey(HEALTHS[h], 1, rng.uniform(10, 100), rng.uniform(0, 20),
+                      rng.uniform(10, 300)) for h in health]
+    return health, donkeys, [str(rng.randrange(n)) for _ in range(size)]
+
+
+def test_independent_fleet_matches_run_full_step3(make_universe):
+    rng = random.Random(9)
+    for seed in range(10):
+        n = rng.randint(3, 60)
+        u = make_universe(seed, n, min(1.0, 5 / n))
+        G = SpaceGraph(u)
+        cu = compile_universe(u, G)
+        health, donkeys, origins = _fleet(rng, n, 40)
+        r = run_fleet(cu, G, donkeys, origins, track_visited=True).lanes
+        assert run_fleet(cu, G, donkeys, origins).lanes.stars is None
+        for k, d in enumerate(donkeys):
+            log = run_full_step3(cu, G, origins[k], health[k], d.energy_pct, d.grass_kg,
+                                 d.life_ly)
+            assert (r.final_energy[k], r.final_life[k], STOP_REASONS[r.stop[k]],
+                    int(r.moves[k]), int(r.stars[k])) == \
+                   (log.final_energy, log.final_life, log.stop_reason,
+                    len(log.visited_order) - 1, len(set(log.visited_order)))
+
+
+def test_shared_research_splits_the_stars(make_universe):
+    rng = random.Random(10)
+    for seed in range(10):
+        n = rng.randint(3, 60)
+        u = make_universe(seed, n, min(1.0, 5 / n))
+        G = SpaceGraph(u)
+        cu = compile_universe(u, G)
+        _, donkeys, origins = _fleet(rng, n, 20)
+        f = run_fleet(cu, G, donkeys, origins, share_research=True, claim_lanes=True)
+        tracked = run_fleet(cu, G, donkeys, origins, share_research=True, claim_lanes=True,
+                            track_visited=True)
+        # cada salto llega a una estrella que nadie investigó: stars = saltos + 1
+        assert (f.lanes.stars == tracked.lanes.stars).all()
+        assert (f.lanes.stars == f.lanes.moves + 1).all()
+        assert f.lanes.moves.sum() <= n - len(set(origins))
+        assert (f.researched_by == tracked.researched_by).all()
+        assert (f.claimed_by == tracked.claimed_by).all()
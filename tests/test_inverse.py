@@ -0,0 +1,37 @@
+"""Planificación inversa frente a recorrer una grilla fina de valores."""
+import random
+
+import numpy as np
+
+from core.graph.space_graph import SpaceGraph
+from core.sim.compiled import compile_universe
+from core.sim.inverse import min_resource_step3
+from core.sim.lanes import run_step3_lanes
+
+
+def test_min_resource_matches_fine_grid(make_universe):
+    rng = random.Random(7)
+    checked = 0
+    for seed in range(30):
+        n = 60
+        u = make_universe(seed, n, 5 / n)
+        G = SpaceGraph(u)
+        cu = compile_universe(u, G)
+        o = str(rng.randrange(n))
+        resource = rng.choice(["hay_kg", "energy_pct"])
+        energy, hay = rng.uniform(5, 60), rng.uniform(0, 10)
+        grid = np.linspace(0.0, 50.0, 5001)
+        values = {"energy_pct": energy, "hay_kg": hay, resource: grid}
+        r = run_step3_lanes(cu, G, [o] * len(grid), ["Buena"] * len(grid),
+                            values["energy_pct"], values["hay_kg"], 300.0)
+        target = int(r.stars.max())
+        ok = r.stars >= target
+        # solo objetivos no triviales y monótonos en el recurso
+        if ok[0] or not (np.diff(ok.astype(int)) >= 0).all():
+            continue
+        inv = min_resource_step3(G, cu, o, "Buena", energy, hay, 300.0, resource=resource,
+                                 target_stars=target, hi=50.0, tol=0.01)
+        assert inv.stars >= target
+        assert abs(inv.value - grid[np.argmax(ok)]) <= 0.01 + 1e-9
+        checked += 1
+    assert checked >= 5
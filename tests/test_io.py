@@ -0,0 +1,118 @@
+"""Cargadores: streaming, caché, binario y modo confiable frente a la carga simple."""
+import json
+import pickle
+import warnings
+
+import numpy as np
+import pytest
+
+from core.graph.space_graph import GraphBuilder, SpaceGraph
+from core.io.binary import load_binary, open_universe, write_binary
+from core.io.cache import cache_path, load_cached
+from core.io.json_loader import _load_in_memory, load_universe
+from core.io.stream_loader import stream_universe
+from core.sim.compiled import compile_universe
+from core.sim.lanes import run_step3_lanes
+from tools.convert_from_original import convert_file
+from tools.universe_bin import universe_to_original
+
+GRAPH_ARRAYS = ("indptr", "indices", "distance", "blocked", "edge_of", "edge_slots", "edge_u",
+                "edge_v", "x", "y", "hypergiant", "galaxy", "near", "near_open")
+COMPILED_ARRAYS = ("x_time_per_kg", "invest_energy_per_x", "disease_life_delta", "type",
+                   "galaxy", "constellation")
+
+
+def _write(path, u, **extra):
+    path.write_text(json.dumps(dict(u.model_dump(by_alias=True), **extra)), encoding="utf-8")
+    return path
+
+
+def _assert_same_graph(G, ref):
+    assert list(G.ids) == list(ref.ids) and list(G.galaxies) == list(ref.galaxies)
+    for a in GRAPH_ARRAYS:
+        assert np.array_equal(getattr(G, a), getattr(ref, a), equal_nan=True), a
+
+
+def test_stream_matches_in_memory(make_universe, tmp_path):
+    for seed in range(3):
+        u = make_universe(seed, 12 + seed, 0.3, extras=True)
+        p = _write(tmp_path / "u.json", u, extra={"a": [1, {"b": "ü"}]})
+        ref = _load_in_memory(p)
+        for chunk in (1, 7, 1 << 20):
+            builder = GraphBuilder()
+            assert stream_universe(p, builder=builder, chunk=chunk) == ref
+            _assert_same_graph(builder.build(), SpaceGraph(ref))
+
+
+@pytest.mark.parametrize("key, value", [("edges", None), ("stars", {}), ("hyperlanes", "x")])
+def test_stream_rejects_non_array_sections(make_universe, tmp_path, key, value):
+    p = _write(tmp_path / "u.json", make_universe(0, 5, 0.5), **{key: value})
+    for load in (stream_universe, _load_in_memory):
+        with pytest.raises(RuntimeError):
+            load(p)
+
+
+def test_cache_round_trip(make_universe, tmp_path):
+    p = _write(tmp_path / "u.json", make_universe(1, 30, 0.15, extras=True))
+    ref = _load_in_memory(p)
+    u1, G1 = load_universe(p, with_graph=True, cache=True)      # sin caché: la escribe
+    assert cache_path(p).exists()
+    u2, G2 = load_universe(p, with_graph=True, cache=True)      # desde la caché
+    assert u1 == u2 == ref
+    _assert_same_graph(G1, SpaceGraph(ref))
+    _assert_same_graph(G2, SpaceGraph(ref))
+    # otro contenido: la caché vieja no se usa
+    _write(p, make_universe(2, 30, 0.15))
+    assert load_cached(p) is None
+    assert load_universe(p, cache=True) == _load_in_memory(p)
+
+
+def test_binary_round_trip(make_universe, tmp_path):
+    u = make_universe(3, 40, 0.1, extras=True)
+    G0 = SpaceGraph(u)
+    cu0 = compile_universe(u, G0)
+    path = tmp_path / "u.uvb"
+    write_binary(path, u, G0, cu0)
+
+    G, cu = open_universe(path)
+    _assert_same_graph(G, G0)
+    for a in COMPILED_ARRAYS:
+        assert np.array_equal(getattr(cu, a), getattr(cu0, a)), a
+    assert dict(G.index_of) == G0.index_of
+    # los textos perezosos se picklean como lista
+    assert pickle.loads(pickle.dumps(G.ids)) == G0.ids
+    o = G0.ids[:10]
+    r0 = run_step3_lanes(cu0, G0, o, ["Buena"] * len(o), 50, 5, 200)
+    r1 = run_step3_lanes(cu, G, o, ["Buena"] * len(o), 50, 5, 200)
+    assert np.array_equal(r0.stars, r1.stars) and np.array_equal(r0.final_life, r1.final_life)
+    # mode="c": bloquear una vía no toca el archivo
+    G.set_blocked_edges([0], True)
+    assert np.array_equal(open_universe(path)[0].blocked, G0.blocked)
+
+    u1, G1 = load_binary(path, with_graph=True)
+    _assert_same_graph(G1, G0)
+    _assert_same_graph(SpaceGraph(u1), G0)
+    assert (u1.galaxies, u1.constellations, u1.stars, u1.memberships) == \
+           (u.galaxies, u.constellations, u.stars, u.memberships)
+
+
+def test_trusted_matches_validated(make_universe, tmp_path):
+    p = _write(tmp_path / "u.json", make_universe(4, 25, 0.2))
+    ref = load_universe(p)
+    assert load_universe(p, trusted=True) == ref
+    assert load_universe(p, trusted=True, progress=lambda done, total: None) == ref
+    # el conversor del formato original registra la membresía de una estrella sin
+    # coordenadas: la referencia queda rota y se avisa, pero se carga como sin trusted
+    orig, _ = universe_to_original(make_universe(5, 10, 0.3))
+    orig["constellations"][0]["starts"].append({"id": "sin-coordenadas", "coordenates": {}})
+    src = tmp_path / "original.json"
+    src.write_text(json.dumps(orig), encoding="utf-8")
+    convert_file(src, p, fast=True)
+    ref = load_universe(p)
+    for kw in ({}, {"progress": lambda done, total: None}):
+        with pytest.warns(RuntimeWarning, match="referencias rotas"):
+            assert load_universe(p, trusted=True, **kw) == ref
+    # el formato original sigue el camino validado: sin revisión ni aviso
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert load_universe(src, trusted=True) == load_universe(src)
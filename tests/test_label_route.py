@@ -0,0 +1,50 @@
+"""Router por etiquetas frente a fuerza bruta y a la voraz del punto 3."""
+import random
+
+from core.graph.space_graph import SpaceGraph
+from core.routing.label_route import route_step3_labels
+from core.sim.compiled import compile_universe
+from core.sim.rules import _parse_health, _stay_step3, _step3_rates, compute_route_step3
+
+HEALTHS = ("Excelente", "Buena", "Mala", "Moribundo")
+
+
+def _brute_force(G, cu, o, health_txt, energy, hay, life):
+    """Máximo de estrellas de un camino con las reglas de estancia y salto del punto 3."""
+    factor, gain = _step3_rates(_parse_health(health_txt))
+    best = 1
+
+    def rec(i, energy, hay, life, visited):
+        nonlocal best
+        best = max(best, len(visited))
+        if energy <= 0.0 or life <= 0.0:
+            return
+        for v, d in G.neighbors_idx(i):
+            if d <= 0.0 or v in visited or life - d <= 0.0 or energy - d * factor <= 0.0:
+                continue
+            rec(v, *_stay_step3(cu, v, energy - d * factor, hay, life - d, gain), visited | {v})
+
+    rec(o, *_stay_step3(cu, o, energy, hay, life, gain), frozenset([o]))
+    return best
+
+
+def test_labels_match_brute_force(make_universe):
+    rng = random.Random(1)
+    for seed in range(120):
+        n = rng.randint(2, 9)
+        u = make_universe(seed, n, 0.45, blocked=0.1)
+        G = SpaceGraph(u)
+        cu = compile_universe(u, G)
+        o = rng.randrange(n)
+        args = (str(o), rng.choice(HEALTHS), rng.uniform(20, 100), rng.uniform(0, 20),
+                rng.uniform(20, 150))
+        greedy = compute_route_step3(G, cu, *args)
+        # sin cubetas ni tope solo queda la dominancia por (nodo, visitados)
+        exact = route_step3_labels(G, cu, *args, buckets=None, max_labels=10**6).route
+        assert len(exact.path) == _brute_force(G, cu, o, *args[1:])
+        route = route_step3_labels(G, cu, *args).route
+        assert len(route.path) >= len(greedy.path)
+        # la ruta reportada es la de compute_route_step3 sobre ese camino
+        replay = compute_route_step3(G, cu, *args, path=route.path)
+        assert (replay.path, replay.remaining_life, replay.remaining_energy) == \
+               (route.path, route.remaining_life, route.remaining_energy)
@@ -0,0 +1,53 @@
+"""Simulador por carriles frente a run_full_step3 carril por carril."""
+import random
+
+import numpy as np
+import pytest
+
+from core.graph.space_graph import SpaceGraph
+from core.sim.compiled import compile_universe
+from core.sim.lanes import STOP_REASONS, Noise, run_step3_lanes
+from core.sim.simulator import run_full_step3
+
+HEALTHS = ("Excelente", "Buena", "Mala", "Moribundo", "Muerto")
+
+
+def test_lanes_match_run_full_step3(make_universe):
+    rng = random.Random(7)
+    for seed in range(12):
+        n = rng.randint(2, 40)
+        u = make_universe(seed, n, min(1.0, 5 / n), extras=True)
+        G = SpaceGraph(u)
+        cu = compile_universe(u, G)
+        N = 60
+        origins = [str(rng.randrange(n)) for _ in range(N)]
+        health = [rng.choice(HEALTHS) for _ in range(N)]
+        energy = np.array([rng.uniform(1, 100) for _ in range(N)])
+        hay = np.array([rng.uniform(0, 30) for _ in range(N)])
+        life = np.array([rng.uniform(1, 300) for _ in range(N)])
+        max_steps = rng.choice([5, 1000])
+        r = run_step3_lanes(cu, G, origins, health, energy, hay, life, max_steps=max_steps)
+        for k in range(N):
+            log = run_full_step3(cu, G, origins[k], health[k], energy[k], hay[k], life[k],
+                                 max_steps=max_steps)
+            assert (r.final_energy[k], r.final_hay[k], r.final_life[k], bool(r.died[k]),
+                    STOP_REASONS[r.stop[k]], int(r.steps[k])) == \
+                   (log.final_energy, log.final_grass, log.final_life, log.died,
+                    log.stop_reason, len(log.steps))
+            assert int(r.moves[k]) == len(log.visited_order) - 1
+            assert int(r.stars[k]) == len(set(log.visited_order))
+            assert G.ids[r.final_node[k]] == log.visited_order[-1]
+            assert r.distance[k] == pytest.approx(sum(s.distance for s in log.steps))
+
+
+def test_noise_never_leaves_a_dead_lane_running(make_universe):
+    u = make_universe(3, 60, 5 / 60)
+    G = SpaceGraph(u)
+    for max_steps in (1, 1000):
+        r = run_step3_lanes(u, G, [G.ids[i % 60] for i in range(2000)], ["Buena"] * 2000,
+                            80, 10, 40, max_steps=max_steps,
+                            noise=Noise(research=0.5, life=3.0, travel=1.0),
+                            rng=np.random.default_rng(1))
+        assert r.died.any()
+        assert not ((~r.died) & ((r.final_life <= 0) | (r.final_energy <= 0))).any()
+        assert (r.final_life[r.died] >= 0).all() and (r.final_energy[r.died] >= 0).all()
@@ -0,0 +1,48 @@
+"""Monte Carlo del punto 3: reproducible y, sin ruido, igual al determinista."""
+import math
+
+import pytest
+
+from core.graph.space_graph import SpaceGraph
+from core.sim.compiled import compile_universe
+from core.sim.lanes import Noise
+from core.sim.montecarlo import monte_carlo_step3
+from core.sim.simulator import run_full_step3
+
+PARAMS = ("Buena", 70.0, 8.0, 150.0)
+
+
+def test_same_seed_same_numbers(make_universe):
+    u = make_universe(4, 25, 0.2)
+    G = SpaceGraph(u)
+    cu = compile_universe(u, G)
+    kw = dict(replicas=300, seed=11, noise=Noise(travel=0.3))
+    ref = {r.origin: r for r in monte_carlo_step3(G, cu, None, *PARAMS, workers=1, **kw)}
+    some = ["7", "3", "no-existe", "12"]
+    got = monte_carlo_step3(G, cu, some, *PARAMS, workers=2, **kw)
+    assert [r.origin for r in got] == some
+    for r in got:
+        if r.origin in ref:
+            assert r == ref[r.origin]
+    # otra semilla sí cambia los sorteos
+    other = monte_carlo_step3(G, cu, some[:1], *PARAMS, workers=1, **dict(kw, seed=12))
+    assert other[0] != ref["7"]
+
+
+def test_without_noise_matches_run_full_step3(make_universe):
+    u = make_universe(5, 20, 0.25)
+    G = SpaceGraph(u)
+    cu = compile_universe(u, G)
+    quiet = Noise(research=0.0, life=0.0, travel=0.0)
+    stats = monte_carlo_step3(G, cu, None, *PARAMS, replicas=3, noise=quiet, workers=1)
+    untracked = monte_carlo_step3(G, cu, None, *PARAMS, replicas=3, noise=quiet, workers=1,
+                                  track_stars=False)
+    for r, v in zip(stats, untracked):
+        log = run_full_step3(cu, G, r.origin, *PARAMS)
+        assert r.survival == (0.0 if log.died else 1.0)
+        assert r.stars_mean == len(set(log.visited_order)) and r.stars_std == 0.0
+        # media de réplicas idénticas: igual salvo redondeo
+        assert (r.life_mean, r.energy_mean) == pytest.approx((log.final_life, log.final_energy))
+        assert math.isnan(v.stars_mean)
+        assert (v.survival, v.life_mean, v.energy_mean) == \
+               (r.survival, r.life_mean, r.energy_mean)
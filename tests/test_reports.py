@@ -0,0 +1,19 @@
+"""Reporte detallado: columnas de pasos frente a las filas de RunLog.to_rows()."""
+from core.graph.space_graph import SpaceGraph
+from core.reports.detailed_report import generate_detailed_report
+from core.sim.simulator import run_full_step3
+
+
+def test_report_reads_the_step_columns(make_universe, tmp_path):
+    for seed in range(8):
+        u = make_universe(seed, 20, 0.2)
+        G = SpaceGraph(u)
+        log = run_full_step3(u, G, "0", "Mala", 30, 10, 300)
+        report = generate_detailed_report(log, u, u.memberships, tmp_path)
+        rows = log.to_rows()
+        assert report["steps"].to_dict("records") == rows
+        # pasto de la primera estancia en cada estrella, como el recorrido por filas
+        for star in report["stars"]:
+            first = next((r for r in rows if r["from_star"] == star["ID Estrella"]), None)
+            eaten = max(0.0, first["grass_before"] - first["grass_after"]) if first else 0.0
+            assert star["Pasto Consumido (kg)"] == f"{eaten:.2f}"
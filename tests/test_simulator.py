@@ -0,0 +1,84 @@
+"""Simulación del punto 3: reanudar, stream y bitácora columnar."""
+import asyncio
+import random
+
+import pytest
+
+from core.graph.space_graph import SpaceGraph
+from core.sim.compiled import changed_stars, compile_universe
+from core.sim.simulator import (StepColumns, aiter_step3, iter_step3, resume_step3,
+                                run_full_step3)
+
+HEALTHS = ("Excelente", "Mala", "Moribundo")
+
+
+def _cases(make_universe, count, seed0=0):
+    rng = random.Random(3 + seed0)
+    for seed in range(seed0, seed0 + count):
+        n = rng.randint(3, 40)
+        u = make_universe(seed, n, min(1.0, 4 / n))
+        params = (str(rng.randrange(n)), rng.choice(HEALTHS), rng.uniform(20, 100),
+                  rng.uniform(0, 30), rng.uniform(50, 600))
+        yield rng, u, SpaceGraph(u), params, rng.choice([10, 1000])
+
+
+def _summary(log):
+    return (log.steps, log.visited_order, log.stop_reason, log.final_energy, log.final_grass,
+            log.final_life, log.died, log.death_checkpoint,
+            [log.checkpoint(k) for k in range(log.n_checkpoints())])
+
+
+def test_resume_matches_fresh_run(make_universe):
+    for rng, u, G, params, max_steps in _cases(make_universe, 150):
+        cu = compile_universe(u, G)
+        log = run_full_step3(cu, G, *params, max_steps=max_steps)
+        edges = set()
+        for _ in range(rng.randint(0, 2)):
+            a, b, _, blocked = rng.choice(list(G.edges()))
+            G.set_blocked(a, b, not blocked)
+            edges.add((a, b))
+        for _ in range(rng.randint(0, 2)):
+            rng.choice(u.stars).research.invest_energy_per_x = rng.uniform(0, 8)
+        cu2 = compile_universe(u, G)
+        resumed = resume_step3(log, cu2, G, changed_stars(cu, cu2), edges)
+        assert _summary(resumed) == _summary(run_full_step3(cu2, G, *params,
+                                                            max_steps=max_steps))
+
+
+def test_stream_matches_run_full_step3(make_universe):
+    async def collect(*args, **kw):
+        return [ev async for ev in aiter_step3(*args, **kw)]
+
+    for _, u, G, params, max_steps in _cases(make_universe, 60, seed0=500):
+        log = run_full_step3(u, G, *params, max_steps=max_steps)
+        events = list(iter_step3(u, G, *params, max_steps=max_steps))
+        assert [ev.index for ev in events] == list(range(len(events)))
+        assert [ev.step for ev in events if ev.step is not None] == log.steps
+        assert (events[-1].step is None) == (log.death_checkpoint is not None)
+        last = events[-1].state
+        assert (last["energy"], last["hay"], last["life"]) == \
+               (log.final_energy, log.final_grass, log.final_life)
+        streamed = asyncio.run(collect(u, G, *params, max_steps=max_steps, every=3))
+        assert [(ev.checkpoint, ev.step) for ev in streamed] == \
+               [(ev.checkpoint, ev.step) for ev in events]
+    for every in (0, -1):
+        with pytest.raises(ValueError):
+            asyncio.run(collect(u, G, *params, every=every))
+
+
+def test_checkpoints_and_columns_match_the_stream(make_universe):
+    for _, u, G, params, max_steps in _cases(make_universe, 60, seed0=900):
+        log = run_full_step3(u, G, *params, max_steps=max_steps)
+        events = list(iter_step3(u, G, *params, max_steps=max_steps))
+        assert [log.checkpoint(k) for k in range(log.n_checkpoints())] == \
+               [ev.checkpoint for ev in events]
+
+        # StepColumns se comporta como la lista de Step de antes
+        steps = [ev.step for ev in events if ev.step is not None]
+        cols = StepColumns(1)
+        cols.extend(steps)
+        assert isinstance(log.steps, StepColumns) and cols == log.steps == steps
+        assert len(cols) == len(steps) and list(cols) == steps
+        assert cols[-1] == steps[-1] and cols[0] == steps[0]
+        assert cols[1:4] == steps[1:4] and cols[::-2] == steps[::-2]
+        assert log.to_rows() == log.to_frame().to_dict("records")
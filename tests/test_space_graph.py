@@ -0,0 +1,76 @@
+"""SpaceGraph (CSR) frente a la construcción original sobre networkx."""
+import math
+import random
+
+import networkx as nx
+import numpy as np
+
+from core.graph.space_graph import SpaceGraph
+from core.sim.rules import _nearest_viable
+
+
+def _networkx_graph(u) -> nx.Graph:
+    """Construcción de referencia: la del SpaceGraph original."""
+    g = nx.Graph()
+    for s in u.stars:
+        g.add_node(s.id, x=s.x, y=s.y)
+    for e in u.edges:
+        if not (g.has_node(e.u) and g.has_node(e.v)):
+            continue
+        d = e.distance
+        if d is None:
+            a, b = g.nodes[e.u], g.nodes[e.v]
+            d = math.hypot(a["x"] - b["x"], a["y"] - b["y"])
+        g.add_edge(e.u, e.v, distance=float(d), blocked=bool(e.blocked))
+    return g
+
+
+def test_csr_matches_networkx(make_universe):
+    for seed in range(40):
+        u = make_universe(seed, 5 + seed, 0.3, blocked=0.2, extras=True)
+        G, ref = SpaceGraph(u), _networkx_graph(u)
+        assert G.ids == list(ref.nodes)
+        for sid in ref.nodes:
+            nbrs, dist, blocked = G.row(G.index_of[sid])
+            expected = list(ref.neighbors(sid))
+            assert [G.ids[v] for v in nbrs.tolist()] == expected
+            assert dist.tolist() == [ref[sid][v]["distance"] for v in expected]
+            assert blocked.tolist() == [ref[sid][v]["blocked"] for v in expected]
+
+
+def _nearest_brute_force(G, i, visited, life, energy, factor, skip_zero):
+    """Mínimo sobre toda la fila; ante empate, el primero en orden de adyacencia."""
+    best, best_d = -1, 0.0
+    for v, d, b in zip(*(a.tolist() for a in G.row(i))):
+        if b or (skip_zero and d <= 0.0) or (visited is not None and visited[v]):
+            continue
+        if life - d <= 0.0 or energy - d * factor <= 0.0:
+            continue
+        if best < 0 or d < best_d:
+            best, best_d = v, d
+    return best, best_d
+
+
+def test_near_index_matches_brute_force(make_universe):
+    rng = random.Random(3)
+    for seed in range(20):
+        n = rng.randint(2, 50)
+        u = make_universe(seed, n, min(1.0, 8 / n), blocked=0.2)
+        for e in u.edges:
+            if rng.random() < 0.3:
+                e.distance = float(rng.choice([0, 1, 2, 2, 3]))   # empates y ceros
+        G = SpaceGraph(u)
+        for _ in range(100):
+            if len(G.edge_u) and rng.random() < 0.3:
+                e = rng.randrange(len(G.edge_u))
+                G.set_blocked_edges([e], rng.random() < 0.5)
+            i = rng.randrange(G.n)
+            visited = np.array([rng.random() < 0.3 for _ in range(G.n)]) \
+                if rng.random() < 0.5 else None
+            args = (i, visited, rng.uniform(0, 300), rng.uniform(0, 100),
+                    rng.choice([1.0, 1.2, 1.5, 2.0]), rng.random() < 0.5)
+            assert _nearest_viable(G, *args) == _nearest_brute_force(G, *args)
+        # el índice actualizado por set_blocked_edges es el que se arma de cero
+        near, near_open = G.near.copy(), G.near_open.copy()
+        G._build_near()
+        assert (G.near == near).all() and (G.near_open == near_open).all()
@@ -0,0 +1,72 @@
+"""Ruta estática exacta (branch-and-bound) frente a fuerza bruta y al voraz."""
+import random
+
+from core.graph.space_graph import SpaceGraph
+from core.models.donkey import Donkey
+from core.models.enums import Health
+from core.routing.static_route import BnBStats, route_static_max_nodes, route_static_max_nodes_exact
+
+
+def _brute_force(G, s, life):
+    """Largo del camino simple más largo con las reglas del voraz (d > 0, d <= vida)."""
+    best = 1
+
+    def rec(i, life, visited):
+        nonlocal best
+        best = max(best, len(visited))
+        for v, d in G.neighbors_idx(i):
+            if v not in visited and 0.0 < d <= life:
+                rec(v, life - d, visited | {v})
+
+    rec(s, life, frozenset([s]))
+    return best
+
+
+def test_exact_matches_brute_force(make_universe):
+    rng = random.Random(9)
+    for seed in range(80):
+        n = rng.randint(2, 10)
+        u = make_universe(seed, n, 0.4, blocked=0.1, extras=True)
+        G = SpaceGraph(u)
+        life = rng.uniform(10, 80)
+        donkey = Donkey(Health.EXCELLENT, 1, 50, 1, life)
+        st = BnBStats()
+        path = route_static_max_nodes_exact(G, "0", donkey, stats=st)
+        # la ruta es válida: simple, por vías abiertas y dentro de la vida
+        assert len(set(path)) == len(path)
+        left = life
+        for a, b in zip(path, path[1:]):
+            k = G.edge_slot(a, b)
+            assert k >= 0 and not G.blocked[k] and 0.0 < G.distance[k] <= left
+            left -= G.distance[k]
+        assert st.optimal
+        assert len(path) == _brute_force(G, 0, life)
+        assert len(path) >= len(route_static_max_nodes(G, "0", donkey))
+
+
+def _greedy_reference(G, start, life):
+    """El voraz original (orden (1/d, id) descendente) salvo que saltea las vías de largo 0."""
+    visited, path, cur = {start}, [start], start
+    while True:
+        options = [(1.0 / d, v, d) for v, d in G.neighbors(cur)
+                   if v not in visited and 0.0 < d <= life]
+        if not options:
+            return path
+        _, cur, d = max(options)
+        visited.add(cur)
+        path.append(cur)
+        life -= d
+
+
+def test_greedy_ties_and_zero_length(make_universe):
+    rng = random.Random(4)
+    for seed in range(60):
+        u = make_universe(seed, rng.randint(2, 12), 0.5, blocked=0.1)
+        # distancias enteras chicas para forzar empates y vías de largo 0
+        data = u.model_dump()
+        for e in data["edges"]:
+            e["distance"] = float(rng.randint(0, 4))
+        G = SpaceGraph(type(u).model_validate(data))
+        life = float(rng.randint(0, 15))
+        donkey = Donkey(Health.EXCELLENT, 1, 50, 1, life)
+        assert route_static_max_nodes(G, "0", donkey) == _greedy_reference(G, "0", life)
@@ -0,0 +1,57 @@
+"""Barrido sin UI: reanudar tras una interrupción da los mismos bloques."""
+import json
+import shutil
+
+import pytest
+
+from tools.sweep import main
+
+
+def _rows(out):
+    return {p.name: p.read_text(encoding="utf-8") for p in sorted(out.glob("chunk_*"))}
+
+
+def test_sweep_resumes_to_the_same_output(make_universe, tmp_path):
+    src = tmp_path / "u.json"
+    src.write_text(json.dumps(make_universe(2, 12, 0.4).model_dump(by_alias=True)),
+                   encoding="utf-8")
+    out = tmp_path / "out"
+    argv = [str(src), "--out", str(out), "--health", "Excelente", "Mala",
+            "--energy", "30", "90", "--life", "50", "200", "--mode", "both",
+            "--chunk", "7", "--format", "jsonl"]
+    main(argv + ["--workers", "1"])
+    full = _rows(out)
+    assert len(full) == (12 * 2 * 2 * 2 * 2 + 6) // 7
+    # simular una corrida cortada: faltan bloques y queda un .tmp a medio escribir
+    names = list(full)
+    for name in names[1::3]:
+        (out / name).unlink()
+    (out / (names[1] + ".tmp")).write_text("{", encoding="utf-8")
+    main(argv + ["--workers", "2"])
+    assert _rows(out) == full
+
+    # otro contenido del universo en la misma carpeta: no se mezcla
+    src.write_text(json.dumps(make_universe(3, 12, 0.4).model_dump(by_alias=True)),
+                   encoding="utf-8")
+    with pytest.raises(SystemExit):
+        main(argv)
+
+
+def test_sweep_resumes_after_moving_the_folder(make_universe, tmp_path):
+    src = tmp_path / "a" / "u.json"
+    src.parent.mkdir()
+    src.write_text(json.dumps(make_universe(5, 8, 0.5).model_dump(by_alias=True)),
+                   encoding="utf-8")
+    out = tmp_path / "a" / "out"
+    opts = ["--out", str(out), "--life", "50", "200", "--chunk", "5", "--workers", "1"]
+    main([str(src)] + opts)
+    full = _rows(out)
+    manifest = json.loads((out / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["universe"] == "../u.json"
+
+    # se mueve universo + resultados juntos y se retoma sin nombrar el universo
+    shutil.move(str(tmp_path / "a"), str(tmp_path / "b"))
+    out = tmp_path / "b" / "out"
+    (out / next(iter(full))).unlink()
+    main(["--out", str(out)] + opts[2:])
+    assert _rows(out) == full
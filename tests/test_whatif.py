@@ -0,0 +1,31 @@
+"""Criticidad de aristas frente a re-simular cada escenario de bloqueo."""
+import random
+
+from core.graph.space_graph import SpaceGraph
+from core.sim.compiled import compile_universe
+from core.sim.whatif import RULES, _evaluate, edge_criticality
+
+
+def test_criticality_matches_full_resimulation(make_universe):
+    rng = random.Random(11)
+    for seed in range(10):
+        n = rng.randint(3, 20)
+        u = make_universe(seed, n, min(1.0, 4 / n))
+        G = SpaceGraph(u)
+        cu = compile_universe(u, G)
+        blocked = G.blocked.copy()
+        for rules in RULES:
+            params = ("0", rng.choice(["Excelente", "Mala", "Moribundo"]),
+                      rng.uniform(30, 100), rng.uniform(0, 10), rng.uniform(30, 200))
+            table = edge_criticality(G, cu, *params, rules=rules, k=2, max_scenarios=None)
+            assert (G.blocked == blocked).all()
+            free = [e for e in range(len(G.edge_u)) if not G.blocked[G.edge_slots[e, 0]]]
+            assert sum(len(r.edges) == 1 for r in table) == len(free)
+            index = {(G.ids[G.edge_u[e]], G.ids[G.edge_v[e]]): e for e in free}
+            for r in table:
+                edges = [index[e] for e in r.edges]
+                G.set_blocked_edges(edges, True)
+                out = _evaluate(G, cu, rules, params)
+                G.set_blocked_edges(edges, False)
+                assert (r.path, r.remaining_life, r.remaining_energy, r.died) == \
+                       (out.path, out.life, out.energy, out.died)
@@ -0,0 +1,53 @@
+"""
+Tabla de orígenes: corre punto 2, punto 3 y beam desde cada estrella.
+
+Uso:
+    python -m tools.batch_origins <universo.json> [--health Excelente] [--energy 100]
+        [--hay 10] [--life 200] [--origins A B ...] [--methods step2 step3 beam]
+        [--workers N] [--top K] [--csv salida.csv]
+"""
+import argparse
+from dataclasses import asdict
+
+import pandas as pd
+
+from core.graph.space_graph import SpaceGraph
+from core.io.json_loader import load_universe
+from core.routing.batch import METHODS, route_from_origins
+from core.sim.compiled import compile_universe
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Rutas desde muchos orígenes")
+    ap.add_argument("universe")
+    ap.add_argument("--health", default="Excelente",
+                    choices=["Excelente", "Buena", "Mala", "Moribundo", "Muerto"])
+    ap.add_argument("--energy", type=float, default=100.0)
+    ap.add_argument("--hay", type=float, default=10.0)
+    ap.add_argument("--life", type=float, default=200.0)
+    ap.add_argument("--origins", nargs="*", default=None, help="por defecto, todas las estrellas")
+    ap.add_argument("--methods", nargs="*", default=list(METHODS), choices=list(METHODS))
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--top", type=int, default=10, help="filas por método a mostrar")
+    ap.add_argument("--csv", default=None, help="guarda la tabla completa en CSV")
+    args = ap.parse_args(argv)
+
+    u = load_universe(args.universe)
+    G = SpaceGraph(u)
+    cu = compile_universe(u, G)
+    rows = route_from_origins(G, cu, args.health, args.energy, args.hay, args.life,
+                              origins=args.origins, methods=args.methods,
+                              workers=args.workers)
+
+    df = pd.DataFrame([asdict(r) for r in rows])
+    if args.csv:
+        df.to_csv(args.csv, index=False)
+        print(f"OK: {args.csv}")
+    with pd.option_context("display.width", 160, "display.max_columns", None):
+        for m in args.methods:
+            print(f"\n== {m} ==")
+            print(df[df["method"] == m].head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,21 @@
+"""
+Conversión del formato original (constellations -> starts) a UniverseIn.
+
+Uso:
+    python -m tools.convert_from_original <src_original.json> <dst_normalized.json> [--fast]
+    python -m tools.convert_from_original <carpeta_src> <carpeta_dst> --dir [--fast] [--workers N]
+
+--fast usa la conversión vectorizada (convert_original_fast); --dir convierte
+cada *.json de la carpeta en paralelo. Las advertencias salen por stdout a medida
+que aparecen (con --dir, con el nombre del archivo).
+"""
+import argparse
 import json, math, sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import repeat
 from pathlib import Path
+from typing import Callable, Optional
+import numpy as np
 
 PALETTE = ["#1f77b4","#ff7f0e","#2ca02c","#d62728","#9467bd",
             "#8c564b","#e377c2","#7f7f7f","#bcbd22","#17becf"]
@@ -10,19 +26,20 @@ def _num(x, default=None):
     except Exception:
         return default
 
-def convert_original_to_universe(src_dict: dict) -> tuple[dict, list[str]]:
+Warn = Callable[[str], None]
+
+
+def _walk(src_dict: dict, warn: Warn) -> dict:
     """
-    Convierte tu formato original a UniverseIn (interno).
-    Retorna (universe_dict, warnings_list).
+    Recorre el formato original una vez. Devuelve las secciones ya armadas
+    (constelaciones, estrellas, membresías, hyperlanes) y los enlaces crudos en
+    tres listas paralelas: 'src' / 'dst' (ids) y 'dist' (0.0 si falta).
     """
-    warnings: list[str] = []
-    galaxies = [{"id": "G1", "name": "ViaLactea"}]
-
     constellations_out = []
     stars_catalog: dict[str, dict] = {}
     memberships_out = []
-    edges_out = []
     hyperlanes_out = []
+    src, dst, dist = [], [], []
 
     # Detecta constelaciones del JSON original
     orig_consts = src_dict.get("constellations") or []
@@ -38,7 +55,7 @@ def convert_original_to_universe(src_dict: dict) -> tuple[dict, list[str]]:
         for s in (c.get("starts") or []):
             sid = str(s.get("id") or "").strip()
             if not sid:
-                warnings.append(f"[CONST {cid}] estrella sin id: se ignora")
+                warn(f"[CONST {cid}] estrella sin id: se ignora")
                 continue
 
             # Coordenadas
@@ -46,7 +63,7 @@ def convert_original_to_universe(src_dict: dict) -> tuple[dict, list[str]]:
             x = _num(coord.get("x"))
             y = _num(coord.get("y"))
             if x is None or y is None:
-                warnings.append(f"[STAR {sid}] sin coordenadas: no se puede dibujar ni calcular distancias")
+                warn(f"[STAR {sid}] sin coordenadas: no se puede dibujar ni calcular distancias")
                 # Igualmente registramos la membresía (para detectar multi-pertenencia)
                 memberships_out.append({"starId": sid, "constellationId": cid})
                 continue
@@ -64,7 +81,7 @@ def convert_original_to_universe(src_dict: dict) -> tuple[dict, list[str]]:
             if sid in stars_catalog:
                 old = stars_catalog[sid]
                 if (abs(old["x"] - float(x)) > 1e-9) or (abs(old["y"] - float(y)) > 1e-9):
-                    warnings.append(
+                    warn(
                         f"[STAR {sid}] aparece en varias constelaciones con coords distintas; "
                         f"se mantienen ({old['x']}, {old['y']}) y se ignoran ({x}, {y})"
                     )
@@ -89,23 +106,47 @@ def convert_original_to_universe(src_dict: dict) -> tuple[dict, list[str]]:
                 vid = str(vid_raw).strip()
                 if not vid:
                     continue
-
-                dist = _num(lk.get("distance"))
-
-                # Orden para evitar duplicados u-v / v-u
-                u, v = sorted([sid, vid])
-
-                edges_out.append({
-                    "u": u,
-                    "v": v,
-                    "distance": float(dist or 0.0),  # completamos si es 0 en segunda pasada
-                    "blocked": False
-                })
+                src.append(sid)
+                dst.append(vid)
+                dist.append(float(_num(lk.get("distance")) or 0.0))  # 0: se completa después
 
             # Hyperlanes (placeholder a G1; si usas varias galaxias, cámbialo)
             if hyper:
                 hyperlanes_out.append({"starId": sid, "toGalaxyId": "G1"})
 
+    return {
+        "constellations": constellations_out, "stars": stars_catalog,
+        "memberships": memberships_out, "hyperlanes": hyperlanes_out,
+        "src": src, "dst": dst, "dist": dist,
+    }
+
+
+def _universe(w: dict, edges_out: list) -> dict:
+    return {
+        "galaxies": [{"id": "G1", "name": "ViaLactea"}],
+        "constellations": w["constellations"],
+        "stars": list(w["stars"].values()),
+        "memberships": w["memberships"],
+        "edges": edges_out,
+        "hyperlanes": w["hyperlanes"],
+    }
+
+
+def convert_original_to_universe(src_dict: dict) -> tuple[dict, list[str]]:
+    """
+    Convierte tu formato original a UniverseIn (interno).
+    Retorna (universe_dict, warnings_list).
+    """
+    warnings: list[str] = []
+    w = _walk(src_dict, warnings.append)
+    stars_catalog = w["stars"]
+
+    edges_out = []
+    for sid, vid, dist in zip(w["src"], w["dst"], w["dist"]):
+        # Orden para evitar duplicados u-v / v-u
+        u, v = sorted([sid, vid])
+        edges_out.append({"u": u, "v": v, "distance": dist, "blocked": False})
+
     # Segunda pasada: completa distancias si ambas coords existen
     for e in edges_out:
         if not e["distance"]:
@@ -124,31 +165,146 @@ def convert_original_to_universe(src_dict: dict) -> tuple[dict, list[str]]:
             continue
         seen.add(key)
         dedup.append(e)
-    edges_out = dedup
 
-    universe = {
-        "galaxies": galaxies,
-        "constellations": constellations_out,
-        "stars": list(stars_catalog.values()),
-        "memberships": memberships_out,
-        "edges": edges_out,
-        "hyperlanes": hyperlanes_out,
-    }
-    return universe, warnings
+    return _universe(w, dedup), warnings
+
+
+def convert_original_fast(src_dict: dict, warn: Optional[Warn] = None) -> dict:
+    """
+    Misma conversión que convert_original_to_universe, vectorizada: el
+    recorrido junta los enlaces en arrays y NumPy ordena y deduplica los pares
+    (u, v) y completa las distancias faltantes de una vez. Cada advertencia se
+    pasa a 'warn(msg)' apenas aparece en lugar de acumularse.
+    Diferencia: un enlace sin distancia ni coordenadas se avisa una vez por par
+    (u, v), no una vez por cada extremo que lo lista.
+    """
+    warn = warn or (lambda msg: None)
+    w = _walk(src_dict, warn)
+    n = len(w["src"])
+    if n == 0:
+        return _universe(w, [])
+
+    # Ids -> índices: primero las estrellas del catálogo, después los vecinos desconocidos
+    stars = w["stars"]
+    index = {sid: k for k, sid in enumerate(stars)}
+    a = np.fromiter(map(index.__getitem__, w["src"]), dtype=np.int64, count=n)
+    b = np.fromiter(map(index.get, w["dst"], repeat(-1)), dtype=np.int64, count=n)
+    names = list(stars)
+    for k in np.flatnonzero(b < 0).tolist():
+        vid = w["dst"][k]
+        if vid not in index:
+            index[vid] = len(names)
+            names.append(vid)
+        b[k] = index[vid]
+
+    # Orden (u, v) como sorted() sobre str: por rango lexicográfico del id
+    rank = np.empty(len(names), dtype=np.int64)
+    rank[np.argsort(np.array(names), kind="stable")] = np.arange(len(names))
+    swap = rank[a] > rank[b]
+    lo, hi = np.where(swap, b, a), np.where(swap, a, b)
+
+    # Dedup (u, v): se queda la primera aparición, en el orden del archivo
+    _, first = np.unique(lo * len(names) + hi, return_index=True)
+    first.sort()
+    lo, hi = lo[first], hi[first]
+    dist = np.asarray(w["dist"], dtype=np.float64)[first]
 
+    # Coordenadas por índice (NaN: vecino que no está en el catálogo)
+    xy = np.full((len(names), 2), np.nan)
+    xy[:len(stars)] = [(s["x"], s["y"]) for s in stars.values()]
+
+    missing = dist == 0
+    fill = np.hypot(xy[lo, 0] - xy[hi, 0], xy[lo, 1] - xy[hi, 1])
+    ok = missing & np.isfinite(fill)
+    dist[ok] = fill[ok]
+
+    u_ids, v_ids = [names[k] for k in lo.tolist()], [names[k] for k in hi.tolist()]
+    for k in np.flatnonzero(missing & ~ok).tolist():
+        warn(f"[EDGE {u_ids[k]}-{v_ids[k]}] sin distancia y sin coords del vecino")
+
+    edges_out = [{"u": u, "v": v, "distance": d, "blocked": False}
+                 for u, v, d in zip(u_ids, v_ids, dist.tolist())]
+    return _universe(w, edges_out)
+
+
+def convert_file(src_path, dst_path, fast: bool = False, warn: Optional[Warn] = None) -> int:
+    """Convierte un archivo; devuelve la cantidad de advertencias (cada una va a 'warn')."""
+    warn = warn or (lambda msg: None)
+    count = 0
+
+    def emit(msg: str):
+        nonlocal count
+        count += 1
+        warn(msg)
 
-def main(src_path: str, dst_path: str):
     src = json.loads(Path(src_path).read_text(encoding="utf-8"))
-    uni, warns = convert_original_to_universe(src)
-    Path(dst_path).write_text(json.dumps(uni, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"OK: {dst_path}")
-    if warns:
-        print("\nADVERTENCIAS:")
+    if fast:
+        uni = convert_original_fast(src, emit)
+    else:
+        uni, warns = convert_original_to_universe(src)
         for w in warns:
-            print(" -", w)
+            emit(w)
+    Path(dst_path).write_text(json.dumps(uni, ensure_ascii=False, indent=2), encoding="utf-8")
+    return count
 
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Uso: python tools/convert_from_original.py <src_original.json> <dst_normalized.json>")
+
+def _print_warning(msg: str, name: Optional[str] = None):
+    print(f" - [{name}] {msg}" if name else f" - {msg}", flush=True)
+
+
+def _file_task(args) -> tuple[str, int]:
+    """Tarea de un worker: advertencias con el nombre del archivo, al momento."""
+    src, dst, fast = args
+    name = Path(src).name
+    n = convert_file(src, dst, fast, lambda msg: _print_warning(msg, name))
+    return dst, n
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Formato original (constellations -> starts) -> UniverseIn")
+    ap.add_argument("src", help="archivo original (o carpeta con --dir)")
+    ap.add_argument("dst", help="archivo destino (o carpeta con --dir)")
+    ap.add_argument("--fast", action="store_true",
+                    help="conversión vectorizada con NumPy (advertencias al momento)")
+    ap.add_argument("--dir", action="store_true",
+                    help="convierte cada *.json de la carpeta src a la carpeta dst, en paralelo")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    if not args.dir:
+        first = True
+
+        def warn(msg: str):
+            nonlocal first
+            if first:
+                print("\nADVERTENCIAS:")
+                first = False
+            _print_warning(msg)
+
+        n = convert_file(args.src, args.dst, args.fast, warn)
+        print(f"OK: {args.dst} ({n} advertencias)")
+        return
+
+    out_dir = Path(args.dst)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [(str(f), str(out_dir / f.name), args.fast)
+             for f in sorted(Path(args.src).glob("*.json"))]
+    if not tasks:
+        print(f"ERROR: no hay archivos .json en {args.src}")
+        sys.exit(1)
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futs = {pool.submit(_file_task, t): t[0] for t in tasks}
+        for k, fut in enumerate(as_completed(futs), start=1):
+            try:
+                dst, n = fut.result()
+                print(f"[{k}/{len(tasks)}] OK: {dst} ({n} advertencias)")
+            except Exception as e:
+                failed += 1
+                print(f"[{k}/{len(tasks)}] ERROR: {futs[fut]}: {e}")
+    if failed:
         sys.exit(1)
-    main(sys.argv[1], sys.argv[2])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Barrido de parámetros sin UI: salud x energía x pasto x vida x origen.
+
+Corre el punto 3 (run_full_step3, vectorizado por bloques con run_step3_lanes)
+y/o el punto 2 (compute_route_step2) en un pool de procesos y escribe cada
+bloque terminado en su propio archivo (CSV o JSON-lines) dentro de --out.
+Si la corrida se interrumpe, volver a lanzarla con el mismo --out retoma
+desde los bloques que faltan (manifest.json guarda la grilla y la clave del
+contenido del universo: si el archivo cambió, no se mezclan resultados).
+La ruta del universo se guarda relativa a la carpeta de salida, así que se
+puede mover todo junto; al retomar, el universo puede omitirse y se toma del
+manifest.
+
+Uso:
+    python -m tools.sweep [universo.json|universo.uvb] --out <carpeta>
+        [--health Excelente Mala] [--energy 50 100] [--hay 0 10] [--life 100 200]
+        [--origins A B ...] [--mode step3|step2|both] [--chunk 1000]
+        [--format csv|jsonl] [--workers N] [--max-steps 1000]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+
+from config import ADVANCED_CONFIG
+from core.graph.shared import SharedGraph, init_worker, worker_graph
+from core.graph.space_graph import SpaceGraph
+from core.io.binary import is_binary, open_universe, worker_spec
+from core.io.cache import file_key
+from core.io.json_loader import load_universe
+from core.sim.compiled import compile_universe
+from core.sim.lanes import STOP_REASONS, run_step3_lanes
+from core.sim.rules import compute_route_step2
+
+FIELDS = ["mode", "origin", "health", "energy", "hay", "life", "stars", "moves",
+          "distance", "final_energy", "final_hay", "final_life", "died", "stop_reason"]
+
+
+def _grid(origins, healths, energies, hays, lives, modes):
+    """Grilla en orden fijo (el índice de fila no cambia entre corridas)."""
+    return list(product(modes, origins, healths, energies, hays, lives))
+
+
+def _run_chunk(G, cu, rows, max_steps):
+    out = []
+    step3 = [r for r in rows if r[0] == "step3"]
+    if step3:
+        _, o, h, e, k, l = zip(*step3)
+        res = run_step3_lanes(cu, G, o, h, np.array(e, dtype=np.float64),
+                              np.array(k, dtype=np.float64), np.array(l, dtype=np.float64),
+                              max_steps=max_steps)
+    j = 0
+    for mode, o, h, e, k, l in rows:
+        if mode == "step3":
+            out.append(dict(zip(FIELDS, (
+                mode, o, h, e, k, l, int(res.stars[j]), int(res.moves[j]),
+                float(res.distance[j]), float(res.final_energy[j]), float(res.final_hay[j]),
+                float(res.final_life[j]), bool(res.died[j]), STOP_REASONS[res.stop[j]]))))
+            j += 1
+        else:
+            r = compute_route_step2(G, o, h, e, k, l)
+            dist = sum(float(G.distance[G.edge_slot(a, b)]) for a, b in r.edges)
+            out.append(dict(zip(FIELDS, (
+                mode, o, h, e, k, l, len(r.path), max(0, len(r.path) - 1), dist,
+                r.remaining_energy, r.hay_left, r.remaining_life, r.died, r.reason))))
+    return out
+
+
+def _chunk_task(args):
+    """Tarea de worker: un bloque de la grilla sobre el grafo compartido."""
+    idx, rows, max_steps = args
+    G, cu = worker_graph()
+    return idx, _run_chunk(G, cu, rows, max_steps)
+
+
+def _universe_ref(universe: str, out_dir: Path) -> str:
+    """Ruta del universo relativa a 'out_dir' (absoluta si no la hay, p. ej. en otra unidad)."""
+    src = Path(universe).resolve()
+    try:
+        return Path(os.path.relpath(src, out_dir.resolve())).as_posix()
+    except ValueError:
+        return str(src)
+
+
+def _chunk_path(out_dir: Path, idx: int, fmt: str) -> Path:
+    return out_dir / f"chunk_{idx:06d}.{fmt}"
+
+
+def _write_chunk(path: Path, rows, fmt: str):
+    """Escritura atómica: un bloque existe completo o no existe."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            w = csv.DictWriter(f, fieldnames=FIELDS)
+            w.writeheader()
+            w.writerows(rows)
+        else:
+            for r in rows:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Barrido de parámetros (punto 2 / punto 3)")
+    ap.add_argument("universe", nargs="?",
+                    help="por defecto, el del manifest.json de --out (al retomar)")
+    ap.add_argument("--out", required=True, help="carpeta de salida (y de reanudación)")
+    ap.add_argument("--health", nargs="+", default=["Excelente"],
+                    choices=["Excelente", "Buena", "Mala", "Moribundo", "Muerto"])
+    ap.add_argument("--energy", nargs="+", type=float, default=[100.0])
+    ap.add_argument("--hay", nargs="+", type=float, default=[10.0])
+    ap.add_argument("--life", nargs="+", type=float, default=[200.0])
+    ap.add_argument("--origins", nargs="*", default=None, help="por defecto, todas las estrellas")
+    ap.add_argument("--mode", choices=["step3", "step2", "both"], default="step3")
+    ap.add_argument("--chunk", type=int, default=1000, help="filas por archivo")
+    ap.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--max-steps", type=int,
+                    default=ADVANCED_CONFIG.get("max_steps_simulation", 1000))
+    args = ap.parse_args(argv)
+    if args.chunk < 1:
+        ap.error("--chunk debe ser al menos 1")
+
+    out_dir = Path(args.out)
+    mpath = out_dir / "manifest.json"
+    old = json.loads(mpath.read_text(encoding="utf-8")) if mpath.exists() else None
+    if args.universe is None:
+        if old is None:
+            ap.error(f"falta el universo (no hay {mpath} de dónde retomarlo)")
+        args.universe = str(out_dir / old["universe"])
+
+    binary = is_binary(args.universe)
+    if binary:
+        # .uvb: memmap, y cada worker abre el mismo archivo (caché de páginas compartida)
+        G, cu = open_universe(args.universe, mode="r")
+    else:
+        u = load_universe(args.universe)
+        G = SpaceGraph(u)
+        cu = compile_universe(u, G)
+    origins = list(G.ids) if args.origins is None else [str(o) for o in args.origins]
+    modes = ["step2", "step3"] if args.mode == "both" else [args.mode]
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        "universe": _universe_ref(args.universe, out_dir),
+        "universe_key": file_key(args.universe),
+        "modes": modes, "origins": origins, "health": args.health,
+        "energy": args.energy, "hay": args.hay, "life": args.life,
+        "chunk": args.chunk, "format": args.format, "max_steps": args.max_steps,
+    }
+    if old is not None:
+        if old.get("universe_key") != manifest["universe_key"]:
+            print(f"ERROR: el universo cambió desde que se empezó el barrido en {out_dir}; "
+                  "usa otra carpeta o bórrala.")
+            sys.exit(1)
+        # la ruta puede cambiar (carpeta movida, otra copia): manda la clave del contenido
+        if {**old, "universe": manifest["universe"]} != manifest:
+            print(f"ERROR: {out_dir} tiene otro barrido (manifest.json distinto); "
+                  "usa otra carpeta o bórrala.")
+            sys.exit(1)
+    else:
+        mpath.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    grid = _grid(origins, args.health, args.energy, args.hay, args.life, modes)
+    n_chunks = (len(grid) + args.chunk - 1) // args.chunk
+    todo = [i for i in range(n_chunks)
+            if not _chunk_path(out_dir, i, args.format).exists()]
+    print(f"{len(grid)} filas en {n_chunks} bloques; faltan {len(todo)}")
+    tasks = [(i, grid[i * args.chunk:(i + 1) * args.chunk], args.max_steps) for i in todo]
+
+    done = n_chunks - len(todo)
+    if args.workers == 1:
+        for i, rows, ms in tasks:
+            _write_chunk(_chunk_path(out_dir, i, args.format), _run_chunk(G, cu, rows, ms),
+                         args.format)
+            done += 1
+            print(f"[{done}/{n_chunks}] bloque {i}")
+    elif tasks:
+        with ExitStack() as stack:
+            spec = (worker_spec(args.universe) if binary
+                    else stack.enter_context(SharedGraph(G, cu)).spec)
+            pool = stack.enter_context(ProcessPoolExecutor(
+                max_workers=args.workers, initializer=init_worker, initargs=(spec,)))
+            for fut in as_completed([pool.submit(_chunk_task, t) for t in tasks]):
+                i, rows = fut.result()
+                _write_chunk(_chunk_path(out_dir, i, args.format), rows, args.format)
+                done += 1
+                print(f"[{done}/{n_chunks}] bloque {i}")
+    print(f"OK: {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
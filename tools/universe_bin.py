@@ -0,0 +1,105 @@
+"""
+Conversión entre el formato binario .uvb (core.io.binary) y JSON.
+
+Uso:
+    python -m tools.universe_bin to-bin <universo.json> <destino.uvb>
+    python -m tools.universe_bin to-json <universo.uvb> <destino.json> [--original]
+
+to-bin acepta el formato interno (UniverseIn) o el original (constellations -> starts).
+to-json escribe UniverseIn; con --original escribe el formato original.
+"""
+import argparse
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from core.io.binary import load_binary, write_binary
+from core.io.json_loader import load_universe
+from core.models.enums import StarType
+
+_NO_CONST = "SIN_CONSTELACION"
+
+
+def universe_to_original(u) -> tuple[dict, list[str]]:
+    """
+    UniverseIn -> formato original. Cada estrella aparece en cada constelación a
+    la que pertenece y cada vía en el 'linkedTo' de sus dos extremos.
+    Retorna (original_dict, warnings_list).
+    """
+    warnings: list[str] = []
+    links = defaultdict(list)
+    for e in u.edges:
+        if e.blocked:
+            warnings.append(f"[EDGE {e.u}-{e.v}] bloqueada: el formato original no guarda bloqueos")
+        links[e.u].append({"starId": e.v, "distance": e.distance})
+        if e.v != e.u:
+            links[e.v].append({"starId": e.u, "distance": e.distance})
+
+    stars = {}
+    for s in u.stars:
+        stars.setdefault(s.id, s)
+    members = defaultdict(list)
+    for m in u.memberships:
+        members[m.constellationId].append(m.starId)
+    in_const = {m.starId for m in u.memberships}
+    loose = [sid for sid in stars if sid not in in_const]
+
+    def star_out(sid):
+        s = stars[sid]
+        return {
+            "id": s.id,
+            "label": s.name,
+            "coordenates": {"x": s.x, "y": s.y},
+            "linkedTo": links.get(s.id, []),
+            "timeToEat": s.research.x_time_per_kg,
+            "hypergiant": s.type == StarType.HYPERGIANT,
+            "research": s.research.model_dump(),
+        }
+
+    consts = []
+    for c in u.constellations:
+        ids = [sid for sid in members.get(c.id, []) if sid in stars]
+        consts.append({"id": c.id, "name": c.name, "color": c.color,
+                       "starts": [star_out(sid) for sid in ids]})
+    if loose:
+        warnings.append(f"{len(loose)} estrellas sin constelación: se agrupan en '{_NO_CONST}'")
+        consts.append({"id": _NO_CONST, "name": "Sin constelación",
+                       "starts": [star_out(sid) for sid in loose]})
+    return {"constellations": consts}, warnings
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Conversión universo JSON <-> binario .uvb")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("to-bin", help="JSON (interno u original) -> .uvb")
+    b.add_argument("src")
+    b.add_argument("dst")
+    j = sub.add_parser("to-json", help=".uvb -> JSON")
+    j.add_argument("src")
+    j.add_argument("dst")
+    j.add_argument("--original", action="store_true",
+                   help="escribe el formato original (constellations -> starts)")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "to-bin":
+        u, G = load_universe(args.src, with_graph=True)
+        write_binary(args.dst, u, G)
+        print(f"OK: {args.dst} ({len(u.stars)} estrellas, {len(G.edge_u)} vías)")
+        return
+
+    u = load_binary(args.src)
+    warns: list[str] = []
+    if args.original:
+        data, warns = universe_to_original(u)
+    else:
+        data = u.model_dump(mode="json")
+    Path(args.dst).write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"OK: {args.dst}")
+    if warns:
+        print("\nADVERTENCIAS:")
+        for w in warns:
+            print(" -", w)
+
+
+if __name__ == "__main__":
+    main()
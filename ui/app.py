@@ -1,10 +1,10 @@
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QFileDialog, QMessageBox,
-    QWidget, QHBoxLayout, QVBoxLayout, QPushButton
+    QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QProgressDialog
 )
 
 from core.io.json_loader import load_universe
-from core.graph.space_graph import SpaceGraph
+from core.sim.compiled import compile_universe, changed_stars
 from ui.map_view import MapView
 from ui.params_panel import ParamsPanel
 from ui.star_editor import StarEditor
@@ -12,13 +12,13 @@ from ui.edge_manager import EdgeManager
 from ui.audio_manager import get_audio_manager
 from ui.report_dialog import ReportDialog
 from core.reports.detailed_report import generate_detailed_report, format_report_for_display
-from PySide6.QtCore import QUrl
+from PySide6.QtCore import QUrl, Qt
 from PySide6.QtMultimedia import QSoundEffect
 import os
 
 # Reglas de simulación
 from core.sim.rules import compute_route_step2
-from core.sim.simulator import run_full_step3
+from core.sim.simulator import run_full_step3, resume_step3
 
 
 class MainWindow(QMainWindow):
@@ -29,7 +29,13 @@ class MainWindow(QMainWindow):
         # --- Estado ---
         self.u = None
         self.G = None
+        self.cu = None    # universo compilado (tabla por índice de nodo)
         self._loading = False  # evita doble ejecución al abrir archivo
+        # Última simulación del punto 3 y ediciones posteriores (para reanudar)
+        self._log3 = None
+        self._log3_params = None
+        self._dirty_stars = set()
+        self._dirty_edges = set()
 
         # --- Vista del mapa ---
         self.view = MapView(self)
@@ -82,14 +88,29 @@ class MainWindow(QMainWindow):
         self._loading = True
         try:
             path, _ = QFileDialog.getOpenFileName(
-                self, "Abrir universo", filter="JSON (*.json)"
+                self, "Abrir universo", filter="Universo (*.json *.uvb)"
             )
             if not path:
                 return
 
-            # Carga y dibuja
-            self.u = load_universe(path)      # convierte si hace falta
-            self.G = SpaceGraph(self.u)
+            # Carga (caché binaria o streaming con progreso; convierte si hace falta) y dibuja
+            prog = QProgressDialog("Cargando universo…", None, 0, 100, self)
+            prog.setWindowModality(Qt.WindowModal)
+            prog.setMinimumDuration(500)
+
+            def on_progress(done, total):
+                prog.setValue(int(100 * done / total) if total else 100)
+                QApplication.processEvents()
+
+            try:
+                self.u, self.G = load_universe(path, progress=on_progress, with_graph=True,
+                                               cache=True)
+            finally:
+                prog.close()
+            self.cu = compile_universe(self.u, self.G)
+            self._log3 = self._log3_params = None
+            self._dirty_stars.clear()
+            self._dirty_edges.clear()
             const_colors = {c.id: c.color for c in self.u.constellations}
             self.view.draw(self.G, self.u.memberships, const_colors)
 
@@ -111,6 +132,10 @@ class MainWindow(QMainWindow):
             return
         dlg = StarEditor(self.u, self)
         if dlg.exec():
+            # La investigación cambió: recompilar la tabla
+            old = self.cu
+            self.cu = compile_universe(self.u, self.G)
+            self._dirty_stars.update(changed_stars(old, self.cu))
             # Redibuja por si cambió algo visual
             const_colors = {c.id: c.color for c in self.u.constellations}
             self.view.draw(self.G, self.u.memberships, const_colors)
@@ -118,8 +143,10 @@ class MainWindow(QMainWindow):
     def on_manage_edges(self): 
         if not (self.u and self.G):
             return
-        dlg = EdgeManager(self.G.G, self)  # pasa el networkx.Graph interno
-        if dlg.exec():
+        dlg = EdgeManager(self.G, self)  # bloqueos vía SpaceGraph.set_blocked
+        accepted = dlg.exec()
+        self._dirty_edges.update(dlg.changed)  # se aplican aunque se cierre el diálogo
+        if accepted:
             # Redibuja para ver cambios (las vías bloqueadas salen grises punteadas)
             const_colors = {c.id: c.color for c in self.u.constellations}
             self.view.draw(self.G, self.u.memberships, const_colors)
@@ -163,15 +190,25 @@ class MainWindow(QMainWindow):
         if not (self.u and self.G):
             return
         p = self.params.read_params()
-        # Ejecutar la simulación completa (genera RunLog con pasos detallados)
-        log = run_full_step3(
-            self.u, self.G,
-            origin_id=p["origin"],
-            health_txt=p["health"],
-            energy_pct=float(p["energy"]),
-            hay_kg=float(p["hay_kg"]),
-            life_ly=float(p["life_ly"]),
-        )
+        key = (p["origin"], p["health"], float(p["energy"]), float(p["hay_kg"]), float(p["life_ly"]))
+        if self._log3 is not None and self._log3_params == key:
+            # Mismos parámetros: reanudar desde la primera estancia afectada por las ediciones
+            log = resume_step3(self._log3, self.cu, self.G,
+                               changed_stars=self._dirty_stars,
+                               changed_edges=self._dirty_edges)
+        else:
+            # Ejecutar la simulación completa (genera RunLog con pasos detallados)
+            log = run_full_step3(
+                self.cu, self.G,
+                origin_id=p["origin"],
+                health_txt=p["health"],
+                energy_pct=float(p["energy"]),
+                hay_kg=float(p["hay_kg"]),
+                life_ly=float(p["life_ly"]),
+            )
+        self._log3, self._log3_params = log, key
+        self._dirty_stars.clear()
+        self._dirty_edges.clear()
 
         # Verificar si el burro murió
         if getattr(log, 'died', False):
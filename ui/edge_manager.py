@@ -13,7 +13,8 @@ class EdgeManager(QDialog):
     def __init__(self, G, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Bloquear / habilitar vías")
-        self.G = G  # networkx Graph
+        self.G = G  # SpaceGraph
+        self.changed = set()  # (u, v) de las vías que cambiaron de estado
 
         self.tbl = QTableWidget(0, len(self.COLS))
         self.tbl.setHorizontalHeaderLabels(self.COLS)
@@ -46,16 +47,14 @@ class EdgeManager(QDialog):
         self._load()
 
     def _load(self):
-        edges = list(self.G.edges(data=True))
+        edges = list(self.G.edges())
         self.tbl.setRowCount(len(edges))
-        for row, (u, v, d) in enumerate(edges):
+        for row, (u, v, dist, blocked) in enumerate(edges):
             u_item = QTableWidgetItem(str(u))
             v_item = QTableWidgetItem(str(v))
-            dist   = float(d.get("distance", 0.0))
             dist_item = QTableWidgetItem(f"{dist:.2f}")
             dist_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
 
-            blocked = bool(d.get("blocked", False))
             blk_item = QTableWidgetItem("Sí" if blocked else "No")
             blk_item.setTextAlignment(Qt.AlignCenter)
 
@@ -75,15 +74,17 @@ class EdgeManager(QDialog):
         for row in self._rows():
             u = self.tbl.item(row, 0).text()
             v = self.tbl.item(row, 1).text()
-            if self.G.has_edge(u, v):
-                self.G[u][v]["blocked"] = bool(new_blocked)
+            if self.G.is_blocked(u, v) != new_blocked:
+                self.changed.add((u, v))
+            self.G.set_blocked(u, v, new_blocked)
             self.tbl.item(row, 3).setText("Sí" if new_blocked else "No")
 
     def on_toggle(self):
         for row in self._rows():
             u = self.tbl.item(row, 0).text()
             v = self.tbl.item(row, 1).text()
-            if self.G.has_edge(u, v):
-                cur = bool(self.G[u][v].get("blocked", False))
-                self.G[u][v]["blocked"] = not cur
+            if self.G.edge_slot(u, v) >= 0:
+                cur = self.G.is_blocked(u, v)
+                self.G.set_blocked(u, v, not cur)
+                self.changed.add((u, v))
                 self.tbl.item(row, 3).setText("Sí" if not cur else "No")
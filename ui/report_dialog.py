@@ -111,9 +111,9 @@ class ReportDialog(QDialog):
         
         # Tabla de pasos
         table = QTableWidget()
-        steps = self.report.get("steps", [])
+        steps = self.report.get("steps")     # DataFrame de pasos (ver generate_detailed_report)
         
-        if steps:
+        if steps is not None and len(steps):
             table.setRowCount(len(steps))
             table.setColumnCount(9)
             table.setHorizontalHeaderLabels([
@@ -121,16 +121,15 @@ class ReportDialog(QDialog):
                 "Pasto (antes)", "Pasto (después)", "Vida (antes)", "Vida (después)"
             ])
             
-            for row, step in enumerate(steps):
-                table.setItem(row, 0, QTableWidgetItem(str(step.get("from_star", ""))))
-                table.setItem(row, 1, QTableWidgetItem(str(step.get("to_star", ""))))
-                table.setItem(row, 2, QTableWidgetItem(f"{float(step.get('distance', 0.0)):.2f}"))
-                table.setItem(row, 3, QTableWidgetItem(f"{float(step.get('energy_before', 0.0)):.2f}"))
-                table.setItem(row, 4, QTableWidgetItem(f"{float(step.get('energy_after', 0.0)):.2f}"))
-                table.setItem(row, 5, QTableWidgetItem(f"{float(step.get('grass_before', 0.0)):.2f}"))
-                table.setItem(row, 6, QTableWidgetItem(f"{float(step.get('grass_after', 0.0)):.2f}"))
-                table.setItem(row, 7, QTableWidgetItem(f"{float(step.get('life_before', 0.0)):.2f}"))
-                table.setItem(row, 8, QTableWidgetItem(f"{float(step.get('life_after', 0.0)):.2f}"))
+            # Se llena por columna, leyendo cada columna del DataFrame una sola vez
+            for col, name in enumerate(("from_star", "to_star")):
+                for row, value in enumerate(steps[name].astype(str).tolist()):
+                    table.setItem(row, col, QTableWidgetItem(value))
+            for col, name in enumerate(("distance", "energy_before", "energy_after",
+                                        "grass_before", "grass_after",
+                                        "life_before", "life_after"), start=2):
+                for row, value in enumerate(steps[name].astype(float).tolist()):
+                    table.setItem(row, col, QTableWidgetItem(f"{value:.2f}"))
             
             # Autoajustar columnas al contenido
             table.resizeColumnsToContents()